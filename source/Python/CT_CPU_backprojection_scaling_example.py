@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+This example benchmarks the backprojection of the CPU implementation (useCPU)
+with different numbers of threads. The backprojection is accumulated either
+with atomic operations (BPAccumulation = 0, default) or into per-thread images
+that are summed after the backprojection (BPAccumulation = 1). The latter
+avoids the atomic operations and usually scales better with a high number of
+threads, but requires one image of memory per thread.
+The data is a simulated circular cone beam CT geometry, i.e. no input data is
+needed. Requires the CPU library (CPU_matrixfree_lib).
+"""
+import os
+import time
+import numpy as np
+from omegatomo import proj
+
+A = proj.projectorClass()
+
+# Number of projections
+A.nProjections = 360
+# Number of rows and columns in a single projection image
+A.nRowsD = 256
+A.nColsD = 256
+# Projection angles (degrees)
+A.angles = -np.linspace(0, 360, A.nProjections, endpoint=False, dtype=np.float32)
+# Detector pixel size
+A.dPitchX = 1.
+A.dPitchY = 1.
+# Distance to center of rotation and detector
+A.sourceToCRot = 500.
+A.sourceToDetector = 1000.
+# Field of view
+A.FOVa_x = 120.
+A.FOVa_y = 120.
+A.axial_fov = 120.
+### Image size
+A.Nx = 256
+A.Ny = 256
+A.Nz = 256
+# Flat value
+A.flat = 1.
+# Only the size of the measurement data is used
+A.SinM = np.ones((A.nRowsD, A.nColsD, A.nProjections), dtype=np.float32)
+# Improved Siddon, the only projector supported by the CPU implementation
+A.projector_type = 1
+A.subsets = 1
+A.CT = True
+A.useCPU = True
+A.verbose = 0
+A.addProjector()
+A.initProj()
+
+# Number of backprojections per thread count
+nRep = 3
+# Thread counts to test, by default powers of two up to the number of logical cores
+nCores = os.cpu_count() or 1
+threads = [2**k for k in range(int(np.log2(nCores)) + 1)]
+if threads[-1] != nCores:
+    threads.append(nCores)
+
+y = np.ones(A.nRowsD * A.nColsD * A.nProjections, dtype=np.float32)
+tulos = {}
+for acc in [0, 1]:
+    A.BPAccumulation = acc
+    for n in threads:
+        A.CPUThreads = n
+        # Warm-up
+        f = A.T() * y
+        alku = time.perf_counter()
+        for k in range(nRep):
+            f = A.T() * y
+        tulos[(acc, n)] = (time.perf_counter() - alku) / nRep
+
+print('Threads | atomic (s) | per-thread images (s) | speedup vs. 1-thread atomic')
+for n in threads:
+    print(f"{n:7d} | {tulos[(0, n)]:10.3f} | {tulos[(1, n)]:21.3f} | {tulos[(0, threads[0])] / tulos[(0, n)]:.2f} / {tulos[(0, threads[0])] / tulos[(1, n)]:.2f}")
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+This example benchmarks the randoms variance reduction (3D fan-sum) of
+Randoms_variance_reduction, which is used when options.variance_reduction is
+True, against the previous implementation (referenceVarianceReduction below,
+per-LOR detector search and per-bin coefficient loops). The outputs of both
+are checked to match. By default a small scanner is used, since the reference
+implementation is very slow; with smallGeometry = False the geometry is the
+same as in PET_main_genericExample.py (Inveon, 128 x 160 x 4319 sinogram,
+25600 detectors), where the reference takes several minutes. The randoms are
+simulated, i.e. no input data is needed. A dynamic (4D) input is timed too;
+with the dynamic input, the detector lookup is done only once for all the time
+steps.
+"""
+import time
+import numpy as np
+from omegatomo.projector import proj
+from omegatomo.util.Randoms_variance_reduction import Randoms_variance_reduction
+
+def referenceVarianceReduction(Randoms, options):
+    """
+    The previous (per-LOR loop) implementation of Randoms_variance_reduction,
+    used as the reference.
+    """
+    from omegatomo.projector.detcoord import detectorCoordinates, sinogramCoordinates2D, sinogramCoordinates3D
+    z = sinogramCoordinates3D(options) / 10.0
+    detectors_x, detectors_y = detectorCoordinates(options)
+    x, y = sinogramCoordinates2D(options, detectors_x, detectors_y)
+    x, y = x / 10.0, y / 10.0
+    detectors_x = detectors_x / 10.0
+    detectors_y = detectors_y / 10.0
+    detectors_ring = options.detectors // options.rings
+    sino_amount = int(np.sum(options.segment_table))
+    coeff_matrix = np.zeros_like(Randoms, dtype=np.float32)
+    det_num = np.zeros((options.Ndist, options.Nang, 2), dtype=np.int32, order='F')
+    z = z - np.min(z)
+    ring = (np.round(z / z[1, 0]) + 1).astype(np.int32)
+    # Detector index of each LOR by searching through all the detectors
+    for u in range(options.Ndist * options.Nang):
+        i = u % options.Ndist
+        j = u // options.Ndist
+        for d in range(len(detectors_x)):
+            if np.linalg.norm([x[u, 0] - detectors_x[d], y[u, 0] - detectors_y[d]]) < 1e-3:
+                det_num[i, j, 0] = d + 1
+                break
+        for d in range(len(detectors_x)):
+            if np.linalg.norm([x[u, 1] - detectors_x[d], y[u, 1] - detectors_y[d]]) < 1e-3:
+                det_num[i, j, 1] = d + 1
+                break
+    testi1 = det_num[:, :, 0].flatten('F')
+    testi2 = det_num[:, :, 1].flatten('F')
+    ring1 = ring[:, 0].reshape(1, -1)
+    ring2 = ring[:, 1].reshape(1, -1)
+    testi1 = (np.reshape(testi1, (-1, 1)) + ((ring1 - 1) * detectors_ring)).astype(np.int32) - 1
+    testi2 = (np.reshape(testi2, (-1, 1)) + ((ring2 - 1) * detectors_ring)).astype(np.int32) - 1
+    randoms_flat = Randoms.flatten('F')
+    size = max(testi1.flatten('F').max(), testi2.flatten('F').max()) + 1
+    randoms_det = np.zeros(size, dtype=np.float32)
+    hits_det = np.zeros(size, dtype=np.float32)
+    randoms_det[:size] = np.bincount(testi1.flatten('F'), weights=randoms_flat, minlength=size) + np.bincount(testi2.flatten('F'), weights=randoms_flat, minlength=size)
+    hits_det[:size] = np.bincount(testi1.flatten('F'), minlength=size) + np.bincount(testi2.flatten('F'), minlength=size)
+    randoms_det = np.divide(randoms_det, hits_det, out=np.zeros_like(randoms_det), where=hits_det > 0)
+    mean_det = np.nanmean(randoms_det[hits_det > 0])
+    coeffs_detectors = np.zeros_like(randoms_det)
+    coeffs_detectors[hits_det > 0] = mean_det / randoms_det[hits_det > 0]
+    for k in range(sino_amount):
+        r1 = ring[k, 0]
+        r2 = ring[k, 1]
+        for i in range(options.Ndist):
+            for j in range(options.Nang):
+                d1 = det_num[i, j, 0] + (r1 - 1) * detectors_ring - 1
+                d2 = det_num[i, j, 1] + (r2 - 1) * detectors_ring - 1
+                coeff_matrix[i, j, k] = coeffs_detectors[d1] * coeffs_detectors[d2]
+    New_randoms = Randoms.astype(dtype=np.float32) * coeff_matrix
+    total_original = np.reshape(np.sum(np.sum(Randoms, axis=0), axis = 0), (1, 1, -1))
+    total_new = np.reshape(np.sum(np.sum(New_randoms, axis=0), axis = 0), (1, 1, -1))
+    New_randoms *= total_original / total_new
+    return New_randoms
+
+# Small scanner (True) or the Inveon geometry of PET_main_genericExample.py (False)
+smallGeometry = True
+
+options = proj.projectorClass()
+
+###########################################################################
+############################# SCANNER PROPERTIES ##########################
+###########################################################################
+
+### R-sectors/blocks in transaxial direction
+options.blocks_per_ring = (16)
+### R-sectors/modules/blocks in axial direction
+options.linear_multip = (2) if smallGeometry else (4)
+### Number of detectors on the side of R-sector/block/module (transaxial)
+options.cryst_per_block = (8) if smallGeometry else (20)
+### Number of detectors on the side of R-sector/block/module (axial)
+options.cryst_per_block_axial = 8 if smallGeometry else 20
+### Crystal pitch/size in x- and y-directions (transaxial) (mm)
+options.cr_p = 1.59
+### Crystal pitch/size in z-direction (axial) (mm)
+options.cr_pz = 1.59
+### Ring diameter (distance between perpendicular detectors) (mm)
+options.diameter = 80 if smallGeometry else 161
+### Transaxial FOV size (mm)
+options.FOVa_x = 40 if smallGeometry else 100
+options.FOVa_y = options.FOVa_x
+### Axial FOV (mm)
+options.axial_fov = 25 if smallGeometry else 127
+### Number of pseudo rings between physical rings
+options.pseudot = np.empty(0, dtype=np.float32)
+### Ring gaps
+options.ringGaps = np.empty(0, dtype=np.float32)
+### Number of detectors per ring (without pseudo detectors)
+options.det_per_ring = options.blocks_per_ring*options.cryst_per_block
+### Number of detectors per ring (with pseudo detectors)
+options.det_w_pseudo = options.blocks_per_ring*(options.cryst_per_block)
+### Number of crystal rings
+options.rings = options.linear_multip * options.cryst_per_block_axial
+### Total number of detectors
+options.detectors = options.det_per_ring*options.rings
+options.Nz = options.rings*2 - 1
+
+###########################################################################
+############################# SINOGRAM PROPERTIES #########################
+###########################################################################
+
+### Span factor/axial compression
+options.span = 3
+### Maximum ring difference
+options.ring_difference = options.rings - 1
+### Number of radial positions (views) in sinogram
+options.Ndist = 64 if smallGeometry else 128
+### Number of angles (tangential positions) in sinogram
+options.Nang = options.det_per_ring//2
+### Segment sizes
+options.segment_table = np.concatenate((np.array(options.rings*2-1,ndmin=1), np.arange(options.rings*2-1 - (options.span + 1), max(options.Nz - options.ring_difference*2, options.rings - options.ring_difference), -options.span*2)))
+options.segment_table = np.insert(np.repeat(options.segment_table[1:], 2), 0, options.segment_table[0])
+### Total number of sinograms
+options.TotSinos = np.sum(options.segment_table)
+options.NSinos = options.TotSinos
+options.verbose = 0
+
+# Number of time steps in the dynamic input
+Nt = 2
+# Mean number of randoms per sinogram bin
+mean = 0.5
+
+rng = np.random.default_rng(0)
+Randoms = rng.poisson(mean, (options.Ndist, options.Nang, options.TotSinos, Nt)).astype(np.float32)
+
+# Warm-up, i.e. the imports are not included in the timings
+Randoms_variance_reduction(Randoms[:, :, :, 0], options)
+
+alku = time.perf_counter()
+viite = referenceVarianceReduction(Randoms[:, :, :, 0], options)
+aikaR = time.perf_counter() - alku
+
+alku = time.perf_counter()
+tulos = Randoms_variance_reduction(Randoms[:, :, :, 0], options)
+aika1 = time.perf_counter() - alku
+
+alku = time.perf_counter()
+tulosD = Randoms_variance_reduction(Randoms, options)
+aikaD = time.perf_counter() - alku
+
+ero = np.max(np.abs(tulos - viite))
+print(f"Sinogram size {options.Ndist} x {options.Nang} x {options.TotSinos}, {options.detectors} detectors")
+print(f"Reference implementation: {aikaR:0.3f} s")
+print(f"Single frame: {aika1:0.3f} s (speedup {aikaR / aika1:0.1f}x)")
+print(f"{Nt} frames: {aikaD:0.3f} s ({aikaD / Nt:0.3f} s per frame)")
+print(f"Max abs difference to the reference: {ero:0.3e} (max value {np.max(viite):0.3f})")
+assert ero <= 1e-5 * np.max(viite), 'The output differs from the reference implementation!'
+assert np.array_equal(tulos, tulosD[:, :, :, 0]), 'The dynamic output differs from the single frame output!'
@@ -10,10 +10,10 @@ from .loadNikonData import loadNikonData
 from .loadSkyscanData import loadSkyscanData
 from .loadInterfile import loadInterfile
 from .loadSPECTInterfile import loadSPECTInterfile
-from .loadProjectionData import loadProjectionData
+from .loadProjectionData import loadProjectionData, loadProjectionDataChunks
 from .loadProjectionImages import loadProjectionImages
-from .loadData import loadROOT
-from .loadInveon import loadInveonData
+from .loadData import loadROOT, loadROOTFrames
+from .loadInveon import loadInveonData, inveonEvents, inveonSinograms, inveonListmodeBatches
 from .loadDICOMCTData import loadDICOMCTPD
 
-__all__ = ["loadGATESPECTData", "loadInterfile", "loadProjectionData", "loadProjectionImages", "loadROOT", "loadNikonData", "loadSkyscanData", "loadSPECTInterfile", "loadInveonData", "loadDICOMCTPD"]
\ No newline at end of file
+__all__ = ["loadGATESPECTData", "loadInterfile", "loadProjectionData", "loadProjectionDataChunks", "loadProjectionImages", "loadROOT", "loadROOTFrames", "loadNikonData", "loadSkyscanData", "loadSPECTInterfile", "loadInveonData", "inveonEvents", "inveonSinograms", "inveonListmodeBatches", "loadDICOMCTPD"]
\ No newline at end of file
@@ -273,4 +273,42 @@ def loadROOT(options, store_coordinates = False):
                 np.append(DtrIndex, DtrIndices);
                 np.append(DaxIndex, DaxIndices);
         print('File ' + rootFile + ' loaded')
-    return Sino, SinoT, SinoC, SinoR, SinoD, Fcoord, FDcoord, DtrIndex, DaxIndex
\ No newline at end of file
+    return Sino, SinoT, SinoC, SinoR, SinoD, Fcoord, FDcoord, DtrIndex, DaxIndex
+
+def loadROOTFrames(options, store_coordinates = False):
+    """
+    Generator version of loadROOT for dynamic data. Yields the output of
+    loadROOT, with the time step number in front, one time step at a time so
+    that only the sinograms of a single time step are in memory instead of
+    all the Nt time steps. The time steps are determined by options.start,
+    options.end and options.partitions as in loadROOT.
+
+    Note that the ROOT files are decoded by the C++ library, so the files are
+    read once for each time step.
+    """
+    import numpy as np
+    alku = options.start
+    loppu = options.end
+    end = options.end
+    partitions = options.partitions
+    if np.isinf(loppu):
+        loppu = 1e9
+    if isinstance(partitions, np.ndarray) and partitions.size > 1:
+        vali = np.array(partitions, dtype=np.float64)
+    else:
+        if isinstance(partitions, np.ndarray):
+            partitions = int(partitions[0].item())
+        vali = np.repeat((loppu - alku) / partitions, partitions)
+    aika = alku
+    try:
+        for t in range(vali.size):
+            options.start = aika
+            options.end = aika + vali[t].item()
+            options.partitions = 1
+            tulos = loadROOT(options, store_coordinates)
+            yield (t,) + tulos
+            aika += vali[t].item()
+    finally:
+        options.start = alku
+        options.end = end
+        options.partitions = vali
@@ -1,36 +1,32 @@
 # -*- coding: utf-8 -*-
 
+import numpy as np
 
-def loadInveonData(options, store_coordinates = False):
+# Inveon scanner constants, as in source/cpp/inveon.h
+DET_PER_RING = 320
+RINGS = 80
+# Time resolution of the elapsed time tag packets (s)
+TIME_TAG = 200e-6
+
+def inveonFile(options):
+    """Returns options.fpath if it exists, otherwise asks for the .lst file."""
     import os
-    import ctypes
-    import numpy as np
-    
-    if len(options.fpath) == 0:
-        import tkinter as tk
-        from tkinter.filedialog import askopenfilename
-        root = tk.Tk()
-        root.withdraw()
-        nimi = askopenfilename(title='Select Inveon list-mode datafile',filetypes=([('lst Files','*.lst')]))
-        if len(nimi) == 0:
-            raise ValueError("No file selected")
-    else:
-        if os.path.exists(options.fpath):
-            nimi = options.fpath
-        else:
-            import tkinter as tk
-            from tkinter.filedialog import askopenfilename
-            root = tk.Tk()
-            root.withdraw()
-            nimi = askopenfilename(title='Select Inveon list-mode datafile',filetypes=([('lst Files','*.lst')]))
-            if len(nimi) == 0:
-                raise ValueError("No file selected")
-            
-    totSinos = options.TotSinos;
-    if options.span == 1:
-        totSinos = options.rings**2
-    sinoSize = options.Ndist * options.Nang * totSinos
-    Nentries = os.path.getsize(nimi) // 6
+    if len(options.fpath) > 0 and os.path.exists(options.fpath):
+        return options.fpath
+    import tkinter as tk
+    from tkinter.filedialog import askopenfilename
+    root = tk.Tk()
+    root.withdraw()
+    nimi = askopenfilename(title='Select Inveon list-mode datafile',filetypes=([('lst Files','*.lst')]))
+    if len(nimi) == 0:
+        raise ValueError("No file selected")
+    return nimi
+
+def inveonPartitions(options):
+    """
+    Start and end times and the number of time steps. options.partitions is
+    converted into the lengths of the time steps (as float64).
+    """
     alku = options.start
     loppu = options.end
     if np.isinf(loppu):
@@ -46,6 +42,22 @@ def loadInveonData(options, store_coordinates = False):
         Nt = options.partitions
         vali = (loppu - alku) / options.partitions
         options.partitions = np.repeat(vali, options.partitions)
+    options.partitions = np.array(options.partitions, dtype=np.float64)
+    return alku, loppu, Nt
+
+def loadInveonData(options, store_coordinates = False):
+    import os
+    import ctypes
+    import numpy as np
+    
+    nimi = inveonFile(options)
+            
+    totSinos = options.TotSinos;
+    if options.span == 1:
+        totSinos = options.rings**2
+    sinoSize = options.Ndist * options.Nang * totSinos
+    Nentries = os.path.getsize(nimi) // 6
+    alku, loppu, Nt = inveonPartitions(options)
     Sino = np.zeros((options.Ndist, options.Nang, totSinos, Nt), dtype=np.uint16, order='F')
     if options.randoms_correction:
         SinoD = np.zeros((options.Ndist, options.Nang, totSinos, Nt), dtype=np.uint16, order='F')
@@ -75,7 +87,6 @@ def loadInveonData(options, store_coordinates = False):
         tPoints = np.zeros(Nentries, dtype=np.uint16)
     else:
         tPoints = np.zeros(1, dtype=np.uint16)
-    options.partitions = np.array(options.partitions, dtype=np.float64)
     tPointP = tPoints.ctypes.data_as(ctypes.POINTER(ctypes.c_uint16))
     segP = seg.ctypes.data_as(ctypes.POINTER(ctypes.c_uint32))
     SinoP = Sino.ctypes.data_as(ctypes.POINTER(ctypes.c_uint16))
@@ -212,4 +223,217 @@ def loadInveonData(options, store_coordinates = False):
                 DaxIndices = np.asfortranarray(np.concatenate((ring_number1.T, ring_number2.T), axis = 0))
         
                 
-    return Sino, SinoD, coordinate, Rcoordinate, DtrIndices, DaxIndices
\ No newline at end of file
+    return Sino, SinoD, coordinate, Rcoordinate, DtrIndices, DaxIndices
+
+def inveonEvents(options, chunkSize = 2**22):
+    """
+    Generator that reads the Inveon list-mode file in chunks of chunkSize
+    events from a memory-mapped file. Uses the same time window (options.start
+    and options.end) and time steps (options.partitions) as loadInveonData.
+    Only the memory of one chunk is needed, regardless of the file size.
+
+    Yields
+    ------
+    L1, L2 : NumPy arrays
+        Zero-based detector numbers of the coincidences.
+    tPoint : NumPy array
+        Zero-based time step of each coincidence.
+    prompt : NumPy array
+        True for prompts, False for delayed coincidences. Delayed
+        coincidences are included only if options.randoms_correction is True.
+    """
+    nimi = inveonFile(options)
+    alku, loppu, Nt = inveonPartitions(options)
+    yield from _inveonEvents(nimi, options, alku, loppu, Nt, chunkSize)
+
+def _inveonEvents(nimi, options, alku, loppu, Nt, chunkSize):
+    import os
+    # Same floating point summation order as in the C++ reader
+    rajat = np.cumsum(np.concatenate(([alku], options.partitions)))[1:]
+    Nentries = os.path.getsize(nimi) // 6
+    if Nentries == 0:
+        return
+    data = np.memmap(nimi, dtype=np.uint8, mode='r', shape=(Nentries, 6))
+    ms0 = 0.
+    for ind in range(0, Nentries, chunkSize):
+        raw = np.asarray(data[ind : ind + chunkSize])
+        # 48-bit little-endian packets
+        ew = raw[:, 0].astype(np.uint64)
+        for b in range(1, 6):
+            ew |= raw[:, b].astype(np.uint64) << np.uint64(8 * b)
+        tag = ((ew >> np.uint64(43)) & np.uint64(1)).astype(bool)
+        timeTag = tag & (((ew >> np.uint64(36)) & np.uint64(0xff)) == 160)
+        # Elapsed time before each packet
+        ms = np.cumsum(np.concatenate(([ms0], timeTag * TIME_TAG)))
+        ms0 = ms[-1].item()
+        ms = ms[:-1]
+        if Nt > 1:
+            tPoint = np.searchsorted(rajat, ms, side='right')
+            loppuInd = np.flatnonzero((ms > loppu) | (tPoint >= Nt))
+        else:
+            tPoint = np.zeros(ew.size, dtype=np.int64)
+            loppuInd = np.flatnonzero(ms > loppu)
+        lopeta = loppuInd.size > 0
+        if lopeta:
+            n = loppuInd[0]
+            ew = ew[:n]
+            tag = tag[:n]
+            ms = ms[:n]
+            tPoint = tPoint[:n]
+        prompt = ((ew >> np.uint64(42)) & np.uint64(1)).astype(bool)
+        L1 = ((ew >> np.uint64(19)) & np.uint64(0x1ffff)).astype(np.uint32)
+        L2 = (ew & np.uint64(0x1ffff)).astype(np.uint32)
+        valid = ~tag & (ms >= alku) & (L1 < options.detectors) & (L2 < options.detectors)
+        if not options.randoms_correction:
+            valid &= prompt
+        yield L1[valid], L2[valid], tPoint[valid], prompt[valid]
+        if lopeta:
+            break
+
+def inveonSinogramIndex(L1, L2, options, seg):
+    """
+    Vectorized version of saveSinogram in source/cpp/inveon.h. Returns the
+    sinogram index of each coincidence (L1, L2) and a mask of the accepted
+    coincidences. seg is the cumulative sum of options.segment_table.
+    """
+    L1 = L1.astype(np.int64)
+    L2 = L2.astype(np.int64)
+    Ndist = options.Ndist
+    nDistSide = options.ndist_side
+    ring_pos1 = L1 % DET_PER_RING
+    ring_pos2 = L2 % DET_PER_RING
+    ring_number1 = L1 // DET_PER_RING
+    ring_number2 = L2 // DET_PER_RING
+    xa = np.maximum(ring_pos1, ring_pos2)
+    ya = np.minimum(ring_pos1, ring_pos2)
+    j = ((xa + ya + DET_PER_RING // 2 + 1) % DET_PER_RING) // 2
+    b = j + DET_PER_RING // 2
+    i = np.abs(xa - ya - DET_PER_RING // 2)
+    i = np.where((ya < j) | (b < xa), -i, i)
+    swap = ((j * 2) < -i) | (i <= ((j - DET_PER_RING // 2) * 2))
+    if Ndist % 2 == 0:
+        accepted = (i <= (Ndist // 2 + min(0, nDistSide))) & (i >= (-(Ndist // 2) + max(0, nDistSide)))
+    else:
+        accepted = (i <= Ndist // 2) & (i >= -(Ndist // 2))
+    accepted &= np.abs(ring_number1 - ring_number2) <= options.ring_difference
+    j = j // (DET_PER_RING // 2 // options.Nang)
+    i = i + Ndist // 2 - max(0, nDistSide)
+    # Two swaps are equal to none
+    swap = swap != (ring_pos2 > ring_pos1)
+    ring1 = np.where(swap, ring_number2, ring_number1)
+    ring2 = np.where(swap, ring_number1, ring_number2)
+    if options.span <= 1:
+        sinoIndex = ring2 * RINGS + ring1
+    else:
+        span = options.span
+        erotus = ring1 - ring2
+        summa = ring1 + ring2
+        sinoIndex = ((np.abs(erotus) + (span // 2)) // span)
+        segInd = np.clip((sinoIndex - 1) * 2 + (erotus >= 0), 0, seg.size - 1)
+        sinoIndex = np.where(np.abs(erotus) <= span // 2, summa, (summa - ((span // 2) * (sinoIndex * 2 - 1) + sinoIndex)) + seg[segInd].astype(np.int64))
+    indeksi = i + j * Ndist + sinoIndex * Ndist * options.Nang
+    return indeksi, accepted
+
+def inveonSinograms(options, chunkSize = 2**22):
+    """
+    Generator that histograms the Inveon list-mode data into sinograms one
+    time step at a time, i.e. only one time step of the sinograms (and one
+    chunk of events) is kept in memory. This is the streaming version of
+    loadInveonData (without coordinates).
+
+    Yields
+    ------
+    tPoint : int
+        Zero-based time step.
+    Sino : NumPy array
+        Prompt sinogram (Ndist x Nang x totSinos) of the time step.
+    SinoD : NumPy array
+        Delayed coincidence sinogram, if options.randoms_correction is True,
+        otherwise a single zero.
+    """
+    totSinos = options.TotSinos
+    if options.span == 1:
+        totSinos = options.rings**2
+    sinoSize = options.Ndist * options.Nang * totSinos
+    seg = np.uint32(np.cumsum(options.segment_table))
+    nimi = inveonFile(options)
+    alku, loppu, Nt = inveonPartitions(options)
+    Sino = np.zeros(sinoSize, dtype=np.uint16)
+    if options.randoms_correction:
+        SinoD = np.zeros(sinoSize, dtype=np.uint16)
+    else:
+        SinoD = np.zeros(1, dtype=np.uint16)
+    def koko(S):
+        if S.size > 1:
+            return S.reshape((options.Ndist, options.Nang, totSinos), order='F')
+        return S
+    nykyinen = 0
+    for L1, L2, tPoint, prompt in _inveonEvents(nimi, options, alku, loppu, Nt, chunkSize):
+        indeksi, accepted = inveonSinogramIndex(L1, L2, options, seg)
+        for t in np.unique(tPoint):
+            while nykyinen < t:
+                yield nykyinen, koko(Sino), koko(SinoD)
+                Sino = np.zeros_like(Sino)
+                SinoD = np.zeros_like(SinoD)
+                nykyinen += 1
+            ind = (tPoint == t) & accepted
+            u, counts = np.unique(indeksi[ind & prompt], return_counts=True)
+            Sino[u] += counts.astype(np.uint16)
+            if options.randoms_correction:
+                u, counts = np.unique(indeksi[ind & ~prompt], return_counts=True)
+                SinoD[u] += counts.astype(np.uint16)
+    while nykyinen < Nt:
+        yield nykyinen, koko(Sino), koko(SinoD)
+        Sino = np.zeros_like(Sino)
+        SinoD = np.zeros_like(SinoD)
+        nykyinen += 1
+
+def inveonListmodeBatches(options, chunkSize = 2**22):
+    """
+    Generator that emits the Inveon list-mode events in batches for list-mode
+    reconstruction. Each batch contains events from a single time step. The
+    coordinates are in the same format as the output of loadInveonData with
+    store_coordinates = True, i.e. 6 x number of events, or, if
+    options.useIndexBasedReconstruction is True, the transaxial and axial
+    detector indices (2 x number of events).
+
+    Yields
+    ------
+    tPoint : int
+        Zero-based time step.
+    coordinate : NumPy array or tuple
+        Prompt coordinates, or (trIndex, axIndex) with index-based
+        reconstruction.
+    Rcoordinate : NumPy array or tuple
+        Same for delayed coincidences, None if options.randoms_correction is
+        False.
+    """
+    from omegatomo.projector.detcoord import detectorCoordinates
+    if not options.useIndexBasedReconstruction:
+        x, y = detectorCoordinates(options)
+        z_length = options.rings * options.cr_pz
+        z = np.linspace(0, z_length, options.rings + 1, dtype=np.float32)
+        z = z[1:] - z[1] / 2
+        z = z - options.axial_fov / 2 + (options.axial_fov - options.cr_pz * options.rings) / 2
+        x = x.astype(np.float32)
+        y = y.astype(np.float32)
+    def koordinaatit(LL1, LL2):
+        ring_number1 = LL1 // options.det_per_ring
+        ring_number2 = LL2 // options.det_per_ring
+        ring_pos1 = LL1 % options.det_per_ring
+        ring_pos2 = LL2 % options.det_per_ring
+        if options.useIndexBasedReconstruction:
+            return (np.asfortranarray(np.vstack((ring_pos1, ring_pos2)).astype(np.uint16)), np.asfortranarray(np.vstack((ring_number1, ring_number2)).astype(np.uint16)))
+        return np.array([x[ring_pos1], y[ring_pos1], z[ring_number1], x[ring_pos2], y[ring_pos2], z[ring_number2]], order='F')
+    for L1, L2, tPoint, prompt in inveonEvents(options, chunkSize):
+        # Larger detector number first, as in loadInveonData
+        LL1 = np.maximum(L1, L2)
+        LL2 = np.minimum(L1, L2)
+        for t in np.unique(tPoint):
+            ind = tPoint == t
+            coordinate = koordinaatit(LL1[ind & prompt], LL2[ind & prompt])
+            if options.randoms_correction:
+                Rcoordinate = koordinaatit(LL1[ind & ~prompt], LL2[ind & ~prompt])
+            else:
+                Rcoordinate = None
+            yield t.item(), coordinate, Rcoordinate
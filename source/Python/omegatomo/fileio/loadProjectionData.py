@@ -5,25 +5,30 @@ Created on Thu Mar  7 13:29:39 2024
 @author: Ville-Veikko Wettenhovi
 """
 
+import numpy as np
 
 
-def loadProjectionData(ftype, fpath = '', dims = None, binning = 1, headerBytes = 0, loadAll = True):
-    import numpy as np
+def atoi(text):
+    return int(text) if text.isdigit() else text
+
+def natural_keys(text):
+    '''
+    alist.sort(key=natural_keys) sorts in human order
+    http://nedbatchelder.com/blog/200712/human_sorting.html
+    (See Toothy's implementation in the comments)
+    '''
+    import re
+    return [ atoi(c) for c in re.split(r'(\d+)', text) ]
+
+def projectionFiles(fpath = '', loadAll = True):
+    """
+    Returns the (naturally sorted) list of the projection files that have the
+    same suffix as fpath and are in the same directory. If loadAll is False,
+    only fpath is returned. If fpath is empty or does not exist, the user is
+    asked to select the (first) projection image.
+    """
     import os
     import glob
-    import re
-    if dims == None:
-        dims = np.zeros(3, dtype=np.uint64)
-    def atoi(text):
-        return int(text) if text.isdigit() else text
-    
-    def natural_keys(text):
-        '''
-        alist.sort(key=natural_keys) sorts in human order
-        http://nedbatchelder.com/blog/200712/human_sorting.html
-        (See Toothy's implementation in the comments)
-        '''
-        return [ atoi(c) for c in re.split(r'(\d+)', text) ]
     if len(fpath) == 0:
         import tkinter as tk
         from tkinter.filedialog import askopenfilename
@@ -42,67 +47,136 @@ def loadProjectionData(ftype, fpath = '', dims = None, binning = 1, headerBytes
             fpath = askopenfilename(title='Select projection image')
             if not fpath:
                 raise ValueError('No file was selected')
+    if not loadAll:
+        return [fpath]
     filename, suffix = os.path.splitext(fpath)
-    fpath, file = os.path.split(fpath)
+    hakemisto = os.path.split(fpath)[0]
     if len(suffix) == 0:
-        flist = glob.glob(fpath + '/*')
-    else:
-        flist = glob.glob(fpath + '/*' + suffix)
-    if headerBytes >=0:
-        A = np.fromfile(fpath + "/" + file, dtype = ftype, offset=headerBytes)
+        flist = glob.glob(os.path.join(hakemisto, '*'))
     else:
-        fsize = os.path.getsize(fpath + "/" + file)
-        dt = np.dtype(ftype)
+        flist = glob.glob(os.path.join(hakemisto, '*' + suffix))
+    flist.sort(key=natural_keys)
+    return flist
+
+def mapProjection(nimi, ftype, headerBytes = 0):
+    """
+    Memory-maps the raw projection file nimi as a 1D array of type ftype. If
+    headerBytes > 0, that many bytes are skipped from the beginning, if
+    headerBytes < 0, abs(headerBytes) bytes are ignored from the end.
+    """
+    import os
+    dt = np.dtype(ftype)
+    fsize = os.path.getsize(nimi)
+    if headerBytes >= 0:
+        offset = headerBytes
         nRead = (fsize - headerBytes) // dt.itemsize
-        A = np.fromfile(fpath + "/" + file, dtype = ftype, count=nRead)
-    if loadAll == True:
-        nFiles = len(flist)
-        if dims[0].item() > 0 and dims[1].item() > 0 and dims[2].item() > 0:
-            projData = np.zeros((dims[0].item(),dims[1].item(),dims[2].item()), dtype=ftype)
-        else:
-            projData = np.zeros((np.size(A)*nFiles/binning**2, 1), dtype=ftype)
-        flist.sort(key=natural_keys)
     else:
-        nFiles = 1
-        if binning > 1:
-            if dims[0].item() > 0 and dims[1].item() > 0 and dims[2].item() > 0:
-                projData = np.zeros((dims[0].item(),dims[1].item(),dims[2].item()), dtype=ftype)
-            else:
-                projData = np.zeros((np.size(A)*nFiles/binning**2, 1), dtype=ftype)
-    for ll in range(nFiles):
-        if nFiles > 1:
-            file = flist[ll]
-            if headerBytes >=0:
-                A = np.fromfile(file, dtype = ftype, offset=headerBytes)
-            else:
-                fsize = os.path.getsize(fpath + "/" + file)
-                dt = np.dtype(ftype)
-                nRead = (fsize - headerBytes) // dt.itemsize
-                A = np.fromfile(file, dtype = ftype, count=nRead)
-        if dims[0].item() > 0 and dims[1].item() > 0:
-            if nFiles == 1:
-                A = np.reshape(A, (dims[0].item() * binning, dims[1].item() * binning, dims[2].item()))
-            else:
-                A = np.reshape(A, (dims[0].item() * binning, dims[1].item() * binning))
-        if dims[0].item() > 0 and dims[1].item() > 0:
-            if nFiles == 1:
-                if binning > 1:
-                    for kk in range(dims[2].item()):
-                        B = np.sum(np.reshape(A[:,:,kk],(binning,-1)),axis=0)
-                        B = np.squeeze(np.sum(np.reshape(B,(A.shape[0]//binning,binning,-1)),axis=1))
-                        projData[:,:,kk] = B.astype(ftype)
-                else:
-                    projData = A
-            else:
-                if binning > 1:
-                    B = np.sum(np.reshape(A,(binning,-1)),axis=0)
-                    B = np.squeeze(np.sum(np.reshape(B,(A.shape[0]//binning,binning,-1)),axis=1))
-                    projData[:,:,ll] = B.astype(ftype)
-                else:
-                    projData[:,:,ll] = A.astype(ftype)
+        offset = 0
+        nRead = (fsize + headerBytes) // dt.itemsize
+    return np.memmap(nimi, dtype=dt, mode='r', offset=offset, shape=(nRead,))
+
+def binProjections(A, binning, ftype):
+    """
+    Bins the (rows x columns [x projections]) projection data A by summing
+    binning x binning elements together. Same as the earlier slice-by-slice
+    binning, i.e. element (i, j) is the sum of the elements
+    (i + k * rows / binning, j + l * columns / binning), but done as a single
+    strided reduction.
+    """
+    if binning <= 1:
+        return A.astype(ftype, copy=False)
+    B = np.reshape(A, (binning, A.shape[0] // binning, binning, A.shape[1] // binning) + A.shape[2:])
+    return np.sum(B, axis=(0, 2)).astype(ftype, copy=False)
+
+def _numThreads(nThreads):
+    # The default number of threads is the number of CPUs
+    if nThreads is None:
+        import os
+        return os.cpu_count() or 1
+    return nThreads
+
+def _readProjections(flist, ftype, dims, binning, headerBytes, out, alku, nThreads):
+    # Reads and bins the files in flist into out[:, :, alku:alku + len(flist)]
+    koko = (dims[0] * binning, dims[1] * binning)
+    def lue(ll):
+        A = mapProjection(flist[ll], ftype, headerBytes)
+        out[:, :, alku + ll] = binProjections(np.reshape(A, koko), binning, ftype)
+    if len(flist) == 1 or nThreads == 1:
+        for ll in range(len(flist)):
+            lue(ll)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=_numThreads(nThreads)) as executor:
+            list(executor.map(lue, range(len(flist))))
+
+def _dimensions(dims):
+    # Dimensions as a list of three Python ints, zero if unknown
+    if dims is None:
+        return [0, 0, 0]
+    dims = [int(d) for d in np.asarray(dims).ravel()]
+    return dims + [0] * (3 - len(dims))
+
+def loadProjectionData(ftype, fpath = '', dims = None, binning = 1, headerBytes = 0, loadAll = True, nThreads = None):
+    """
+    Loads raw projection images. Either a single file containing all the
+    projections or all the files with the same suffix in the same directory
+    (loadAll = True) are loaded. The files are memory-mapped and read in
+    parallel with nThreads threads (default is the number of CPUs).
+
+    dims are the (binned) dimensions [rows, columns, projections] of the
+    output. If the rows and columns are not given, the data is returned as a
+    1D array and no binning is performed. headerBytes is the number of bytes
+    skipped from the beginning (> 0) or from the end (< 0) of each file.
+    """
+    dims = _dimensions(dims)
+    flist = projectionFiles(fpath, loadAll)
+    nFiles = len(flist)
+    if dims[0] > 0 and dims[1] > 0:
+        if nFiles == 1:
+            A = mapProjection(flist[0], ftype, headerBytes)
+            A = np.reshape(A, (dims[0] * binning, dims[1] * binning, -1 if dims[2] == 0 else dims[2]))
+            if binning > 1:
+                return binProjections(A, binning, ftype)
+            return np.array(A, dtype=ftype)
+        projData = np.zeros((dims[0], dims[1], nFiles), dtype=ftype)
+        _readProjections(flist, ftype, dims, binning, headerBytes, projData, 0, nThreads)
+        return projData
+    else:
+        # Unknown dimensions, preallocate the 1D output from the file sizes
+        A = [mapProjection(nimi, ftype, headerBytes) for nimi in flist]
+        rajat = np.cumsum([0] + [a.size for a in A])
+        projData = np.empty(rajat[-1], dtype=ftype)
+        def lue(ll):
+            projData[rajat[ll]:rajat[ll + 1]] = A[ll]
+        if nFiles == 1 or nThreads == 1:
+            for ll in range(nFiles):
+                lue(ll)
         else:
-            if ll == 0:
-                projData = A.astype(ftype)
-            else:
-                projData = np.append(projData, A.astype(ftype))
-    return projData
\ No newline at end of file
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=_numThreads(nThreads)) as executor:
+                list(executor.map(lue, range(nFiles)))
+        return projData
+
+def loadProjectionDataChunks(ftype, fpath = '', dims = None, binning = 1, headerBytes = 0, loadAll = True, chunkSize = 64, nThreads = None):
+    """
+    Generator version of loadProjectionData. Yields (alku, projData) tuples,
+    where projData contains (at most) chunkSize binned projections as a
+    dims[0] x dims[1] x chunkSize array and alku is the index of the first
+    projection of the chunk. The rows and columns (dims[0] and dims[1]) have
+    to be known. Only the current chunk is held in memory.
+    """
+    dims = _dimensions(dims)
+    if dims[0] <= 0 or dims[1] <= 0:
+        raise ValueError('The number of rows and columns (dims) need to be specified')
+    flist = projectionFiles(fpath, loadAll)
+    if len(flist) == 1:
+        A = mapProjection(flist[0], ftype, headerBytes)
+        A = np.reshape(A, (dims[0] * binning, dims[1] * binning, -1 if dims[2] == 0 else dims[2]))
+        for alku in range(0, A.shape[2], chunkSize):
+            yield alku, binProjections(A[:, :, alku : alku + chunkSize], binning, ftype)
+    else:
+        for alku in range(0, len(flist), chunkSize):
+            files = flist[alku : alku + chunkSize]
+            projData = np.zeros((dims[0], dims[1], len(files)), dtype=ftype)
+            _readProjections(files, ftype, dims, binning, headerBytes, projData, 0, nThreads)
+            yield alku, projData
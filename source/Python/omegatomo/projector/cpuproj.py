@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 19:02:47 2026
+
+Forward and backward projections of projectorClass with the OpenMP CPU library
+(CPU_matrixfree_lib). The projector is created only once, from options.param
+(see transferData in recomain.py), and kept in the library for the lifetime of
+the projectorClass object. Each projection only passes the pointers of the
+NumPy input and output arrays to the library, i.e. no data is copied. As with
+omegaMain, the arrays referenced by options.param (x, z, nMeas, etc.) must not
+be replaced after initProjector.
+"""
+
+import ctypes
+import os
+import weakref
+import numpy as np
+
+def cpuLibraryName():
+    fPath = os.path.dirname( __file__ )
+    if os.path.exists(os.path.join(fPath, '..', 'util', 'usingPyPi.py')):
+        libdir = os.path.join(os.path.abspath(os.path.join(fPath, '..')), "libs")
+    else:
+        libdir = os.path.abspath(os.path.join(fPath, '..', '..'))
+    if os.name == 'nt':
+        return str(os.path.join(libdir, "CPU_matrixfree_lib.dll"))
+    return str(os.path.join(libdir, "CPU_matrixfree_lib.so"))
+
+def initCPUProjector(self):
+    """
+    Checks that the selected options are supported by the per-call CPU
+    projector and creates the projector in the CPU library. Called from
+    initProjector instead of the kernel compilation when useCPU is True.
+    """
+    from omegatomo.reconstruction.recomain import transferData, loadLibrary
+    if self.use_psf:
+        raise ValueError('PSF is not supported with the CPU projector!')
+    if self.projector_type == 6:
+        raise ValueError('Projector type 6 is not supported with the CPU projector!')
+    transferData(self)
+    c_lib = loadLibrary(cpuLibraryName())
+    c_lib.omegaCPUProjectorCreate.restype = ctypes.c_void_p
+    c_lib.omegaCPUForwardProject.restype = ctypes.c_int
+    c_lib.omegaCPUBackwardProject.restype = ctypes.c_int
+    if getattr(self, 'cpuProjector', None) is not None:
+        self.cpuProjector()
+    handle = c_lib.omegaCPUProjectorCreate(self.param)
+    if not handle:
+        raise ValueError('Failed to create the CPU projector!')
+    self.cpuLib = c_lib
+    self.cpuHandle = ctypes.c_void_p(handle)
+    self.cpuSettings = (self.BPAccumulation, self.CPUThreads)
+    # Frees the projector when the projectorClass object is deleted or the projector is re-initialized
+    self.cpuProjector = weakref.finalize(self, c_lib.omegaCPUProjectorFree, self.cpuHandle)
+
+def subsetLength(self, subset):
+    """
+    Number of measurements in the current subset.
+    """
+    n = (self.nMeas[subset + 1] - self.nMeas[subset]).item()
+    if (self.CT or self.PET or self.SPECT) and self.listmode == 0:
+        n *= self.nRowsD * self.nColsD
+    return n * self.TOF_bins_used
+
+def floatPointer(arr):
+    return arr.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+
+def updateSettings(self):
+    """
+    Passes BPAccumulation and CPUThreads to the projector if they have been
+    changed after initProjector.
+    """
+    uusi = (self.BPAccumulation, self.CPUThreads)
+    if uusi != self.cpuSettings:
+        if self.BPAccumulation not in [0, 1]:
+            raise ValueError('BPAccumulation has to be either 0 (atomic operations) or 1 (per-thread images)!')
+        self.cpuLib.omegaCPUProjectorSettings(self.cpuHandle, ctypes.c_uint32(int(self.BPAccumulation)), ctypes.c_uint32(int(self.CPUThreads)))
+        self.cpuSettings = uusi
+
+def forwardProjectionCPU(self, f, subset):
+    if isinstance(f, list):
+        nVol = len(f)
+    else:
+        nVol = 1
+        f = [f]
+    updateSettings(self)
+    y = np.zeros(subsetLength(self, subset), dtype=np.float32)
+    for k in range(nVol):
+        fk = np.asarray(f[k], dtype=np.float32).ravel('F')
+        if fk.size != self.N[k]:
+            raise ValueError('The size of the input image (' + str(fk.size) + ') does not match the image size (' + str(self.N[k]) + ')!')
+        status = self.cpuLib.omegaCPUForwardProject(self.cpuHandle, floatPointer(fk), floatPointer(y), ctypes.c_uint32(subset), ctypes.c_uint32(0), ctypes.c_uint32(k))
+        if status != 0:
+            raise ValueError('CPU forward projection failed!')
+    return y
+
+def backwardProjectionCPU(self, y, subset):
+    updateSettings(self)
+    nMeas = subsetLength(self, subset)
+    y = np.asarray(y, dtype=np.float32).ravel('F')
+    if y.size != nMeas:
+        raise ValueError('The size of the input measurement vector (' + str(y.size) + ') does not match the number of measurements in the current subset (' + str(nMeas) + ')!')
+    f = [None] * (self.nMultiVolumes + 1)
+    for k in range(self.nMultiVolumes + 1):
+        f[k] = np.zeros(int(self.N[k]), dtype=np.float32)
+        status = self.cpuLib.omegaCPUBackwardProject(self.cpuHandle, floatPointer(y), floatPointer(f[k]), ctypes.c_uint32(subset), ctypes.c_uint32(0), ctypes.c_uint32(k))
+        if status != 0:
+            raise ValueError('CPU backprojection failed!')
+    if self.nMultiVolumes > 0:
+        return f
+    return f[0]
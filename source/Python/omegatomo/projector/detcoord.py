@@ -323,11 +323,79 @@ def getCoordinatesSPECT(options: proj.projectorClass) -> Tuple[np.ndarray, np.nd
 
     return np.asfortranarray(x), np.asfortranarray(z)
     
+# Memoized detector and sinogram coordinates, keyed by the scanner geometry
+_coordinateCache = {}
+_maxCached = 8
+
+def _geometryKey(nimi, *args):
+    # Hashable key from the function name and the (scalar or array) parameters
+    import hashlib
+    key = [nimi]
+    for arg in args:
+        apu = np.asarray(arg)
+        if apu.size > 16:
+            key.append((apu.dtype.str, apu.shape, hashlib.sha1(np.ascontiguousarray(apu).tobytes()).hexdigest()))
+        else:
+            key.append(tuple(apu.ravel().tolist()))
+    return tuple(key)
+
+def coordinateCacheFile(key):
+    """
+    Returns the on-disk cache file of the coordinates with the geometry key
+    key. The cache directory can be set with the environment variable
+    OMEGA_COORDINATE_CACHE_DIR (default ~/.cache/omega/coordinates).
+    """
+    import os
+    import hashlib
+    path = os.environ.get('OMEGA_COORDINATE_CACHE_DIR', '')
+    if len(path) == 0:
+        path = os.path.join(os.path.expanduser('~'), '.cache', 'omega', 'coordinates')
+    return os.path.join(path, key[0] + '_' + hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + '.npz')
+
+def _loadCoordinates(key):
+    # Coordinates from the on-disk cache, None if not found
+    try:
+        with np.load(coordinateCacheFile(key)) as data:
+            return tuple(data['arr_' + str(ii)] for ii in range(len(data.files)))
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _saveCoordinates(key, arvot):
+    # Errors are ignored, i.e. the coordinates are just recomputed next time
+    import os
+    fName = coordinateCacheFile(key)
+    try:
+        os.makedirs(os.path.dirname(fName), exist_ok=True)
+        # Write to a temporary file first so that concurrent jobs never see partial files
+        tmp = fName[:-4] + '.' + str(os.getpid()) + '.tmp.npz'
+        np.savez(tmp, *arvot)
+        os.replace(tmp, fName)
+    except OSError:
+        pass
+
+def _memoized(key, func, options, *args):
+    # Returns copies of the cached outputs of func(options, *args). With
+    # options.useCoordinateCache, the outputs are also stored on disk
+    if key not in _coordinateCache:
+        useDisk = getattr(options, 'useCoordinateCache', False)
+        arvot = _loadCoordinates(key) if useDisk else None
+        if arvot is None:
+            arvot = func(options, *args)
+            if useDisk:
+                _saveCoordinates(key, arvot)
+        if len(_coordinateCache) >= _maxCached:
+            _coordinateCache.pop(next(iter(_coordinateCache)))
+        _coordinateCache[key] = arvot
+    return tuple(np.copy(apu) for apu in _coordinateCache[key])
+
 def detectorCoordinates(options):
     """
     Transaxial PET coordinates. This function mainly just calls the below one 
     with specific options. Also, the detector space rotation is done here if
-    selected.
+    selected. The coordinates are memoized, i.e. repeated calls with the
+    same scanner geometry return (copies of) the previously computed values.
+    With options.useCoordinateCache, they are also stored on disk and reused
+    across jobs.
 
     Parameters
     ----------
@@ -342,6 +410,15 @@ def detectorCoordinates(options):
         y-direction coordinates for detector/detector pairs.
 
     """
+    if options.nLayers > 1:
+        crystH = options.crystH
+    else:
+        crystH = 0
+    key = _geometryKey('detectorCoordinates', options.cr_p, options.diameter, options.cryst_per_block, options.blocks_per_ring, options.DOI, options.transaxial_multip,
+                       options.det_w_pseudo, options.det_per_ring, options.nLayers, crystH, options.flip_image, options.offangle)
+    return _memoized(key, _detectorCoordinates, options)
+
+def _detectorCoordinates(options):
     cr_p = options.cr_p
     diameter = options.diameter
     if isinstance(options.cryst_per_block, np.ndarray):
@@ -446,112 +523,60 @@ def computeCoordinates(options, blocks_per_ring, transaxial_multip, cryst_per_bl
     alkupistex = diameter / 2.
     alkupistey = -((cryst_per_block_orig) / 2. + 0.5) * cr_p
     
-    ii = 0
-    x = np.zeros(((blocks_per_ring * transaxial_multip) * (cryst_per_block)), dtype=np.float32)
-    y = np.zeros(((blocks_per_ring * transaxial_multip) * (cryst_per_block)), dtype=np.float32)
+    nBlocks = blocks_per_ring * transaxial_multip
+    x = np.zeros((nBlocks * (cryst_per_block)), dtype=np.float32)
+    y = np.zeros((nBlocks * (cryst_per_block)), dtype=np.float32)
+    
+    def blockCoordinates(alkupistex, alkupistey, blocks):
+        # Coordinates of each crystal in the given blocks, starting from the
+        # point (alkupistex, alkupistey). Each crystal is one step from the
+        # previous one, i.e. the coordinates are cumulative sums of the steps
+        c = np.cos(np.radians(angle[blocks])).reshape(-1, 1)
+        sn = np.sin(np.radians(angle[blocks])).reshape(-1, 1)
+        dx = np.repeat(cr_p * c, cryst_per_block, axis=1)
+        dy = np.repeat(cr_p * sn, cryst_per_block, axis=1)
+        # The first crystal of a block includes the gap between the blocks
+        ind = blocks > 0
+        cp = np.cos(np.radians(angle[blocks[ind] - 1]))
+        sp = np.sin(np.radians(angle[blocks[ind] - 1]))
+        dx[ind, 0] = (cr_p * 0.5) * c[ind, 0] + erotus * cp + erotus * c[ind, 0] + (cr_p * 0.5) * cp
+        dy[ind, 0] = (cr_p * 0.5) * sn[ind, 0] + erotusy * sp + erotusy * sn[ind, 0] + (cr_p * 0.5) * sp
+        # Pseudo detector after the last crystal of each block
+        dx[1:, 0] -= (cr_p) * c[:-1, 0] * extraVar
+        dy[1:, 0] -= (cr_p) * sn[:-1, 0] * extraVar
+        # Accumulated in single precision, as the crystal coordinates
+        xb = np.cumsum(np.concatenate(([alkupistex], -dx.ravel())), dtype=np.float32)[1:]
+        yb = np.cumsum(np.concatenate(([alkupistey], dy.ravel())), dtype=np.float32)[1:]
+        return (xb, yb, xb[-1] + (cr_p) * c[-1, 0] * extraVar, yb[-1] - (cr_p) * sn[-1, 0] * extraVar)
     
     # Compute the detector coordinates of each detector (crystal) in each block
     # Only for the 1/4th of the ring
-    for blocks in range(0, math.ceil((blocks_per_ring * transaxial_multip) / 4)):
-        for crystals in range(1, cryst_per_block + 1):
-            if blocks > 0 and crystals == 1:
-                x[ii] = alkupistex - (cr_p * 0.5) * np.cos(np.radians(angle[blocks])) - erotus * np.cos(
-                    np.radians(angle[blocks - 1])) - erotus * np.cos(np.radians(angle[blocks])) - (
-                                cr_p * 0.5) * np.cos(np.radians(angle[blocks - 1]))
-                y[ii] = alkupistey + (cr_p * 0.5) * np.sin(np.radians(angle[blocks])) + erotusy * np.sin(
-                    np.radians(angle[blocks - 1])) + erotusy * np.sin(np.radians(angle[blocks])) + (
-                                cr_p * 0.5) * np.sin(np.radians(angle[blocks - 1]))
-            else:
-                x[ii] = alkupistex - (cr_p) * np.cos(np.radians(angle[blocks]))
-                y[ii] = alkupistey + (cr_p) * np.sin(np.radians(angle[blocks]))
-    
-            if crystals == cryst_per_block:
-                alkupistex = x[ii] + (cr_p) * np.cos(np.radians(angle[blocks])) * extraVar
-                alkupistey = y[ii] - (cr_p) * np.sin(np.radians(angle[blocks])) * extraVar
-            else:
-                alkupistex = x[ii]
-                alkupistey = y[ii]
-            ii += 1
+    blocks = np.arange(0, math.ceil(nBlocks / 4))
+    xb, yb, alkupistex, alkupistey = blockCoordinates(alkupistex, alkupistey, blocks)
+    ii = xb.size
+    x[:ii] = xb
+    y[:ii] = yb
     
+    if usePseudo:
+        # The rest of the blocks
+        xb, yb, alkupistex, alkupistey = blockCoordinates(alkupistex, alkupistey, np.arange(blocks[-1] + 1, nBlocks))
+        x[ii:] = xb
+        y[ii:] = yb
     # Symmetry of the coordinates
-    if (blocks_per_ring * transaxial_multip) % 4 == 0:
-        blocks += 1
-        x[ii] = alkupistex - (cr_p * 0.5) * np.cos(np.radians(angle[blocks])) - erotus * np.cos(
-            np.radians(angle[blocks - 1])) - erotus * np.cos(np.radians(angle[blocks])) - (cr_p * 0.5) * np.cos(
-            np.radians(angle[blocks - 1]))
-        y[ii] = alkupistey + (cr_p * 0.5) * np.sin(np.radians(angle[blocks])) + erotusy * np.sin(
-            np.radians(angle[blocks - 1])) + erotusy * np.sin(np.radians(angle[blocks])) + (cr_p * 0.5) * np.sin(
-            np.radians(angle[blocks - 1]))
-        alkupistex = x[ii]
-        alkupistey = y[ii]
-        ii += 1
-    
-        for ll in range(2, cryst_per_block + 1):
-            x[ii] = alkupistex - (cr_p) * np.cos(np.radians(angle[blocks]))
-            y[ii] = alkupistey + (cr_p) * np.sin(np.radians(angle[blocks]))
-            alkupistex = x[ii]
-            alkupistey = y[ii]
-            ii += 1
-    
-        if usePseudo:
-            ii -= 1
-            alkupistex = x[ii] + (cr_p) * np.cos(np.radians(angle[blocks])) * extraVar
-            alkupistey = y[ii] - (cr_p) * np.sin(np.radians(angle[blocks])) * extraVar
-            alkublock = blocks + 1
-            ii += 1
-            for blocks in range(alkublock, blocks_per_ring * transaxial_multip + 1):
-                for crystals in range(1, cryst_per_block + 1):
-                    if blocks > 0 and crystals == 1:
-                        x[ii] = alkupistex - (cr_p * 0.5) * np.cos(np.radians(angle[blocks])) - erotus * np.cos(
-                            np.radians(angle[blocks - 1])) - erotus * np.cos(np.radians(angle[blocks])) - (
-                                        cr_p * 0.5) * np.cos(np.radians(angle[blocks - 1]))
-                        y[ii] = alkupistey + (cr_p * 0.5) * np.sin(np.radians(angle[blocks])) + erotusy * np.sin(
-                            np.radians(angle[blocks - 1])) + erotusy * np.sin(np.radians(angle[blocks])) + (
-                                        cr_p * 0.5) * np.sin(np.radians(angle[blocks - 1]))
-                    else:
-                        x[ii] = alkupistex - (cr_p) * np.cos(np.radians(angle[blocks]))
-                        y[ii] = alkupistey + (cr_p) * np.sin(np.radians(angle[blocks]))
-    
-                    if crystals == cryst_per_block:
-                        alkupistex = x[ii] + (cr_p) * np.cos(np.radians(angle[blocks])) * extraVar
-                        alkupistey = y[ii] - (cr_p) * np.sin(np.radians(angle[blocks])) * extraVar
-                    else:
-                        alkupistex = x[ii]
-                        alkupistey = y[ii]
-                    ii += 1
-        else:
-            x[ii:ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4] = -(np.flip(x[:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4]))
-            y[ii:ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4] = (np.flip(y[:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4]))
-            x[ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4:] = np.flip(x[cryst_per_block:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 2])
-            y[ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4:] = -(y[cryst_per_block:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 2])
+    elif nBlocks % 4 == 0:
+        xb, yb, alkupistex, alkupistey = blockCoordinates(alkupistex, alkupistey, blocks[-1:] + 1)
+        x[ii : ii + xb.size] = xb
+        y[ii : ii + xb.size] = yb
+        ii += xb.size
+        x[ii:ii + (nBlocks * cryst_per_block) // 4] = -(np.flip(x[:(nBlocks * cryst_per_block) // 4]))
+        y[ii:ii + (nBlocks * cryst_per_block) // 4] = (np.flip(y[:(nBlocks * cryst_per_block) // 4]))
+        x[ii + (nBlocks * cryst_per_block) // 4:] = np.flip(x[cryst_per_block:(nBlocks * cryst_per_block) // 2])
+        y[ii + (nBlocks * cryst_per_block) // 4:] = -(y[cryst_per_block:(nBlocks * cryst_per_block) // 2])
     else:
-        if usePseudo:
-            alkublock = blocks + 1
-            for blocks in range(alkublock, blocks_per_ring * transaxial_multip + 1):
-                for crystals in range(1, cryst_per_block + 1):
-                    if blocks > 0 and crystals == 1:
-                        x[ii] = alkupistex - (cr_p * 0.5) * np.cos(np.radians(angle[blocks])) - erotus * np.cos(
-                            np.radians(angle[blocks - 1])) - erotus * np.cos(np.radians(angle[blocks])) - (
-                                        cr_p * 0.5) * np.cos(np.radians(angle[blocks - 1]))
-                        y[ii] = alkupistey + (cr_p * 0.5) * np.sin(np.radians(angle[blocks])) + erotusy * np.sin(
-                            np.radians(angle[blocks - 1])) + erotusy * np.sin(np.radians(angle[blocks])) + (
-                                        cr_p * 0.5) * np.sin(np.radians(angle[blocks - 1]))
-                    else:
-                        x[ii] = alkupistex - (cr_p) * np.cos(np.radians(angle[blocks]))
-                        y[ii] = alkupistey + (cr_p) * np.sin(np.radians(angle[blocks]))
-    
-                    if crystals == cryst_per_block:
-                        alkupistex = x[ii] + (cr_p) * np.cos(np.radians(angle[blocks])) * extraVar
-                        alkupistey = y[ii] - (cr_p) * np.sin(np.radians(angle[blocks])) * extraVar
-                    else:
-                        alkupistex = x[ii]
-                        alkupistey = y[ii]
-                    ii += 1
-        else:
-            x[ii:ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4 + cryst_per_block // 2] = -(np.flip(x[:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4 + cryst_per_block // 2]))
-            y[ii:ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4 + cryst_per_block // 2] = (np.flip(y[:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4 + cryst_per_block // 2]))
-            x[ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4 + cryst_per_block // 2:] = np.flip(x[cryst_per_block:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 2])
-            y[ii + ((blocks_per_ring * transaxial_multip) * cryst_per_block) // 4 + cryst_per_block // 2:] = -(y[cryst_per_block:((blocks_per_ring * transaxial_multip) * cryst_per_block) // 2])
+        x[ii:ii + (nBlocks * cryst_per_block) // 4 + cryst_per_block // 2] = -(np.flip(x[:(nBlocks * cryst_per_block) // 4 + cryst_per_block // 2]))
+        y[ii:ii + (nBlocks * cryst_per_block) // 4 + cryst_per_block // 2] = (np.flip(y[:(nBlocks * cryst_per_block) // 4 + cryst_per_block // 2]))
+        x[ii + (nBlocks * cryst_per_block) // 4 + cryst_per_block // 2:] = np.flip(x[cryst_per_block:(nBlocks * cryst_per_block) // 2])
+        y[ii + (nBlocks * cryst_per_block) // 4 + cryst_per_block // 2:] = -(y[cryst_per_block:(nBlocks * cryst_per_block) // 2])
     return x, y
             
 def formDetectorIndices( det_w_pseudo, nLayers = 1, crystN = 0):
@@ -573,12 +598,8 @@ def formDetectorIndices( det_w_pseudo, nLayers = 1, crystN = 0):
         Detector indices.
 
     """
-    L = np.zeros((det_w_pseudo*(det_w_pseudo+1)//2, 2), dtype=np.int32)
-    jh = 0
-    for kk in range(1, det_w_pseudo + 1):
-        L[jh:(jh + det_w_pseudo - kk + 1), :] = np.column_stack((np.repeat(kk, det_w_pseudo - (kk - 1)), np.arange(kk, det_w_pseudo + 1)))
-        jh += det_w_pseudo - kk + 1
-    L = L[~np.all(L == 0, axis=1)]
+    # All the pairs (kk, ll) with ll >= kk, ordered by kk
+    L = np.column_stack(np.triu_indices(det_w_pseudo)).astype(np.int32) + 1
     
     if nLayers > 1:
         temp = np.arange(crystN, det_w_pseudo + 1, crystN)
@@ -589,7 +610,7 @@ def formDetectorIndices( det_w_pseudo, nLayers = 1, crystN = 0):
 def sinogramCoordinates2D(options, x, y, nLayers = 1):
     """
     Computes the transaxial sinogram coordinates using the input detector
-    coordinates.
+    coordinates. Memoized the same way as detectorCoordinates.
 
     Parameters
     ----------
@@ -610,6 +631,10 @@ def sinogramCoordinates2D(options, x, y, nLayers = 1):
         y-direction coordinates for sinogram bins.
 
     """
+    key = _geometryKey('sinogramCoordinates2D', options.det_w_pseudo, options.Nang, options.Ndist, options.ndist_side, options.cryst_per_block, nLayers, x, y)
+    return _memoized(key, _sinogramCoordinates2D, options, x, y, nLayers)
+
+def _sinogramCoordinates2D(options, x, y, nLayers):
     det_w_pseudo = options.det_w_pseudo
     Nang = options.Nang
     Ndist = options.Ndist
@@ -642,9 +667,7 @@ def sinogramCoordinates2D(options, x, y, nLayers = 1):
     
     # Distance
     i = np.abs(xa - ya - det_w_pseudo // 2)
-    for kk in range(len(ya)):
-        if (ya[kk] < j[kk]) or (b[kk] < xa[kk]):
-            i[kk] = -i[kk]
+    i[(ya < j) | (b < xa)] *= -1
     
     # The sinogram corners need to the swapped
     swap = np.logical_or((j * 2) < -i, i <= ((j - det_w_pseudo // 2) * 2))
@@ -895,23 +918,52 @@ def sinogramCoordinates3D(options, layers = (1,1)):
     return z
 
 
+def expandRayShifts(options: proj.projectorClass):
+    """
+    Expands the compact SPECT ray shifts, i.e. the (2*nRays, nRowsD, nColsD)
+    detector shifts and the 2*nRays source shifts, into the dense
+    (2*nRays, nRowsD, nColsD, nProjections) layout (as vectors in Fortran
+    order, same as in MATLAB and in the kernels). Already dense shifts are
+    not modified.
+    """
+    nPix = options.nRowsD * options.nColsD
+    if options.rayShiftsDetector.size == 2 * options.nRays * nPix:
+        options.rayShiftsDetector = np.tile(options.rayShiftsDetector.ravel('F'), options.nProjections).astype(np.float32, copy=False)
+    if options.rayShiftsSource.size == 2 * options.nRays:
+        options.rayShiftsSource = np.tile(options.rayShiftsSource.ravel('F'), nPix * options.nProjections).astype(np.float32, copy=False)
+    options.rayShiftsCompact = False
+
 def SPECTParameters(options: proj.projectorClass):
+    """
+    Computes the SPECT collimator parameters and the ray shifts of the ray
+    tracing projectors. All ray shifts, including user input
+    (2*nRays, nRowsD, nColsD, nProjections) arrays, are stored as Fortran
+    order vectors, i.e. the same as rayShifts(:) in MATLAB and the indexing
+    of the kernels. Previously the dense detector shifts were passed in
+    NumPy's default (C) memory order, which the kernels read in the wrong
+    order, i.e. pinhole and multi-ray projections differ from the earlier
+    Python versions.
+    """
     if options.projector_type in [1, 11, 12, 2, 21, 22]: # Ray tracing projectors
+        nPix = options.nRowsD * options.nColsD
+        # The ray shifts do not depend on the projection (nor on the detector
+        # pixel for the source shifts). Unless dense (2*nRays, nRowsD, nColsD,
+        # nProjections) shifts were input, only the (2*nRays, nRowsD, nColsD)
+        # detector shifts and 2*nRays source shifts are stored
+        if (options.rayShiftsDetector.size > 0 and options.rayShiftsDetector.size != 2 * options.nRays * nPix) or (options.rayShiftsSource.size > 0 and options.rayShiftsSource.size != 2 * options.nRays):
+            options.rayShiftsCompact = False
         if options.rayShiftsDetector.size == 0: # Collimator modeling
-            options.rayShiftsDetector = np.zeros((2*options.nRays, options.nRowsD, options.nColsD, options.nProjections), dtype=np.float32)
+            options.rayShiftsDetector = np.zeros((2*options.nRays, options.nRowsD, options.nColsD), dtype=np.float32, order='F')
             
             if options.colFxy == 0 and options.colFz == 0:
                 dx = np.linspace(-(options.nRowsD / 2 - 0.5) * options.dPitchX, (options.nRowsD / 2 - 0.5) * options.dPitchX, options.nRowsD)
                 dy = np.linspace(-(options.nColsD / 2 - 0.5) * options.dPitchY, (options.nColsD / 2 - 0.5) * options.dPitchY, options.nColsD)
                 
-                for ii in range(options.nRowsD):
-                    for jj in range(options.nColsD):
-                        for kk in range(options.nRays):
-                            options.rayShiftsDetector[2 * kk, ii, jj, :] = -dx[ii]
-                            options.rayShiftsDetector[2 * kk + 1, ii, jj, :] = -dy[jj]    
+                options.rayShiftsDetector[0::2, :, :] = -dx[None, :, None]
+                options.rayShiftsDetector[1::2, :, :] = -dy[None, None, :]
 
         if options.rayShiftsSource.size == 0:
-            options.rayShiftsSource = np.zeros((2*options.nRays, options.nRowsD, options.nColsD, options.nProjections), dtype=np.float32)
+            options.rayShiftsSource = np.zeros(2*options.nRays, dtype=np.float32)
             
             if options.nRays > 1: # Multiray shifts
                 nRays = int(np.sqrt(options.nRays))
@@ -923,13 +975,12 @@ def SPECTParameters(options: proj.projectorClass):
                     tmp_x *= 2 * options.colR
                     tmp_y *= 2 * options.colR
 
-                tmp_shift = np.column_stack((tmp_x.ravel(), tmp_y.ravel())).T.reshape(-1, 1, order='F')
-
-                for kk in range(options.nRays):
-                    options.rayShiftsSource[2 * kk, :, :, :] = tmp_shift[2 * kk]
-                    options.rayShiftsSource[2 * kk + 1, :, :, :] = tmp_shift[2 * kk + 1]
+                options.rayShiftsSource[:] = np.column_stack((tmp_x.ravel(), tmp_y.ravel())).ravel()
             
-        options.rayShiftsSource = options.rayShiftsSource.ravel('F')
+        options.rayShiftsDetector = options.rayShiftsDetector.ravel('F').astype(np.float32, copy=False)
+        options.rayShiftsSource = options.rayShiftsSource.ravel('F').astype(np.float32, copy=False)
+        if not options.rayShiftsCompact:
+            expandRayShifts(options)
 
     if options.projector_type in [12, 21, 2, 22]: # Orthogonal distance ray tracer
         if options.coneOfResponseStdCoeffA < 0:
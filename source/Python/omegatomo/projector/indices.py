@@ -48,12 +48,16 @@ def indexMaker(options):
         tyyppi = np.uint64
     else:
         tyyppi = np.uint32
+    cached = False
     if subsets > 1 and options.subsetType < 8:
         totalLength = Ndist*Nang*NSinos
         options.index = np.empty(0, dtype=tyyppi)
         options.nMeas = np.zeros((subsets, 1), dtype = np.int64)
-        if options.subsetType == 4 and options.use_raw_data == 0:
+        if options.useIndexCache and loadIndexCache(options, tyyppi):
+            cached = True
+        elif options.subsetType == 4 and options.use_raw_data == 0:
             maksimi = np.size(np.arange(1, Nang, subsets))
+            index = [None] * subsets
             for i in range(subsets):
                 osa = np.size(np.arange(i, Nang, subsets))
                 index1 = np.tile(np.arange(i*Ndist, (i + 1) * Ndist, 1), (osa*NSinos)).astype(tyyppi)
@@ -64,45 +68,34 @@ def indexMaker(options):
                     else:
                         erotus = Nang % subsets - subsets
                     index1 = (np.int64(index1) + np.int64(np.repeat((np.arange(0, NSinos - 1, 1)) * Ndist * erotus, Ndist * osa))).astype(tyyppi)
-                options.index = np.append(options.index, index1)
+                index[i] = index1
                 options.nMeas[i] = np.size(index1)
+            options.index = np.concatenate(index)
         elif options.subsetType == 5:
             apu = np.tile((np.tile(np.arange(0, Nang * Ndist, Ndist, dtype=tyyppi).T[None,:], (Ndist, 1)) + np.arange(0, Ndist, dtype=tyyppi)[:,None])[:,:,None], (1, 1, NSinos)) + np.transpose(np.arange(0, Nang * Ndist * NSinos, Nang * Ndist, dtype=tyyppi)[:,None,None],(2, 1, 0))
             apu = np.transpose(apu, (0, 2, 1)).reshape(Ndist * NSinos, -1, order='F')
-            for i in range(subsets):
-                index1 = apu[i : : subsets, :]
-                index1 = index1.T
-                index1 = index1.ravel('F')
-                options.index = np.append(options.index, index1)
-                options.nMeas[i] = np.size(index1)
+            # Subset i is every subsets-th row of apu, taken row by row
+            options.index = np.concatenate([apu[i : : subsets, :].ravel() for i in range(subsets)])
+            options.nMeas[:, 0] = [apu[i : : subsets, :].size for i in range(subsets)]
             # Take every nth (column) measurement
         elif options.subsetType == 1:
             if options.listmode > 0 and options.Nt > 1:
                 options.index = [None] * options.Nt
                 pituus = np.zeros((subsets, options.Nt), dtype=np.int64)
                 for j in range(options.Nt):
-                    tot_length = options.listmodeIndices[j]
-                    temp_ind = []
-                    for i in range(subsets):
-                        index1 = np.arange(i, tot_length, subsets, dtype=tyyppi)
-                        temp_ind.append(index1)
-                        pituus[i, j] = len(index1)
-                    options.index[j] = np.concatenate(temp_ind)
+                    index1, pituus[:, j] = stridedIndices(int(options.listmodeIndices[j]), subsets, tyyppi)
+                    options.index[j] = index1
                 options.nMeas = pituus.flatten(order='F')
             else:
-                for i in range(subsets):
-                    index1 = np.arange(i, totalLength, subsets).astype(tyyppi)
-                    [I,J,K] = ind2sub(index1, np.array((Nang, Ndist, NSinos)))
-                    index1 = sub2ind(np.array((Ndist, Nang, NSinos)), J, I,K)
-                    options.index = np.append(options.index, index1)
-                    options.nMeas[i] = np.size(index1)
+                # Same as sub2ind((Ndist, Nang, NSinos), J, I, K) with
+                # [I, J, K] = ind2sub(index, (Nang, Ndist, NSinos)) for all the measurements
+                apu = np.arange(Ndist * Nang, dtype=tyyppi).reshape(Nang, Ndist).T.ravel()
+                apu = (apu[None, :] + np.arange(0, Ndist * Nang * NSinos, Ndist * Nang, dtype=tyyppi)[:, None]).ravel()
+                options.index, options.nMeas[:, 0] = stridedIndices(totalLength, subsets, tyyppi, apu)
             # Take every nth (row) measurement
             # Every nth measurements
         elif options.subsetType == 2:
-            for i in range(subsets):
-                index1 = np.arange(i, totalLength, subsets).astype(tyyppi)
-                options.index = np.append(options.index, index1)
-                options.nMeas[i] = np.size(index1)
+            options.index, options.nMeas[:, 0] = stridedIndices(totalLength, subsets, tyyppi)
             # Pick the measurements randomly
         elif options.subsetType == 3:
             port = totalLength // subsets
@@ -111,13 +104,11 @@ def indexMaker(options):
             else:
                 generator = np.random.default_rng(options.seed)
             apu = generator.permutation(totalLength).astype(tyyppi)
-            for i in range(subsets):
-                if i == subsets - 1:
-                    index1 = apu[port * i : -1]
-                else:
-                    index1 = apu[port * i : port * (i + 1)]
-                options.index = np.append(options.index, index1)
-                options.nMeas[i] = np.size(index1)
+            # The subsets are consecutive parts of the permutation, the last
+            # subset excludes the last element
+            options.index = apu[:-1]
+            options.nMeas[:, 0] = port
+            options.nMeas[-1] = totalLength - 1 - port * (subsets - 1)
             # Pick the subsets based on the angles of the LORs
         elif options.subsetType == 6:
             raise ValueError('Not supported in Python version')
@@ -158,31 +149,19 @@ def indexMaker(options):
     elif (subsets > 1 and options.subsetType in [8, 9, 10, 11]) or subsets == 1:
         sProjections = options.nProjections // subsets
         modi = np.mod(options.nProjections, subsets)
-        uu = (modi > 0).astype(np.int64)
-        ind1 = 0
-        ind2 = sProjections + uu
         options.index = np.empty(0, dtype=tyyppi)
         options.nMeas = np.zeros((subsets, 1), dtype = np.int64)
-        if options.subsetType == 8 and subsets > 1:
-            for kk in range(subsets):
-                index1 = np.arange(kk, options.nProjections, subsets).astype(tyyppi)
-                options.index = np.append(options.index, index1)
-                options.nMeas[kk] = np.size(index1)
+        if options.useIndexCache and loadIndexCache(options, tyyppi):
+            cached = True
+        elif options.subsetType == 8 and subsets > 1:
+            options.index, options.nMeas[:, 0] = stridedIndices(options.nProjections, subsets, tyyppi)
         elif options.subsetType == 9 and subsets > 1:
             if options.seed < 0:
                 generator = np.random.default_rng()
             else:
                 generator = np.random.default_rng(options.seed)
-            apu = generator.permutation(options.nProjections).astype(tyyppi)
-            for kk in range(subsets):
-                index1 = apu[ind1 : ind2]
-                options.index = np.append(options.index, index1)
-                options.nMeas[kk] = np.size(index1)
-                modi = modi - 1
-                if modi <= 0:
-                    uu = 0
-                ind1 = ind2
-                ind2 = ind2 + (options.nProjections // subsets) + uu
+            options.index = generator.permutation(options.nProjections).astype(tyyppi)
+            options.nMeas[:, 0] = sProjections + (np.arange(subsets) < modi)
         elif options.subsetType == 10 and subsets > 1:
             raise ValueError('Not supported in Python version!')
             # ga = 2.39996322972865332
@@ -241,18 +220,9 @@ def indexMaker(options):
                     p1 = np.tile(p1, options.nProjections // np.size(p1))
                 p[ll - 1, :] = p1
             
-            indices = np.zeros(options.nProjections, dtype=tyyppi)
-            for r in range(1, options.nProjections + 1):
-                tt = p[:len(nn), r - 1] * nn
-                indices[r - 1] = np.sum(tt) + p[-1, r - 1]
-            for kk in range(subsets):
-                options.index = np.append(options.index, indices[ind1:ind2])
-                options.nMeas[kk] = np.size(indices[ind1:ind2])
-                modi -= 1
-                if modi <= 0:
-                    uu = 0
-                ind1 = ind2
-                ind2 = ind2 + (options.nProjections // subsets) + uu
+            indices = (nn @ p[:len(nn), :].astype(np.int64) + p[-1, :]).astype(tyyppi)
+            options.index = indices
+            options.nMeas[:, 0] = sProjections + (np.arange(subsets) < modi)
         else:
             options.index = np.arange(0, options.nProjections).astype(tyyppi)
             options.nMeas[0] = options.index.size
@@ -268,12 +238,117 @@ def indexMaker(options):
                 options.nMeas[0] = options.Nang * options.Ndist * options.NSinos
     elif options.subsetType > 11:
         raise ValueError('Invalid subset type!')
+    if options.useIndexCache and not cached:
+        saveIndexCache(options, tyyppi)
     if options.listmode == 0 and options.Nt > 1:
-        options.nMeas = np.tile(options.nMeas, options.Nt)
+        # Subset lengths of each time step consecutively, as repmat(pituus,1,Nt)
+        options.nMeas = np.tile(options.nMeas.ravel(), options.Nt)
     if options.sampling > 1:
         options.Ndist = int(options.Ndist / options.sampling)
     options.subsets = subsets
     
+def stridedIndices(totalLength, subsets, tyyppi, values = None):
+    """
+    Concatenated indices of every subsets-th measurement, i.e. the subset i
+    contains the indices i, i + subsets, i + 2 * subsets, ... Computed as a
+    single transpose without a loop over the subsets.
+
+    Parameters
+    ----------
+    totalLength : int
+        Total number of measurements.
+    subsets : int
+        Number of subsets.
+    tyyppi : NumPy dtype
+        Data type of the output indices.
+    values : NumPy array, optional
+        If given, values[index] is returned instead of the indices.
+
+    Returns
+    -------
+    index : NumPy array
+        The indices of all the subsets, subset by subset.
+    nMeas : NumPy array
+        The number of measurements in each subset.
+
+    """
+    rivit = -(-totalLength // subsets)
+    # Subsets r0, r0 + 1, ... have one measurement less than the first ones
+    r0 = totalLength - (rivit - 1) * subsets
+    apu = np.empty(rivit * subsets, dtype=tyyppi)
+    if values is None:
+        apu[:totalLength] = np.arange(totalLength, dtype=tyyppi)
+    else:
+        apu[:totalLength] = values
+    apu = apu.reshape(rivit, subsets).T
+    index = np.concatenate((apu[:r0, :].ravel(), apu[r0:, :-1].ravel()))
+    nMeas = np.full(subsets, rivit, dtype=np.int64)
+    nMeas[r0:] -= 1
+    return (index, nMeas)
+
+def indexCacheFile(options, tyyppi):
+    """
+    Returns the subset index cache file for the current geometry and subset
+    selection, or an empty string if the indices of the selected subset type
+    are not cached. The key is (Ndist, Nang, NSinos, subsets, subsetType,
+    seed), in addition to the number of projections and the index data type.
+    Random subsets (types 3 and 9) are only cached with a fixed seed
+    (seed >= 0). The cache directory can be set with the environment variable
+    OMEGA_INDEX_CACHE_DIR (default ~/.cache/omega/indices).
+    """
+    import os
+    if options.subsets <= 1 or options.listmode > 0:
+        return ''
+    if options.subsetType not in [1, 2, 3, 4, 5, 8, 9, 11]:
+        return ''
+    if options.subsetType == 4 and options.use_raw_data:
+        return ''
+    if options.subsetType in [3, 9] and options.seed < 0:
+        return ''
+    path = os.environ.get('OMEGA_INDEX_CACHE_DIR', '')
+    if len(path) == 0:
+        path = os.path.join(os.path.expanduser('~'), '.cache', 'omega', 'indices')
+    if options.subsetType in [3, 9]:
+        seed = int(options.seed)
+    else:
+        seed = -1
+    nimi = f"index_{int(options.Ndist)}_{int(options.Nang)}_{int(options.NSinos)}_{int(options.subsets)}_{int(options.subsetType)}_{seed}_{int(options.nProjections)}_{np.dtype(tyyppi).name}.npz"
+    return os.path.join(path, nimi)
+
+def loadIndexCache(options, tyyppi):
+    """
+    Loads options.index and options.nMeas from the subset index cache.
+    Returns True if the indices were found.
+    """
+    fName = indexCacheFile(options, tyyppi)
+    if len(fName) == 0:
+        return False
+    try:
+        with np.load(fName) as data:
+            options.index = data['index']
+            options.nMeas = data['nMeas']
+    except (OSError, KeyError, ValueError):
+        return False
+    return True
+
+def saveIndexCache(options, tyyppi):
+    """
+    Stores options.index and options.nMeas to the subset index cache. Errors
+    are ignored, i.e. the indices are just recomputed next time.
+    """
+    import os
+    fName = indexCacheFile(options, tyyppi)
+    if len(fName) == 0:
+        return
+    try:
+        os.makedirs(os.path.dirname(fName), exist_ok=True)
+        # Write to a temporary file first so that concurrent jobs never see partial files
+        tmp = fName[:-4] + '.' + str(os.getpid()) + '.tmp.npz'
+        np.savez(tmp, index=options.index, nMeas=options.nMeas)
+        os.replace(tmp, fName)
+    except OSError:
+        pass
+
 def ind2sub(index, dims):
     """
     Transforms linear indices to subscripts.
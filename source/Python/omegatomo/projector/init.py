@@ -49,6 +49,10 @@ def initProjector(self):
     from omegatomo.reconstruction.prepass import prepassPhase
     from omegatomo.reconstruction.prepass import parseInputs
     from omegatomo.reconstruction.prepass import loadCorrections
+    from omegatomo.projector.kernelcache import buildOpenCLProgram, buildCuPyModule
+    from omegatomo.projector.texpool import TexturePool
+    from omegatomo.projector.kernelargs import KernelArguments
+    from omegatomo.projector.satcache import SATCache
     if self.useAF:
         # import arrayfire as af
         if af.get_active_backend() != 'opencl' and not self.useCUDA:
@@ -85,7 +89,7 @@ def initProjector(self):
                 return "rocm" in lower or "hip" in lower
             except Exception:
                 return False
-    if not self.useCUDA:
+    if not self.useCUDA and not self.useNumPy and not self.useCPU:
         import pyopencl as cl
         from pyopencl.version import VERSION
         
@@ -154,6 +158,14 @@ def initProjector(self):
         self.BPType = 6
     else:
         raise ValueError('Invalid backprojector!')
+    if self.useNumPy:
+        from omegatomo.projector.numpyproj import initNumPyProjector
+        initNumPyProjector(self)
+        return
+    if self.useCPU:
+        from omegatomo.projector.cpuproj import initCPUProjector
+        initCPUProjector(self)
+        return
     # CuPy does not support the texture API (cupy.cuda.texture) on ROCm/HIP; creating a CUDA
     # array fails at runtime with hipErrorUnknown. Fall back to buffers where the kernels
     # support them, otherwise raise an error.
@@ -177,23 +189,21 @@ def initProjector(self):
         with open(headerDir + 'general_opencl_functions.h', encoding="utf8") as f:
             hlines = f.read()
         if self.FPType in [1, 2, 3]:
-            with open(headerDir + 'projectorType123.cl', encoding="utf8") as f:
-                linesFP = f.read()
+            fileFP = 'projectorType123.cl'
         elif self.FPType in [4]:
-            with open(headerDir + 'projectorType4.cl', encoding="utf8") as f:
-                linesFP = f.read()
+            fileFP = 'projectorType4.cl'
         elif self.FPType in [5]:
-            with open(headerDir + 'projectorType5.cl', encoding="utf8") as f:
-                linesFP = f.read()
+            fileFP = 'projectorType5.cl'
+        with open(headerDir + fileFP, encoding="utf8") as f:
+            linesFP = f.read()
         if self.BPType in [1, 2, 3]:
-            with open(headerDir + 'projectorType123.cl', encoding="utf8") as f:
-                linesBP = f.read()
+            fileBP = 'projectorType123.cl'
         elif self.BPType in [4]:
-            with open(headerDir + 'projectorType4.cl', encoding="utf8") as f:
-                linesBP = f.read()
+            fileBP = 'projectorType4.cl'
         elif self.BPType in [5]:
-            with open(headerDir + 'projectorType5.cl', encoding="utf8") as f:
-                linesBP = f.read()
+            fileBP = 'projectorType5.cl'
+        with open(headerDir + fileBP, encoding="utf8") as f:
+            linesBP = f.read()
         globalSize = [None] * self.subsets
         # self.mSize = [None] * self.subsets
         for i in range(self.subsets):
@@ -292,15 +302,21 @@ def initProjector(self):
                 hlines2 = f.read()
             if self.FPType in [2, 3]:
                 linesFP = hlines + hlines2 + linesFP
+                filesFP = ['general_opencl_functions.h', 'opencl_functions_orth3D.h', fileFP]
             else:
                 linesFP = hlines + linesFP
+                filesFP = ['general_opencl_functions.h', fileFP]
             if self.BPType in [2, 3]:
                 linesBP = hlines + hlines2 + linesBP
+                filesBP = ['general_opencl_functions.h', 'opencl_functions_orth3D.h', fileBP]
             else:
                 linesBP = hlines + linesBP
+                filesBP = ['general_opencl_functions.h', fileBP]
         else:
             linesFP = hlines + linesFP
             linesBP = hlines + linesBP
+            filesFP = ['general_opencl_functions.h', fileFP]
+            filesBP = ['general_opencl_functions.h', fileBP]
         # if self.FPType == 3 or self.BPType == 3:
         #     bOpt += ('-DVOL',)
         if self.useMaskFP:
@@ -342,6 +358,8 @@ def initProjector(self):
                     bOpt += ('-DSPECT', )
             else:
                 bOpt += (' -DSPECT',)
+            if self.rayShiftsCompact:
+                bOpt += ('-DCOMPACTSHIFTS',)
         elif self.PET:
             bOpt += ('-DPET',)
 
@@ -463,8 +481,13 @@ def initProjector(self):
         self.dSize = [None] * (self.nMultiVolumes + 1)
         self.d_Scale = [None] * (self.nMultiVolumes + 1)
         self.d_Scale4 = [None] * (self.nMultiVolumes + 1)
+        # Persistent projection textures, reused between calls
+        self.texPool = TexturePool(True)
+        # Summed-area tables of projector type 5, rebuilt only when the image changes
+        self.satCache = SATCache(self.useTorch if self.cacheSAT is None else self.cacheSAT)
         self.d_x = [None] * self.subsets
         self.d_z = [None] * self.subsets
+        self.listmodeRing = None
         if self.projector_type != 6:
             if self.useCuPy:
                 # if self.FPType == 5:
@@ -610,7 +633,10 @@ def initProjector(self):
                     self.d_T = [None] * self.subsets
                     for i in range(self.subsets):
                         self.d_T[i] = cp.asarray(self.OffsetLimit[self.nMeas[i].item() : self.nMeas[i + 1].item()])
-                mod = cp.RawModule(code=linesFP, options=bOptFP)
+                if self.useKernelCache:
+                    mod = buildCuPyModule(linesFP, bOptFP, filesFP)
+                else:
+                    mod = cp.RawModule(code=linesFP, options=bOptFP)
                 # import sys
                 # mod.compile(log_stream=sys.stdout)
                 if self.FPType in [1, 2, 3]:
@@ -619,7 +645,10 @@ def initProjector(self):
                     self.knlF = mod.get_function('projectorType4Forward')
                 elif self.FPType == 5:
                     self.knlF = mod.get_function('projectorType5Forward')
-                mod = cp.RawModule(code=linesBP, options=bOptBP)
+                if self.useKernelCache:
+                    mod = buildCuPyModule(linesBP, bOptBP, filesBP)
+                else:
+                    mod = cp.RawModule(code=linesBP, options=bOptBP)
                 if self.BPType in [1, 2, 3]:
                     self.knlB = mod.get_function('projectorType123')
                 elif self.BPType == 4 and not self.CT:
@@ -629,12 +658,27 @@ def initProjector(self):
                 elif self.BPType == 5:
                     self.knlB = mod.get_function('projectorType5Backward')
                 
+                if self.FPType == 5:
+                    with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
+                        lines = f.read()
+                    lines = hlines + lines
+                    bOptSAT = bOpt + ('-DCAST=float','-DSAT','-DLOCAL_SIZE=' + str(localSize[0]),'-DLOCAL_SIZE2=' + str(localSize[1]),)
+                    if self.useKernelCache:
+                        mod = buildCuPyModule(lines, bOptSAT, ['general_opencl_functions.h', 'auxKernels.cl'])
+                    else:
+                        mod = cp.RawModule(code=lines, options=bOptSAT)
+                    self.knlSATRows = mod.get_function('SATRows')
+                    self.knlSATColumns = mod.get_function('SATColumns')
+                    
                 if self.use_psf:
                     with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
                         lines = f.read()
                     lines = hlines + lines
                     bOpt += ('-DCAST=float','-DPSF','-DLOCAL_SIZE=' + str(localSize[0]),'-DLOCAL_SIZE2=' + str(localSize[1]),)
-                    mod = cp.RawModule(code=lines, options=bOpt)
+                    if self.useKernelCache:
+                        mod = buildCuPyModule(lines, bOpt, ['general_opencl_functions.h', 'auxKernels.cl'])
+                    else:
+                        mod = cp.RawModule(code=lines, options=bOpt)
                     self.knlPSF = mod.get_function('Convolution3D_f')
                     self.d_gaussPSF = cp.asarray(self.gaussK.ravel('F'))
                     
@@ -721,6 +765,12 @@ def initProjector(self):
             self.dSize = [None] * (self.nMultiVolumes + 1)
             self.d_Scale = [None] * (self.nMultiVolumes + 1)
             self.d_Scale4 = [None] * (self.nMultiVolumes + 1)
+            # Persistent projection images, reused between calls
+            self.texPool = TexturePool(False, self.clctx)
+            # Constant kernel arguments, set once per (volume, subset)
+            self.kernelArgs = KernelArguments(self.persistentKernelArgs)
+            # Summed-area tables of projector type 5, rebuilt only when the image changes
+            self.satCache = SATCache(self.useTorch if self.cacheSAT is None else self.cacheSAT)
             for k in range(self.nMultiVolumes + 1):
                 self.d_d[k] = cl.cltypes.make_float3(self.dx[k].item(), self.dy[k].item(), self.dz[k].item())
                 self.d_b[k] = cl.cltypes.make_float3(self.bx[k].item(), self.by[k].item(), self.bz[k].item())
@@ -736,6 +786,7 @@ def initProjector(self):
             self.d_dPitch = cl.cltypes.make_float2(self.dPitchX, self.dPitchY)
             self.d_x = [None] * self.subsets
             self.d_z = [None] * self.subsets
+            self.listmodeRing = None
             if (self.listmode == 0 and not (self.CT or self.SPECT)) or self.useIndexBasedReconstruction:
                 self.d_x[0] = cl.array.to_device(self.queue, self.x.ravel())
             elif (self.CT or self.SPECT) and self.listmode == 0:
@@ -858,14 +909,20 @@ def initProjector(self):
             # d_Sens = cl.Buffer(clctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=Sens)
             # d_x = cl.Buffer(self.clctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=self.x)
             # z = cl.Buffer(clctx, mf.READ_ONLY | mf.COPY_HOST_PTR, hostbuf=self.z)
-            prg = cl.Program(self.clctx, linesFP).build(' '.join(bOptFP))
+            if self.useKernelCache:
+                prg = buildOpenCLProgram(self.clctx, linesFP, bOptFP, filesFP)
+            else:
+                prg = cl.Program(self.clctx, linesFP).build(' '.join(bOptFP))
             if self.FPType in [1, 2, 3]:
                 self.knlF = prg.projectorType123
             elif self.FPType == 4:
                 self.knlF = prg.projectorType4Forward
             elif self.FPType == 5:
                 self.knlF = prg.projectorType5Forward
-            prg = cl.Program(self.clctx, linesBP).build(' '.join(bOptBP))
+            if self.useKernelCache:
+                prg = buildOpenCLProgram(self.clctx, linesBP, bOptBP, filesBP)
+            else:
+                prg = cl.Program(self.clctx, linesBP).build(' '.join(bOptBP))
             if self.BPType in [1, 2, 3]:
                 self.knlB = prg.projectorType123
             elif self.BPType == 4 and not self.CT:
@@ -875,184 +932,199 @@ def initProjector(self):
             elif self.BPType == 5:
                 self.knlB = prg.projectorType5Backward
             
+            if self.FPType == 5:
+                with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
+                    lines = f.read()
+                lines = hlines + lines
+                bOptSAT = bOpt + ('-DCAST=float','-DSAT','-DLOCAL_SIZE=' + str(localSize[0]),'-DLOCAL_SIZE2=' + str(localSize[1]),)
+                if self.useKernelCache:
+                    prg = buildOpenCLProgram(self.clctx, lines, bOptSAT, ['general_opencl_functions.h', 'auxKernels.cl'])
+                else:
+                    prg = cl.Program(self.clctx, lines).build(' '.join(bOptSAT))
+                self.knlSATRows = prg.SATRows
+                self.knlSATColumns = prg.SATColumns
+                
             if self.use_psf:
                 with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
                     lines = f.read()
                 lines = hlines + lines
                 bOpt +=(' -DCAST=float',' -DPSF',' -DLOCAL_SIZE=' + str(localSize[0]), ' -DLOCAL_SIZE2=' + str(localSize[1]),)
-                prg = cl.Program(self.clctx, lines).build(' '.join(bOpt))
+                if self.useKernelCache:
+                    prg = buildOpenCLProgram(self.clctx, lines, bOpt, ['general_opencl_functions.h', 'auxKernels.cl'])
+                else:
+                    prg = cl.Program(self.clctx, lines).build(' '.join(bOpt))
                 self.knlPSF = prg.Convolution3D_f
                 self.d_gaussPSF = cl.array.to_device(self.queue, self.gaussK.ravel('F'))
                 
             self.kIndF = 0
             if self.FPType == 4 or self.FPType == 5:
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.uint)(self.nRowsD))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.uint)(self.nRowsD))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.uint)(self.nColsD))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.uint)(self.nColsD))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, self.d_dPitch)
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_dPitch)
                 self.kIndF += 1
             if self.FPType == 4:
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.dL))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.dL))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.global_factor))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.global_factor))
                 self.kIndF += 1
             if self.FPType in [1, 2, 3]:
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.global_factor))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.global_factor))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.epps))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.epps))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.uint)(self.nRowsD))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.uint)(self.nRowsD))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.uint)(self.det_per_ring))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.uint)(self.det_per_ring))
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.sigma_x))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.sigma_x))
                 self.kIndF += 1
                 if self.SPECT:
-                    self.knlF.set_arg(self.kIndF, self.d_rayShiftsDetector.data)
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_rayShiftsDetector.data)
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, self.d_rayShiftsSource.data)
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_rayShiftsSource.data)
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.coneOfResponseStdCoeffA))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.coneOfResponseStdCoeffA))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.coneOfResponseStdCoeffB))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.coneOfResponseStdCoeffB))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.coneOfResponseStdCoeffC))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.coneOfResponseStdCoeffC))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.totalFOVxmin))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.totalFOVxmin))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.totalFOVymin))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.totalFOVymin))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.totalFOVzmin))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.totalFOVzmin))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.totalFOVxmax))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.totalFOVxmax))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.totalFOVymax))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.totalFOVymax))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.totalFOVzmax))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.totalFOVzmax))
                     self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, self.d_dPitch)
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_dPitch)
                 self.kIndF += 1
                 if self.FPType in [2, 3]:
                     if self.FPType == 2:
-                        self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.tube_width_z))
+                        self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.tube_width_z))
                         self.kIndF += 1
                     else:
-                        self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.tube_radius))
+                        self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.tube_radius))
                         self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.bmin))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.bmin))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.bmax))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.bmax))
                     self.kIndF += 1
-                    self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.Vmax))
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.Vmax))
                     self.kIndF += 1
             # if self.useMaskFP:
             #     self.knlF.set_arg(self.kIndF, self.d_maskFP)
             #     self.kIndF += 1
             if self.FPType in [1, 2, 3]:
                 if self.TOF:
-                    self.knlF.set_arg(self.kIndF, self.d_TOFCenter.data)
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_TOFCenter.data)
                     self.kIndF += 1
                 if self.FPType in [2, 3]:
-                    self.knlF.set_arg(self.kIndF, self.d_V.data)
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_V.data)
                     self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.uint)(self.nColsD))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.uint)(self.nColsD))
                 self.kIndF += 1
             if self.FPType == 4 and not self.CT and self.TOF:
-                self.knlF.set_arg(self.kIndF, self.d_TOFCenter.data)
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_TOFCenter.data)
                 self.kIndF += 1
-                self.knlF.set_arg(self.kIndF, (cl.cltypes.float)(self.sigma_x))
+                self.kernelArgs.setInitArg(self.knlF, self.kIndF, (cl.cltypes.float)(self.sigma_x))
                 self.kIndF += 1
             if self.attenuation_correction and self.CTAttenuation and self.FPType in [1, 2, 3, 4]:
                 if self.useImages:
-                    self.knlF.set_arg(self.kIndF, self.d_atten)
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_atten)
                 else:
-                    self.knlF.set_arg(self.kIndF, self.d_atten.data)
+                    self.kernelArgs.setInitArg(self.knlF, self.kIndF, self.d_atten.data)
                 self.kIndF += 1
                     
                 
             
             self.kIndB = 0
             if self.BPType == 4 or self.BPType == 5:
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.uint)(self.nRowsD))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.uint)(self.nRowsD))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.uint)(self.nColsD))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.uint)(self.nColsD))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, self.d_dPitch)
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_dPitch)
                 self.kIndB += 1
             if self.BPType == 4 and not self.CT:
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.dL))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.dL))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.global_factor))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.global_factor))
                 self.kIndB += 1
             if self.BPType in [1, 2, 3]:
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.global_factor))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.global_factor))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.epps))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.epps))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.uint)(self.nRowsD))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.uint)(self.nRowsD))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.uint)(self.det_per_ring))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.uint)(self.det_per_ring))
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.sigma_x))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.sigma_x))
                 self.kIndB += 1
                 if self.SPECT:
-                    self.knlB.set_arg(self.kIndB, self.d_rayShiftsDetector.data)
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_rayShiftsDetector.data)
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, self.d_rayShiftsSource.data)
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_rayShiftsSource.data)
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.coneOfResponseStdCoeffA))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.coneOfResponseStdCoeffA))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.coneOfResponseStdCoeffB))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.coneOfResponseStdCoeffB))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.coneOfResponseStdCoeffC))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.coneOfResponseStdCoeffC))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.totalFOVxmin))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.totalFOVxmin))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.totalFOVymin))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.totalFOVymin))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.totalFOVzmin))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.totalFOVzmin))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.totalFOVxmax))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.totalFOVxmax))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.totalFOVymax))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.totalFOVymax))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.totalFOVzmax))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.totalFOVzmax))
                     self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, self.d_dPitch)
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_dPitch)
                 self.kIndB += 1
                 if self.BPType in [2, 3]:
                     if self.BPType == 2:
-                        self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.tube_width_z))
+                        self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.tube_width_z))
                         self.kIndB += 1
                     else:
-                        self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.tube_radius))
+                        self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.tube_radius))
                         self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.bmin))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.bmin))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.bmax))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.bmax))
                     self.kIndB += 1
-                    self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.Vmax))
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.Vmax))
                     self.kIndB += 1
             if self.BPType in [1, 2, 3]:
                 if self.TOF:
-                    self.knlB.set_arg(self.kIndB, self.d_TOFCenter.data)
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_TOFCenter.data)
                     self.kIndB += 1
                 if self.BPType in [2, 3]:
-                    self.knlB.set_arg(self.kIndB, self.d_V.data)
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_V.data)
                     self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.uint)(self.nColsD))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.uint)(self.nColsD))
                 self.kIndB += 1
             if self.BPType == 4 and not self.CT and self.TOF:
-                self.knlB.set_arg(self.kIndB, self.d_TOFCenter.data)
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_TOFCenter.data)
                 self.kIndB += 1
-                self.knlB.set_arg(self.kIndB, (cl.cltypes.float)(self.sigma_x))
+                self.kernelArgs.setInitArg(self.knlB, self.kIndB, (cl.cltypes.float)(self.sigma_x))
                 self.kIndB += 1
             if self.attenuation_correction and self.CTAttenuation and self.BPType in [1, 2, 3, 4] and not self.CT:
                 if self.useImages:
-                    self.knlB.set_arg(self.kIndB, self.d_atten)
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_atten)
                 else:
-                    self.knlB.set_arg(self.kIndB, self.d_atten.data)
+                    self.kernelArgs.setInitArg(self.knlB, self.kIndB, self.d_atten.data)
                 self.kIndB += 1
             # if self.BPType in [1, 2, 3] and self.useMaskFP:
             #     self.knlB.set_arg(self.kIndB, self.d_maskFP)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 17:05:52 2026
+
+Persistent argument binding of the OpenCL forward and backward projection
+kernels. OpenCL kernel arguments stay set between launches, so each
+(projection, volume, subset) combination gets its own kernel object whose
+arguments that are constant for the lifetime of the projector (volume
+dimensions, scaling values, subset buffers, etc.) are set only once. Before a
+launch only the per-call arguments, i.e. the input/output buffers, are set.
+"""
+
+class ArgumentSet:
+    """
+    Kernel object of one (projection, volume, subset) combination. set_arg
+    sets a constant argument, perCall records the index of an argument that
+    changes between calls, e.g. the output buffer, by name.
+    """
+    def __init__(self, knl):
+        self.knl = knl
+        self.perCallArgs = []
+
+    def set_arg(self, ind, arvo):
+        self.knl.set_arg(ind, arvo)
+
+    def perCall(self, ind, nimi):
+        self.perCallArgs.append((ind, nimi))
+
+
+class KernelArguments:
+    """
+    Argument sets owned by projectorClass (options.kernelArgs). The arguments
+    that are common to all the subsets are set at initialization with
+    setInitArg. If enabled is False, the original kernel is used and all the
+    arguments are set on every call.
+    """
+    def __init__(self, enabled = True):
+        self.enabled = enabled
+        self.initArgs = {}
+        self.sets = {}
+
+    def setInitArg(self, knl, ind, arvo):
+        """
+        Sets the argument ind of knl and stores it for the kernel copies.
+        """
+        knl.set_arg(ind, arvo)
+        self.initArgs.setdefault(id(knl), {})[ind] = arvo
+
+    def get(self, key):
+        """
+        Returns the argument set of key, e.g. ('FP', k, subset), or None if
+        it has not been recorded yet.
+        """
+        if not self.enabled:
+            return None
+        return self.sets.get(key)
+
+    def record(self, knl, key):
+        """
+        Returns a new argument set for key. Its kernel is a copy of knl with
+        the initialization arguments already set.
+        """
+        if not self.enabled:
+            return ArgumentSet(knl)
+        import pyopencl as cl
+        uusi = cl.Kernel(knl.program, knl.function_name)
+        for ind, arvo in self.initArgs.get(id(knl), {}).items():
+            uusi.set_arg(ind, arvo)
+        argSet = ArgumentSet(uusi)
+        self.sets[key] = argSet
+        return argSet
+
+    def bind(self, argSet, arvo):
+        """
+        Sets the per-call arguments of argSet, arvo(nimi) returns the current
+        value of the argument nimi. Returns the kernel to launch.
+        """
+        for ind, nimi in argSet.perCallArgs:
+            argSet.knl.set_arg(ind, arvo(nimi))
+        return argSet.knl
+
+    def clear(self):
+        """
+        Frees all the kernel copies, e.g. after the device buffers have been
+        replaced. They are recreated on the next projection.
+        """
+        self.sets = {}
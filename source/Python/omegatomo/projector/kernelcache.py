@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 13:02:55 2026
+
+Persistent on-disk cache of the compiled OpenCL programs and CUDA (CuPy)
+modules of the projectors.
+
+The OpenCL program binaries are stored content-addressed, i.e. the cache key is
+the SHA-256 hash of the kernel source, the build options and the device
+identity (platform, device name, device and driver version). For CuPy, the
+CuPy kernel cache (which is content-addressed in the same way) is redirected
+into the same cache directory. The total size of the cache is limited and the
+least recently used entries are removed first.
+
+In addition to the binaries, the "recipe" (the kernel files and the build
+options) of every built program is stored. These can be used to rebuild the
+cache, for example after an update of OMEGA, with the command line interface:
+
+    python -m omegatomo.projector.kernelcache warmup
+    python -m omegatomo.projector.kernelcache list
+    python -m omegatomo.projector.kernelcache prune --max-size 256
+    python -m omegatomo.projector.kernelcache clear
+
+The cache directory can be set with the environment variable
+OMEGA_KERNEL_CACHE_DIR (default ~/.cache/omega/kernels) and the maximum size
+(in MB) with OMEGA_KERNEL_CACHE_SIZE (default 1024).
+"""
+
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_SIZE = 1024
+
+def cacheDir():
+    """Returns the cache directory, the directory is not created."""
+    path = os.environ.get('OMEGA_KERNEL_CACHE_DIR', '')
+    if len(path) == 0:
+        path = os.path.join(os.path.expanduser('~'), '.cache', 'omega', 'kernels')
+    return path
+
+def maxCacheSize():
+    """Maximum size of the cache in bytes."""
+    try:
+        size = float(os.environ.get('OMEGA_KERNEL_CACHE_SIZE', DEFAULT_SIZE))
+    except ValueError:
+        size = DEFAULT_SIZE
+    return int(size * 1024 * 1024)
+
+def kernelDir():
+    """Directory of the OpenCL/CUDA kernel source files."""
+    fPath = os.path.dirname(__file__)
+    if os.path.exists(os.path.join(fPath, '..', 'util', 'usingPyPi.py')):
+        return os.path.abspath(os.path.join(fPath, '..', 'opencl')) + "/"
+    else:
+        return os.path.abspath(os.path.join(fPath, '..', '..', '..', 'opencl')) + "/"
+
+def cacheKey(source, options, device):
+    """Content-based key from the kernel source, build options and device identity."""
+    h = hashlib.sha256()
+    h.update(source.encode('utf8'))
+    h.update(b'\0')
+    h.update(' '.join(options).encode('utf8'))
+    h.update(b'\0')
+    h.update(device.encode('utf8'))
+    return h.hexdigest()
+
+def openCLDeviceIdentity(ctx):
+    import pyopencl as cl
+    device = ctx.get_info(cl.context_info.DEVICES)[0]
+    platform = device.get_info(cl.device_info.PLATFORM)
+    return '|'.join([platform.get_info(cl.platform_info.NAME), platform.get_info(cl.platform_info.VERSION), device.get_info(cl.device_info.NAME),
+                     device.get_info(cl.device_info.VERSION), device.get_info(cl.device_info.DRIVER_VERSION)])
+
+def _writeFile(path, data):
+    # Write to a temporary file first so that concurrent jobs never see partial files
+    tmp = path + '.' + str(os.getpid()) + '.tmp'
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    with open(tmp, mode) as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def saveRecipe(backend, files, options, device):
+    """Stores the kernel files and build options used for a build (for warmup)."""
+    if files is None:
+        return
+    recipe = {'backend': backend, 'files': list(files), 'options': list(options), 'device': device}
+    key = cacheKey(' '.join(files), options, backend + device)
+    path = os.path.join(cacheDir(), 'recipes')
+    os.makedirs(path, exist_ok=True)
+    fName = os.path.join(path, key + '.json')
+    if not os.path.exists(fName):
+        _writeFile(fName, json.dumps(recipe))
+
+def loadSource(files, headerDir = ''):
+    """Concatenates the given kernel files, as done in initProjector."""
+    if len(headerDir) == 0:
+        headerDir = kernelDir()
+    source = ''
+    for fName in files:
+        with open(headerDir + fName, encoding="utf8") as f:
+            source += f.read()
+    return source
+
+def entries():
+    """All the cached files as a list of (path, size, last access time)."""
+    out = []
+    root = cacheDir()
+    if not os.path.isdir(root):
+        return out
+    for path, dirs, fNames in os.walk(root):
+        if os.path.basename(path) == 'recipes':
+            continue
+        for fName in fNames:
+            apu = os.path.join(path, fName)
+            try:
+                st = os.stat(apu)
+            except OSError:
+                continue
+            out.append((apu, st.st_size, st.st_mtime))
+    return out
+
+def prune(maxSize = -1):
+    """Removes the least recently used files until the cache is smaller than maxSize bytes."""
+    if maxSize < 0:
+        maxSize = maxCacheSize()
+    files = sorted(entries(), key=lambda x: x[2])
+    total = sum([x[1] for x in files])
+    removed = 0
+    for path, size, t in files:
+        if total <= maxSize:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+def clear():
+    """Removes the whole cache, including the recipes."""
+    import shutil
+    root = cacheDir()
+    if os.path.isdir(root):
+        shutil.rmtree(root, ignore_errors=True)
+
+def buildOpenCLProgram(ctx, source, options, files = None):
+    """
+    Builds the OpenCL program from source, or from the cached binary if one
+    exists for the same source, options and device. options is a tuple of
+    build options. files is the list of kernel files the source consists of
+    and is only used for the warmup recipes.
+    """
+    import pyopencl as cl
+    opts = ' '.join(options)
+    try:
+        device = openCLDeviceIdentity(ctx)
+        key = cacheKey(source, options, device)
+        path = os.path.join(cacheDir(), 'opencl', key[0:2])
+        fName = os.path.join(path, key + '.bin')
+    except Exception:
+        return cl.Program(ctx, source).build(opts)
+    if os.path.exists(fName):
+        try:
+            with open(fName, 'rb') as f:
+                binary = f.read()
+            devices = ctx.get_info(cl.context_info.DEVICES)
+            prg = cl.Program(ctx, devices[0:1], [binary]).build(opts)
+            os.utime(fName)
+            return prg
+        except Exception:
+            # Corrupted or incompatible binary, rebuild
+            try:
+                os.remove(fName)
+            except OSError:
+                pass
+    prg = cl.Program(ctx, source).build(opts)
+    try:
+        binaries = prg.get_info(cl.program_info.BINARIES)
+        if len(binaries) > 0 and len(binaries[0]) > 0:
+            os.makedirs(path, exist_ok=True)
+            _writeFile(fName, bytes(binaries[0]))
+            saveRecipe('opencl', files, options, device)
+            prune()
+    except OSError:
+        pass
+    return prg
+
+def buildCuPyModule(source, options, files = None):
+    """
+    Compiles the CuPy RawModule with the CuPy kernel cache pointed to the
+    OMEGA kernel cache directory. options is a tuple of compiler options.
+    files is the list of kernel files the source consists of and is only used
+    for the warmup recipes.
+    """
+    import cupy as cp
+    mod = cp.RawModule(code=source, options=options)
+    path = os.path.join(cacheDir(), 'cupy')
+    old = os.environ.get('CUPY_CACHE_DIR', None)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError:
+        return mod
+    os.environ['CUPY_CACHE_DIR'] = path
+    try:
+        mod.compile()
+    finally:
+        if old is None:
+            del os.environ['CUPY_CACHE_DIR']
+        else:
+            os.environ['CUPY_CACHE_DIR'] = old
+    try:
+        device = cp.cuda.Device().compute_capability
+        saveRecipe('cupy', files, options, str(device))
+        prune()
+    except OSError:
+        pass
+    return mod
+
+def warmup(verbose = True):
+    """
+    Rebuilds every stored recipe using the current kernel sources. OpenCL
+    recipes are built on all the devices with matching identity, CuPy recipes
+    on the current CUDA device.
+    """
+    path = os.path.join(cacheDir(), 'recipes')
+    if not os.path.isdir(path):
+        if verbose:
+            print('No recipes found in ' + path)
+        return 0
+    recipes = []
+    for fName in sorted(os.listdir(path)):
+        if fName.endswith('.json'):
+            with open(os.path.join(path, fName), encoding="utf8") as f:
+                recipes.append(json.load(f))
+    nBuilt = 0
+    contexts = {}
+    for recipe in recipes:
+        tStart = time.time()
+        try:
+            source = loadSource(recipe['files'])
+        except OSError as e:
+            if verbose:
+                print('Skipping recipe, kernel file not found: ' + str(e))
+            continue
+        if recipe['backend'] == 'opencl':
+            try:
+                import pyopencl as cl
+            except ModuleNotFoundError:
+                print('PyOpenCL not found! Skipping OpenCL recipes.')
+                continue
+            if len(contexts) == 0:
+                for platform in cl.get_platforms():
+                    for device in platform.get_devices():
+                        ctx = cl.Context(devices=[device])
+                        contexts[openCLDeviceIdentity(ctx)] = ctx
+            if recipe['device'] not in contexts:
+                if verbose:
+                    print('Device ' + recipe['device'] + ' not available, skipping.')
+                continue
+            buildOpenCLProgram(contexts[recipe['device']], source, tuple(recipe['options']), recipe['files'])
+        elif recipe['backend'] == 'cupy':
+            try:
+                buildCuPyModule(source, tuple(recipe['options']), recipe['files'])
+            except ModuleNotFoundError:
+                print('CuPy not found! Skipping CUDA recipes.')
+                continue
+        nBuilt += 1
+        if verbose:
+            print('Built ' + ' + '.join(recipe['files']) + ' (' + recipe['backend'] + ') in ' + str(round(time.time() - tStart, 2)) + ' s')
+    return nBuilt
+
+def main(argv = None):
+    import argparse
+    parser = argparse.ArgumentParser(prog='python -m omegatomo.projector.kernelcache', description='Manage the OMEGA compiled kernel cache.')
+    parser.add_argument('command', choices=['list', 'warmup', 'prune', 'clear'])
+    parser.add_argument('--max-size', type=float, default=-1., help='Maximum cache size in MB for prune (default OMEGA_KERNEL_CACHE_SIZE or ' + str(DEFAULT_SIZE) + ')')
+    args = parser.parse_args(argv)
+    if args.command == 'list':
+        files = entries()
+        print('Cache directory: ' + cacheDir())
+        for path, size, t in sorted(files, key=lambda x: -x[2]):
+            print(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(t)) + '  ' + str(size // 1024).rjust(8) + ' kB  ' + os.path.relpath(path, cacheDir()))
+        print(str(len(files)) + ' files, ' + str(round(sum([x[1] for x in files]) / 1024**2, 2)) + ' MB')
+    elif args.command == 'warmup':
+        n = warmup()
+        print(str(n) + ' programs built or found in the cache')
+    elif args.command == 'prune':
+        maxSize = -1 if args.max_size < 0 else int(args.max_size * 1024 * 1024)
+        print(str(prune(maxSize)) + ' files removed')
+    elif args.command == 'clear':
+        clear()
+        print('Cache cleared')
+
+if __name__ == '__main__':
+    main()
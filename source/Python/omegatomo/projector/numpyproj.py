@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 10:12:41 2026
+
+Pure NumPy (CPU) implementation of the forward and backward projections of
+projectorClass. Supports the improved Siddon (projector type 1), orthogonal
+distance-based (type 2) and volume of intersection (type 3) ray tracers for
+CT, PET sinogram and PET list-mode data. The rays are processed in chunks,
+each chunk fully vectorized, and the chunks are divided between threads (NumPy
+releases the GIL for the heavy array operations).
+
+The weights of the volume of intersection projector do not exactly match the
+OpenCL kernels (projectorType123.cl), see computeChunk.
+"""
+
+import numpy as np
+
+# Maximum number of (ray, plane) or (ray, voxel) elements processed per chunk
+ELEMENTS_PER_CHUNK = 2**21
+# Same as THR in opencl_functions_orth3D.h
+THR = 0.01
+# Same as CC in general_opencl_functions.h
+CC = 1e3
+
+def initNumPyProjector(self):
+    """
+    Checks that the selected options are supported by the NumPy projector and
+    precomputes the per-volume image geometry. Called from initProjector
+    instead of the kernel compilation when useNumPy is True.
+    """
+    import os
+    if self.FPType not in [1, 2, 3] or self.BPType not in [1, 2, 3]:
+        raise ValueError('Only projector types 1, 2 and 3 (and their combinations) are supported with the NumPy projector!')
+    if self.SPECT:
+        raise ValueError('SPECT is not supported with the NumPy projector!')
+    if self.TOF_bins_used > 1:
+        raise ValueError('TOF is not supported with the NumPy projector!')
+    if self.useIndexBasedReconstruction:
+        raise ValueError('Index-based reconstruction is not supported with the NumPy projector!')
+    if self.n_rays_transaxial * self.n_rays_axial > 1:
+        raise ValueError('Multi-ray Siddon is not supported with the NumPy projector!')
+    if self.nLayers > 1:
+        raise ValueError('Multi-layer data is not supported with the NumPy projector!')
+    if self.use_raw_data:
+        raise ValueError('Raw data is not supported with the NumPy projector! Use sinogram or list-mode data.')
+    if self.useHelical:
+        raise ValueError('Curved helical data is not supported with the NumPy projector!')
+    if self.use_psf:
+        raise ValueError('PSF is not supported with the NumPy projector!')
+    if self.useMaskFP or self.useMaskBP:
+        raise ValueError('Forward and backward projection masks are not supported with the NumPy projector!')
+    if self.attenuation_correction or self.normalization_correction or self.additionalCorrection:
+        raise ValueError('Attenuation, normalization and additional corrections are not supported with the NumPy projector!')
+    if self.subsets > 1 and self.subsetType < 8 and self.listmode == 0:
+        raise ValueError('Only subset types 8-11 are supported with the NumPy projector!')
+    if (self.FPType == 2 or self.BPType == 2) and not (self.tube_width_z > 0 or self.tube_width_xy > 0):
+        raise ValueError('Orthogonal distance-based projector requires a nonzero tube width!')
+    if self.numPyThreads > 0:
+        self.nThreadsNumPy = int(self.numPyThreads)
+    else:
+        self.nThreadsNumPy = os.cpu_count() or 1
+    self.numPyGeom = [None] * (self.nMultiVolumes + 1)
+    for k in range(self.nMultiVolumes + 1):
+        self.numPyGeom[k] = (np.array([self.bx[k].item(), self.by[k].item(), self.bz[k].item()], dtype=np.float64),
+                             np.array([self.dx[k].item(), self.dy[k].item(), self.dz[k].item()], dtype=np.float64),
+                             np.array([self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()], dtype=np.int64))
+
+def subsetRays(self, subset):
+    """
+    Returns the number of rays in the current subset and the measurement
+    coordinates (detector coordinates) needed to form the ray endpoints.
+    """
+    if self.listmode > 0:
+        xs = self.x.ravel()[self.nMeas[subset] * 6 : self.nMeas[subset + 1] * 6]
+        return self.nMeasSubset[subset].item(), xs, None
+    nRays = self.nRowsD * self.nColsD * self.nProjSubset[subset].item()
+    if self.CT:
+        if self.pitch:
+            kerroin = 6
+        else:
+            kerroin = 2
+        xs = self.x.ravel()[self.nMeas[subset] * 6 : self.nMeas[subset + 1] * 6]
+        zs = self.z.ravel()[self.nMeas[subset] * kerroin : self.nMeas[subset + 1] * kerroin]
+    else:
+        xs = self.x.ravel()
+        zs = self.z.ravel()[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2]
+    return nRays, xs, zs
+
+def rayEndpoints(self, xs, zs, r0, r1):
+    """
+    Source (s) and detector (d) coordinates of the rays r0...r1-1 of the
+    current subset. Equivalent to getDetectorCoordinatesCT,
+    getDetectorCoordinatesFullSinogram and getDetectorCoordinatesListmode.
+    """
+    if self.listmode > 0:
+        apu = xs[r0 * 6 : r1 * 6].reshape(-1, 6).astype(np.float64)
+        return apu[:, 0:3], apu[:, 3:6]
+    r = np.arange(r0, r1, dtype=np.int64)
+    nDet = self.nRowsD * self.nColsD
+    iz = r // nDet
+    ixy = r - iz * nDet
+    if self.CT:
+        iy = ixy // self.nRowsD
+        ix = ixy - iy * self.nRowsD
+        indX = ix - self.nRowsD / 2. + .5
+        indY = iy - self.nColsD / 2. + .5
+        apu = xs.reshape(-1, 6)[iz, :].astype(np.float64)
+        s = apu[:, 0:3]
+        d = apu[:, 3:6]
+        if self.pitch:
+            uv = zs.reshape(-1, 6)[iz, :].astype(np.float64)
+            d += uv[:, 0:3] * indX[:, None] + uv[:, 3:6] * indY[:, None]
+        else:
+            uv = zs.reshape(-1, 2)[iz, :].astype(np.float64)
+            d[:, 0] += indX * uv[:, 0]
+            d[:, 1] += indX * uv[:, 1]
+            d[:, 2] += indY * self.dPitchY
+        return s, d
+    xy = xs.reshape(-1, 4)[ixy, :].astype(np.float64)
+    z = zs.reshape(-1, 2)[iz, :].astype(np.float64)
+    s = np.column_stack((xy[:, 0], xy[:, 1], z[:, 0]))
+    d = np.column_stack((xy[:, 2], xy[:, 3], z[:, 1]))
+    return s, d
+
+def intersectFOV(s, diff, b, bmax):
+    """
+    Parametric entry (tmin) and exit (tmax) points of the rays s + t * diff,
+    0 <= t <= 1, with the box [b, bmax].
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t1 = (b - s) / diff
+        t2 = (bmax - s) / diff
+    zero = diff == 0.
+    inside = (s >= b) & (s <= bmax)
+    tNear = np.where(zero, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    tFar = np.where(zero, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+    tmin = np.maximum(np.max(tNear, axis=1), 0.)
+    tmax = np.minimum(np.min(tFar, axis=1), 1.)
+    return tmin, tmax
+
+def siddon(s, d, b, dd, N):
+    """
+    Vectorized improved Siddon for a chunk of rays. Returns the (chunk) ray
+    index, the linear voxel index and the intersection length of every
+    ray-voxel intersection, as well as the ray lengths and the total
+    intersection lengths inside the FOV.
+    """
+    diff = d - s
+    L = np.sqrt(np.sum(diff * diff, axis=1))
+    bmax = b + N * dd
+    tmin, tmax = intersectFOV(s, diff, b, bmax)
+    valid = tmax > tmin
+    tmin = np.where(valid, tmin, 0.)
+    tmax = np.where(valid, tmax, 0.)
+    T = [tmin[:, None]]
+    for ax in range(3):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            tp = (b[ax] + np.arange(N[ax] + 1) * dd[ax] - s[:, ax, None]) / diff[:, ax, None]
+        tp[~np.isfinite(tp)] = 1.
+        T.append(np.clip(tp, tmin[:, None], tmax[:, None]))
+    T.append(tmax[:, None])
+    T = np.concatenate(T, axis=1)
+    T.sort(axis=1)
+    seg = np.diff(T, axis=1)
+    seg[~valid, :] = 0.
+    r, c = np.nonzero(seg > 0.)
+    tm = (T[r, c] + T[r, c + 1]) * .5
+    ijk = np.floor((s[r, :] + tm[:, None] * diff[r, :] - b) / dd).astype(np.int64)
+    np.clip(ijk, 0, N - 1, out=ijk)
+    vox = ijk[:, 0] + ijk[:, 1] * N[0] + ijk[:, 2] * (N[0] * N[1])
+    LL = np.where(valid, (tmax - tmin) * L, 0.)
+    return r, vox, seg[r, c] * L[r], L, LL
+
+def orthCandidates(s, d, b, dd, N, width, transaxial, axial):
+    """
+    Vectorized search of all the voxels whose center is closer than width to
+    the ray. Like the OpenCL kernel, the rays are traversed through either the
+    x- or y-slices, whichever direction dominates, and in each slice the
+    neighboring voxels are searched. If transaxial (axial) is False only the
+    voxel containing the ray is used in the in-slice transaxial (axial)
+    direction (2.5D mode). Unlike in the kernel, the distances are exact, i.e.
+    the selected voxels can differ near width. Returns the (chunk) ray index, the linear voxel
+    index and the orthogonal distance, as well as the ray lengths and the
+    total intersection lengths inside the FOV.
+    """
+    diff = d - s
+    L = np.sqrt(np.sum(diff * diff, axis=1))
+    tmin, tmax = intersectFOV(s, diff, b, b + N * dd)
+    LL = np.where(tmax > tmin, (tmax - tmin) * L, 0.)
+    rOut = []
+    voxOut = []
+    distOut = []
+    XY = np.abs(diff[:, 0]) >= np.abs(diff[:, 1])
+    for a, o in ((0, 1), (1, 0)):
+        if a == 0:
+            rays = np.nonzero(XY & (L > 0.))[0]
+        else:
+            rays = np.nonzero(~XY & (L > 0.))[0]
+        if rays.size == 0:
+            continue
+        u = diff[rays, :] / L[rays, None]
+        # In each slice, the voxels closer than width are inside an ellipse
+        # centered at the ray, these are its half-widths in voxels
+        if transaxial:
+            Wo = np.minimum(np.ceil(width * np.sqrt(u[:, a]**2 + u[:, o]**2) / np.abs(u[:, a]) / dd[o]), N[o]).astype(np.int64)
+        else:
+            Wo = np.zeros(rays.size, dtype=np.int64)
+        if axial:
+            Wz = np.minimum(np.ceil(width * np.sqrt(u[:, a]**2 + u[:, 2]**2) / np.abs(u[:, a]) / dd[2]), N[2]).astype(np.int64)
+        else:
+            Wz = np.zeros(rays.size, dtype=np.int64)
+        ca = b[a] + (np.arange(N[a]) + .5) * dd[a]
+        # Rays with the same search window are processed together
+        W = Wo * (N[2] + 1) + Wz
+        for w in np.unique(W):
+            ind = np.nonzero(W == w)[0]
+            rW = rays[ind]
+            uW = u[ind, :]
+            wo = w // (N[2] + 1)
+            wz = w - wo * (N[2] + 1)
+            t = (ca[None, :] - s[rW, a, None]) / diff[rW, a, None]
+            po = s[rW, o, None] + t * diff[rW, o, None]
+            pz = s[rW, 2, None] + t * diff[rW, 2, None]
+            jo = np.floor((po - b[o]) / dd[o]).astype(np.int64)
+            jz = np.floor((pz - b[2]) / dd[2]).astype(np.int64)
+            oo = np.arange(-wo, wo + 1, dtype=np.int64)
+            oz = np.arange(-wz, wz + 1, dtype=np.int64)
+            # Distance from the voxel center to the ray, the center and the
+            # ray are on the same slice
+            vo = (b[o] + (jo + .5) * dd[o] - po)[:, :, None] + oo * dd[o]
+            vz = (b[2] + (jz + .5) * dd[2] - pz)[:, :, None] + oz * dd[2]
+            okO = (jo[:, :, None] + oo >= 0) & (jo[:, :, None] + oo < N[o])
+            okZ = (jz[:, :, None] + oz >= 0) & (jz[:, :, None] + oz < N[2])
+            dot = (vo * uW[:, o, None, None])[:, :, :, None] + (vz * uW[:, 2, None, None])[:, :, None, :]
+            dist2 = (vo * vo)[:, :, :, None] + (vz * vz)[:, :, None, :] - dot * dot
+            ok = (dist2 < width * width) & okO[:, :, :, None] & okZ[:, :, None, :]
+            idx = np.flatnonzero(ok)
+            kk = idx % oz.size
+            apu = idx // oz.size
+            uu = apu % oo.size
+            apu = apu // oo.size
+            ii = apu % N[a]
+            rr = apu // N[a]
+            ijk = np.empty((idx.size, 3), dtype=np.int64)
+            ijk[:, a] = ii
+            ijk[:, o] = jo[rr, ii] + oo[uu]
+            ijk[:, 2] = jz[rr, ii] + oz[kk]
+            rOut.append(rW[rr])
+            voxOut.append(ijk[:, 0] + ijk[:, 1] * N[0] + ijk[:, 2] * (N[0] * N[1]))
+            distOut.append(np.sqrt(np.maximum(dist2.ravel()[idx], 0.)))
+    if len(rOut) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64), L, LL
+    return np.concatenate(rOut), np.concatenate(voxOut), np.concatenate(distOut), L, LL
+
+def computeChunk(self, s, d, k, projType):
+    """
+    System matrix elements of a chunk of rays for the volume k. Returns the
+    (chunk) ray index, the linear voxel index and the weights, including the
+    ray-based normalization (temp in the OpenCL kernels).
+    """
+    b, dd, N = self.numPyGeom[k]
+    if projType == 1:
+        r, vox, w, L, LL = siddon(s, d, b, dd, N)
+    else:
+        if projType == 2:
+            width = self.tube_width_z if self.tube_width_z > 0 else self.tube_width_xy
+            r, vox, dist, L, LL = orthCandidates(s, d, b, dd, N, (1. - THR) * width, self.orthTransaxial, self.orthAxial)
+            keep = dist < (1. - THR) * width
+            r = r[keep]
+            vox = vox[keep]
+            w = 1. - dist[keep] / width
+        else:
+            r, vox, dist, L, LL = orthCandidates(s, d, b, dd, N, self.bmax, self.orthTransaxial, self.orthAxial)
+            keep = dist <= self.bmax
+            r = r[keep]
+            vox = vox[keep]
+            dist = dist[keep]
+            # Deviates from the OpenCL kernel: the candidate voxels are
+            # selected with the exact (float64) distance to the ray instead of
+            # the kernel's incremental (float32) traversal of the neighboring
+            # voxels, so voxels near bmax can be included differently. On a
+            # small CT geometry, the forward projections differ by less than
+            # 1 % (99th percentile 0.1 %). Furthermore, the V index is clamped:
+            # computeVoxelVolumes can return a V shorter than
+            # (bmax - bmin) * CC + 1 elements, which the kernel then reads out
+            # of bounds
+            ind = np.clip(np.rint((dist - self.bmin) * CC).astype(np.int64), 0, self.V.size - 1)
+            w = np.where(dist < self.bmin, self.Vmax, self.V[ind])
+    if self.CT:
+        temp = None
+    else:
+        with np.errstate(divide='ignore'):
+            if projType == 1:
+                if self.useTotLength:
+                    temp = 1. / L
+                else:
+                    temp = 1. / LL
+            elif projType == 2:
+                temp = np.ones(L.size, dtype=np.float64)
+            else:
+                if self.useTotLength:
+                    temp = np.pi / (L * self.tube_radius**2)
+                else:
+                    temp = np.pi / (LL * self.tube_radius**2)
+        temp[~np.isfinite(temp)] = 0.
+        temp *= self.global_factor
+    return r, vox, w, temp
+
+def runChunks(self, nRays, nPerRay, fun):
+    """
+    Divides the rays into chunks and the chunks to nThreadsNumPy threads.
+    fun(thread, r0, r1) is called for each chunk r0...r1-1.
+    """
+    nChunk = max(ELEMENTS_PER_CHUNK // max(nPerRay, 1), 1)
+    chunks = [(r0, min(r0 + nChunk, nRays)) for r0 in range(0, nRays, nChunk)]
+    nThreads = max(min(self.nThreadsNumPy, len(chunks)), 1)
+    def worker(thread):
+        for r0, r1 in chunks[thread::nThreads]:
+            fun(thread, r0, r1)
+    if nThreads == 1:
+        worker(0)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=nThreads) as executor:
+            for res in executor.map(worker, range(nThreads)):
+                pass
+    return nThreads
+
+def elementsPerRay(self, k, projType):
+    b, dd, N = self.numPyGeom[k]
+    if projType == 1:
+        return int(np.sum(N)) + 5
+    if projType == 2:
+        width = self.tube_width_z if self.tube_width_z > 0 else self.tube_width_xy
+    else:
+        width = self.bmax
+    W = int(np.ceil(2. * width / np.min(dd))) + 1
+    return int(np.max(N[0:2])) * W * W
+
+def forwardProjectionNumPy(self, f, subset):
+    if isinstance(f, list):
+        nVol = len(f)
+    else:
+        nVol = 1
+        f = [f]
+    nRays, xs, zs = subsetRays(self, subset)
+    y = np.zeros(nRays, dtype=np.float32)
+    for k in range(nVol):
+        fk = np.asarray(f[k], dtype=np.float32).ravel('F')
+        def fun(thread, r0, r1):
+            s, d = rayEndpoints(self, xs, zs, r0, r1)
+            r, vox, w, temp = computeChunk(self, s, d, k, self.FPType)
+            apu = np.bincount(r, weights=w * fk[vox], minlength=r1 - r0)
+            if temp is not None:
+                apu *= temp
+            y[r0 : r1] += apu.astype(np.float32)
+        runChunks(self, nRays, elementsPerRay(self, k, self.FPType), fun)
+    return y
+
+def backwardProjectionNumPy(self, y, subset):
+    nRays, xs, zs = subsetRays(self, subset)
+    y = np.asarray(y, dtype=np.float32).ravel('F')
+    if y.size != nRays:
+        raise ValueError('The size of the input measurement vector (' + str(y.size) + ') does not match the number of measurements in the current subset (' + str(nRays) + ')!')
+    f = [None] * (self.nMultiVolumes + 1)
+    for k in range(self.nMultiVolumes + 1):
+        Nk = int(np.prod(self.numPyGeom[k][2]))
+        partial = [None] * self.nThreadsNumPy
+        def fun(thread, r0, r1):
+            s, d = rayEndpoints(self, xs, zs, r0, r1)
+            r, vox, w, temp = computeChunk(self, s, d, k, self.BPType)
+            yk = y[r0 : r1].astype(np.float64)
+            if temp is not None:
+                yk *= temp
+            apu = np.bincount(vox, weights=w * yk[r], minlength=Nk)
+            if partial[thread] is None:
+                partial[thread] = apu
+            else:
+                partial[thread] += apu
+        nThreads = runChunks(self, nRays, elementsPerRay(self, k, self.BPType), fun)
+        apu = np.zeros(Nk, dtype=np.float64)
+        for thread in range(nThreads):
+            if partial[thread] is not None:
+                apu += partial[thread]
+        f[k] = apu.astype(np.float32)
+    if self.nMultiVolumes > 0:
+        return f
+    return f[0]
@@ -227,6 +227,18 @@ class projectorClass:
     subtract_scatter = True
     useCUDA = False
     useCPU = False
+    useNumPy = False
+    numPyThreads = 0
+    useKernelCache = True
+    # Record the constant OpenCL kernel arguments once per (volume, subset)
+    persistentKernelArgs = True
+    # Reuse the summed-area tables of projector type 5 while the image is unchanged. None enables the
+    # cache only with PyTorch, whose tensors have a version counter. If True, imageUpdated() has to be
+    # called after every in-place modification of the image
+    cacheSAT = None
+    useIndexCache = False
+    # Store the detector and sinogram coordinates on disk too (see detcoord.py), i.e. they are reused across jobs
+    useCoordinateCache = False
     NxFull = 1
     NyFull = 1
     NzFull = 1
@@ -459,6 +471,8 @@ class projectorClass:
     subset = 0
     largeDim = False
     loadTOF = True
+    # Number of list-mode subsets kept on the device when loadTOF is False
+    listmodeRingSize = 2
     useAF = False
     useTorch = False
     useCuPy = False
@@ -481,6 +495,7 @@ class projectorClass:
     flipImageZ = False
     rayShiftsDetector: npt.NDArray[np.float32] = np.empty(0, dtype=np.float32)
     rayShiftsSource: npt.NDArray[np.float32] = np.empty(0, dtype=np.float32)
+    rayShiftsCompact = True # Projection-invariant ray shift tables
     CORtoDetectorSurface: float = 0 # Detector swivel radius
     swivelAngles: npt.NDArray[np.float32] = np.empty(0, dtype = np.float32)
     coneOfResponseStdCoeffA = -1
@@ -511,6 +526,12 @@ class projectorClass:
     # Compute the spatial prior/regularization only every regEveryIter-th (sub)iteration. 1 (or less)
     # computes it every time (default); the first and last iteration are always computed.
     regEveryIter = 1
+    # Accumulation of the backprojection with the CPU implementation (useCPU). 0 uses atomic operations
+    # (default), 1 per-thread images that are summed after the backprojection. 1 scales better with many
+    # threads, but needs one image (two if the sensitivity image is computed) of memory per thread.
+    BPAccumulation = 0
+    # Number of threads used by the CPU implementation, 0 uses all
+    CPUThreads = 0
 
     def __init__(self):
         # C-struct
@@ -1241,6 +1262,8 @@ class projectorClass:
                 raise ValueError('Large dimension support is only for projector types 4 and 14!')
         if self.useCUDA and self.useCPU:
             raise ValueError('Both CUDA and CPU selected! Select only one!')
+        if self.useNumPy and (self.useCUDA or self.useCPU or self.useAF or self.useCuPy or self.useTorch):
+            raise ValueError('NumPy projector selected together with another backend! Select only one!')
         
         if self.TOF_bins_used > 1 and (self.projector_type not in [1, 11, 3, 33, 31, 13, 4, 41, 14, 43, 34]) and not self.CT and not self.SPECT:
             raise ValueError('TOF is currently only supported with improved Siddon (projector_type = 1), interpolation-based projector (projector_type = 4) and volume of intersection (projector_type = 3)')
@@ -1269,6 +1292,8 @@ class projectorClass:
             raise ValueError('Reference image weighting for NLM is not supported with CPU!')
         if self.useIndexBasedReconstruction and self.useCPU:
             raise ValueError('Index-based reconstruction is not supported on CPU!')
+        if self.useCPU and self.BPAccumulation not in [0, 1]:
+            raise ValueError('BPAccumulation has to be either 0 (atomic operations) or 1 (per-thread images)!')
         if self.useCPU:
             print('CPU functionality is limited and might not work correctly in all cases! Use at your own risk!')
         if self.useHelical and not self.projector_type == 4:
@@ -1333,7 +1358,7 @@ class projectorClass:
                 except ModuleNotFoundError:
                     print('ArrayFire package not found! ArrayFire features are not supported. You can install ArrayFire package with "pip install arrayfire".')
                     AFinstalled = False
-                if AFinstalled and not self.useCPU:
+                if AFinstalled and not self.useCPU and not self.useNumPy:
                     dispaus = f"Using implementation {self.implementation} with "
                     try:
                         if not self.useCUDA and af.get_active_backend() != 'opencl':
@@ -1355,6 +1380,8 @@ class projectorClass:
                     print(dispaus)
                 elif self.useCPU:
                     print('Using CPU-based reconstruction')
+                elif self.useNumPy:
+                    print('Using NumPy-based CPU projector')
                 else:
                     print('Selected device number is ' + str(self.deviceNum))
                     
@@ -1929,7 +1956,38 @@ class projectorClass:
             self.initProj()
         from omegatomo.projector.projfunctions import backwardProjection
         return backwardProjection(self, y, subset)
+        
+    def forwardProjectBatch(self, f, subset = -1):
+        if not(self.projectorInitialized):
+            self.initProj()
+        from omegatomo.projector.projfunctions import forwardProjectionBatch
+        return forwardProjectionBatch(self, f, subset)
+        
+    def backwardProjectBatch(self, y, subset = -1):
+        if not(self.projectorInitialized):
+            self.initProj()
+        from omegatomo.projector.projfunctions import backwardProjectionBatch
+        return backwardProjectionBatch(self, y, subset)
+    
+    
+    def releaseTextures(self, name = None):
+        """
+        Frees the pooled images/textures of the forward ('FP') and/or backward
+        ('BP') projections. They are recreated on the next projection.
+        """
+        if hasattr(self, 'texPool'):
+            self.texPool.release(name)
+        if hasattr(self, 'satCache') and name in [None, 'FP']:
+            self.satCache.release()
     
+    def imageUpdated(self):
+        """
+        Call after modifying the input image of the forward projection in
+        place (other than PyTorch tensors) when using projector type 5, so
+        that the cached summed-area tables are recomputed.
+        """
+        if hasattr(self, 'satCache'):
+            self.satCache.invalidate()
     
     def T(self):
         self.trans = True
@@ -2005,6 +2063,8 @@ class projectorClass:
             ('localSizeY', ctypes.c_int32),
             ('localSizeZ', ctypes.c_int32),
             ('regEveryIter', ctypes.c_int32),
+            ('BPAccumulation', ctypes.c_uint32),
+            ('CPUThreads', ctypes.c_uint32),
             ('NiterAD', ctypes.c_uint32),
             ('inffi', ctypes.c_uint32),
             ('Nf', ctypes.c_uint32),
@@ -83,9 +83,134 @@ def conv3D(self, f, ii = 0):
         af.device.unlock_array(output)
     return output
 
-def forwardProjection(self, f, subset = -1):
+def loadSAT(self, f, k):
+    """
+    Summed-area tables of the volume k for the forward projector type 5. The
+    tables are computed with the SATRows/SATColumns kernels into the
+    preallocated buffers of self.satCache and copied into the pooled images
+    (OpenCL) or textures (CUDA). If the tables were already computed from f,
+    nothing is done, see satcache.py. Returns the (possibly PSF-convolved)
+    image and the two images/textures (YZ-plane and XZ-plane tables).
+    """
+    Nx = self.Nx[k].item()
+    Ny = self.Ny[k].item()
+    Nz = self.Nz[k].item()
+    # (n0, n1, n2) of the table and the strides of the corresponding input dimensions
+    tables = ((Ny, Nz, Nx, Nx, Nx * Ny, 1), (Nx, Nz, Ny, 1, Nx * Ny, Nx))
+    if self.useCUDA:
+        import cupy as cp
+        kohteet = tuple(self.texPool.texture(('FP', k, 1 - ii), (n0 + 1, n1 + 1, n2)) for ii, (n0, n1, n2, s0, s1, s2) in enumerate(tables))
+    else:
+        import pyopencl as cl
+        kohteet = tuple(self.texPool.image(('FP', k, 1 - ii), (n0 + 1, n1 + 1, n2)) for ii, (n0, n1, n2, s0, s1, s2) in enumerate(tables))
+    fOut = self.satCache.get(k, f, kohteet)
+    if fOut is not None:
+        return (fOut,) + kohteet
+    if self.use_psf:
+        fOut = self.computeConvolution(f)
+    else:
+        fOut = f
+    if self.useCUDA:
+        fD = cp.asarray(fOut)
+        for ii, (n0, n1, n2, s0, s1, s2) in enumerate(tables):
+            out = self.satCache.buffer((k, ii), (n0 + 1) * (n1 + 1) * n2, lambda koko : cp.empty(koko, dtype=cp.float32))
+            self.knlSATRows(((n2 + 15) // 16, (n1 + 16) // 16, 1), (16, 16, 1), (fD, out, cp.uint32(n0), cp.uint32(n1), cp.uint32(n2), cp.uint64(s0), cp.uint64(s1), cp.uint64(s2)))
+            self.knlSATColumns(((n0 + 16) // 16, (n2 + 15) // 16, 1), (16, 16, 1), (out, cp.uint32(n0), cp.uint32(n1), cp.uint32(n2)))
+            self.texPool.texture(('FP', k, 1 - ii), (n0 + 1, n1 + 1, n2), out.reshape((n2, n1 + 1, n0 + 1)), True)
+    else:
+        if self.useAF:
+            import arrayfire as af
+            fD = cl.MemoryObject.from_int_ptr(fOut.raw_ptr())
+        else:
+            fD = fOut.data
+        for ii, (n0, n1, n2, s0, s1, s2) in enumerate(tables):
+            out = self.satCache.buffer((k, ii), (n0 + 1) * (n1 + 1) * n2, lambda koko : cl.Buffer(self.clctx, cl.mem_flags.READ_WRITE, koko * 4))
+            self.knlSATRows.set_args(fD, out, (cl.cltypes.uint)(n0), (cl.cltypes.uint)(n1), (cl.cltypes.uint)(n2), (cl.cltypes.ulong)(s0), (cl.cltypes.ulong)(s1), (cl.cltypes.ulong)(s2))
+            cl.enqueue_nd_range_kernel(self.queue, self.knlSATRows, (n2, n1 + 1), None)
+            self.knlSATColumns.set_args(out, (cl.cltypes.uint)(n0), (cl.cltypes.uint)(n1), (cl.cltypes.uint)(n2))
+            cl.enqueue_nd_range_kernel(self.queue, self.knlSATColumns, (n0 + 1, n2), None)
+            cl.enqueue_copy(self.queue, kohteet[ii], out, offset=(0), origin=(0,0,0), region=(n0 + 1, n1 + 1, n2))
+        if self.useAF:
+            af.device.unlock_array(fOut)
+    self.satCache.store(k, f, kohteet, fOut)
+    return (fOut,) + kohteet
+
+def _listmodeHost(self, subset):
+    # Host-side event data of the subset, i.e. the detector index pairs
+    # (index-based) or the 6 coordinates per event
+    if self.useIndexBasedReconstruction:
+        return (self.trIndex[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2], self.axIndex[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2])
+    apu = self.x.ravel()
+    return (apu[self.nMeas[subset] * 6 : self.nMeas[subset + 1] * 6],)
+
+def _listmodeUpload(self, subset, vanha = None):
+    # Copies the event data of the subset to the device. The buffers of an
+    # evicted subset (vanha) are reused when they are large enough. The
+    # OpenCL copies are non-blocking
+    host = _listmodeHost(self, subset)
+    out = []
+    for ii, h in enumerate(host):
+        if vanha is not None and vanha[ii].size >= h.size:
+            buf = vanha[ii]
+        elif self.useCUDA:
+            import cupy as cp
+            buf = cp.empty(h.size, dtype=h.dtype)
+        else:
+            import pyopencl as cl
+            import pyopencl.array
+            buf = cl.array.empty(self.queue, h.size, dtype=h.dtype)
+        if self.useCUDA:
+            buf[:h.size].set(h)
+        else:
+            buf[:h.size].set(h, async_=True)
+        out.append(buf)
+    return tuple(out)
+
+def loadListmodeSubset(self, subset):
+    """
+    Makes the list-mode event data of the given subset available on the device
+    when loadTOF is False, i.e. when all the subsets are not stored on the
+    device. The device buffers form a ring of listmodeRingSize subsets, the
+    subsets already in the ring are not copied again (e.g. the backprojection
+    after the forward projection of the same subset). The next subset is
+    prefetched into the ring, so with OpenCL its copy overlaps the current
+    subset. With listmodeRingSize >= subsets all the subsets stay resident
+    after they have been used once.
+    """
+    from collections import OrderedDict
+    if self.listmodeRing is None:
+        self.listmodeRing = OrderedDict()
+    ring = self.listmodeRing
+    koko = max(int(self.listmodeRingSize), 1)
+    for ii, s in enumerate((subset, (subset + 1) % self.subsets)):
+        if s in ring:
+            ring.move_to_end(s)
+            continue
+        if ii > 0 and koko < 2:
+            break
+        vanha = None
+        if len(ring) >= koko:
+            vanha = ring.popitem(last=False)[1]
+        ring[s] = _listmodeUpload(self, s, vanha)
+    d = ring[subset]
+    n = [h.size for h in _listmodeHost(self, subset)]
+    if self.useIndexBasedReconstruction:
+        self.d_trIndex[0] = d[0][:n[0]]
+        self.d_axIndex[0] = d[1][:n[1]]
+    else:
+        self.d_x[0] = d[0][:n[0]]
+
+def forwardProjection(self, f, subset = -1, sync = True):
     if subset == -1:
         subset = self.subset
+    if self.useNumPy:
+        from omegatomo.projector.numpyproj import forwardProjectionNumPy
+        return forwardProjectionNumPy(self, f, subset)
+    if self.useCPU:
+        from omegatomo.projector.cpuproj import forwardProjectionCPU
+        return forwardProjectionCPU(self, f, subset)
+    if not self.loadTOF and self.listmode > 0 and self.projector_type != 6:
+        loadListmodeSubset(self, subset)
     volumes = 0
     if self.projector_type == 6:
         if not self.useCUDA:
@@ -170,13 +295,6 @@ def forwardProjection(self, f, subset = -1):
         if self.useCUDA:
             if self.useCuPy:
                 import cupy as cp
-                if not self.loadTOF:
-                    if self.useIndexBasedReconstruction and self.listmode > 0:
-                        self.d_trIndex[0] = cp.asarray(self.trIndex[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2])
-                        self.d_axIndex[0] = cp.asarray(self.axIndex[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2])
-                    elif self.listmode > 0:
-                        apu = self.x.ravel()
-                        self.d_x[0] = cp.asarray(apu[self.nMeas[subset] * 6 : self.nMeas[subset + 1] * 6])
                 if self.useTorch:
                     import torch
                     if self.subsetType > 7 or self.subsets == 1:
@@ -190,52 +308,22 @@ def forwardProjection(self, f, subset = -1):
                     else:
                         y = cp.zeros(self.nMeasSubset[subset].item(), dtype=cp.float32)
                 for k in range(self.nMultiVolumes + 1):
-                    if isinstance(f,list):
-                        if self.use_psf:
-                            f[k] = self.computeConvolution(f[k])
-                        if self.useTorch:
-                            fD = cp.asarray(f[k])
-                    else:
-                        if self.use_psf:
-                            f = self.computeConvolution(f)
-                        if self.useTorch:
-                            fD = cp.asarray(f)
                     if self.FPType == 5:
-                        intIm = cp.zeros((self.Ny[k].item() + 1, self.Nz[k].item() + 1, self.Nx[k].item()), dtype=cp.float32, order='F')
-                        if self.useTorch:
-                            intIm[1:,1:,:] = cp.transpose(fD.reshape((self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), order='F'), (1, 2, 0))
+                        if isinstance(f,list):
+                            f[k], ff2, ff = loadSAT(self, f[k], k)
                         else:
-                            if isinstance(f,list):
-                                intIm[1:,1:,:] = cp.transpose(f[k].reshape((self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), order='F'), (1, 2, 0))
-                            else:
-                                intIm[1:,1:,:] = cp.transpose(f.reshape((self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), order='F'), (1, 2, 0))
-                        intIm = intIm.cumsum(0)
-                        intIm = intIm.cumsum(1)
-                        intIm = intIm.ravel('F')
-                        chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                        array = cp.cuda.texture.CUDAarray(chl, self.Ny[k].item() + 1, self.Nz[k].item() + 1, self.Nx[k].item())
-                        array.copy_from(intIm.reshape((self.Nx[k].item(), self.Nz[k].item() + 1, self.Ny[k].item() + 1)))
-                        res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                        tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
-                        ff2 = cp.cuda.texture.TextureObject(res, tdes)
-                        intIm = cp.zeros((self.Nx[k].item() + 1, self.Nz[k].item() + 1, self.Ny[k].item()), dtype=cp.float32, order='F')
-                        if self.useTorch:
-                            intIm[1:,1:,:] = cp.transpose(fD.reshape((self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), order='F'), (0, 2, 1))
+                            f, ff2, ff = loadSAT(self, f, k)
+                    else:
+                        if isinstance(f,list):
+                            if self.use_psf:
+                                f[k] = self.computeConvolution(f[k])
+                            if self.useTorch:
+                                fD = cp.asarray(f[k])
                         else:
-                            if isinstance(f,list):
-                                intIm[1:,1:,:] = cp.transpose(f[k].reshape((self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), order='F'), (0, 2, 1))
-                            else:
-                                intIm[1:,1:,:] = cp.transpose(f.reshape((self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), order='F'), (0, 2, 1))
-                        intIm = intIm.cumsum(0)
-                        intIm = intIm.cumsum(1)
-                        intIm = intIm.ravel('F')
-                        array2 = cp.cuda.texture.CUDAarray(chl, self.Nx[k].item() + 1, self.Nz[k].item() + 1, self.Ny[k].item())
-                        array2.copy_from(intIm.reshape((self.Ny[k].item(), self.Nz[k].item() + 1, self.Nx[k].item() + 1)))
-                        res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array2)
-                        tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
-                        ff = cp.cuda.texture.TextureObject(res, tdes)
+                            if self.use_psf:
+                                f = self.computeConvolution(f)
+                            if self.useTorch:
+                                fD = cp.asarray(f)
                     kIndLoc = self.kIndF
                     if self.FPType == 1 or self.FPType == 2 or self.FPType == 3 or self.FPType == 4:
                         if (self.attenuation_correction and not self.CTAttenuation):
@@ -265,28 +353,16 @@ def forwardProjection(self, f, subset = -1):
                             kIndLoc += (cp.float32(self.dScaleZ4[k].item()),)
                     if self.FPType == 4:
                         if isinstance(f,list):
-                            chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                            array = cp.cuda.texture.CUDAarray(chl, self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item())
                             if self.useTorch:
-                                array.copy_from(fD.reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())))
+                                ff = self.texPool.texture(('FP', k, 0), (self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), fD.reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())), True)
                             else:
-                                array.copy_from(f[k].reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())))
-                            res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                            tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                    filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
-                            ff = cp.cuda.texture.TextureObject(res, tdes)
+                                ff = self.texPool.texture(('FP', k, 0), (self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), f[k].reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())), True)
                             kIndLoc += (ff,)
                         else:
-                            chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                            array = cp.cuda.texture.CUDAarray(chl, self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item())
                             if self.useTorch:
-                                array.copy_from(fD.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())))
+                                ff = self.texPool.texture(('FP', 0, 0), (self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item()), fD.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())), True)
                             else:
-                                array.copy_from(f.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())))
-                            res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                            tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                    filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
-                            ff = cp.cuda.texture.TextureObject(res, tdes)
+                                ff = self.texPool.texture(('FP', 0, 0), (self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item()), f.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())), True)
                             kIndLoc += (ff,)
                         if self.useTorch:
                             kIndLoc += (yD,)
@@ -384,16 +460,10 @@ def forwardProjection(self, f, subset = -1):
                         # else:
                         if isinstance(f,list):
                             if self.useImages:
-                                chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                                array = cp.cuda.texture.CUDAarray(chl, self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item())
                                 if self.useTorch:
-                                    array.copy_from(fD.reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())))
+                                    ff = self.texPool.texture(('FP', k, 0), (self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), fD.reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())), False)
                                 else:
-                                    array.copy_from(f[k].reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())))
-                                res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                                tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                        filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
-                                ff = cp.cuda.texture.TextureObject(res, tdes)
+                                    ff = self.texPool.texture(('FP', k, 0), (self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()), f[k].reshape((self.Nz[k].item(), self.Ny[k].item(), self.Nx[k].item())), False)
                                 kIndLoc += (ff,)
                             else:
                                 if self.useTorch:
@@ -402,19 +472,13 @@ def forwardProjection(self, f, subset = -1):
                                     kIndLoc += (f[k],)
                         else:
                             if self.useImages:
-                                chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                                array = cp.cuda.texture.CUDAarray(chl, self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item())
                                 if self.useTorch:
                                     apuArray = fD.reshape((self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item()), order='F')
                                     apuArray = np.transpose(apuArray, (2, 1, 0))
-                                    array.copy_from(apuArray)
+                                    ff = self.texPool.texture(('FP', 0, 0), (self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item()), apuArray, False)
                                     # array.copy_from(fD.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())))
                                 else:
-                                    array.copy_from(f.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())))
-                                res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                                tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                        filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
-                                ff = cp.cuda.texture.TextureObject(res, tdes)
+                                    ff = self.texPool.texture(('FP', 0, 0), (self.Nx[0].item(), self.Ny[0].item(), self.Nz[0].item()), f.reshape((self.Nz[0].item(), self.Ny[0].item(), self.Nx[0].item())), False)
                                 kIndLoc += (ff,)
                             else:
                                 if self.useTorch:
@@ -432,7 +496,7 @@ def forwardProjection(self, f, subset = -1):
                     self.knlF((self.globalSizeFP[subset][0] // self.localSizeFP[0], self.globalSizeFP[subset][1] // self.localSizeFP[1], self.globalSizeFP[subset][2]), (self.localSizeFP[0], self.localSizeFP[1], 1),kIndLoc)
             else:
                 raise ValueError('Unsupported selection. Note that PyCUDA is no longer supported!')
-            if self.useTorch:
+            if self.useTorch and sync:
                 torch.cuda.synchronize()
             #     if self.useAF:
             #         if isinstance(f,list):
@@ -443,14 +507,6 @@ def forwardProjection(self, f, subset = -1):
             #     af.device.unlock_array(y)
         else:
             import pyopencl as cl
-            from pyopencl.version import VERSION
-            if not self.loadTOF:
-                if self.useIndexBasedReconstruction and self.listmode > 0:
-                    self.d_trIndex[0] = cl.array.to_device(self.queue, self.trIndex[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2])
-                    self.d_axIndex[0] = cl.array.to_device(self.queue, self.axIndex[self.nMeas[subset] * 2 : self.nMeas[subset + 1] * 2])
-                elif self.listmode > 0:
-                    apu = self.x.ravel()
-                    self.d_x[0] = cl.array.to_device(self.queue, apu[self.nMeas[subset] * 6 : self.nMeas[subset + 1] * 6])
             if self.useAF:
                 import arrayfire as af
                 if self.subsetType > 7 or self.subsets == 1:
@@ -464,23 +520,35 @@ def forwardProjection(self, f, subset = -1):
                     y = cl.array.zeros(self.queue, self.nRowsD * self.nColsD * self.nProjSubset[subset].item(), dtype=cl.cltypes.float)
                 else:
                     y = cl.array.zeros(self.queue, self.nMeasSubset[subset].item(), dtype=cl.cltypes.float)
-            imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
-            mf = cl.mem_flags
+            # Values of the per-call kernel arguments, see kernelargs.py
+            def arvoF(nimi):
+                if nimi == 'y':
+                    return yD if self.useAF else y.data
+                elif nimi == 'im':
+                    return d_im
+                elif nimi == 'imInt':
+                    return d_imInt
+                elif nimi == 'f':
+                    return f.data
+                elif nimi == 'x':
+                    return self.d_x[0].data
+                elif nimi == 'trIndex':
+                    return self.d_trIndex[0].data
+                else:
+                    return self.d_axIndex[0].data
             for k in range(self.nMultiVolumes + 1):
                 if self.useImages:
                     if self.FPType < 5:
-                        if VERSION[0] > 2024 or (VERSION[0] == 2024 and VERSION[1] > 2):
-                            d_im = cl.create_image(self.clctx, mf.READ_ONLY, imformat, shape=(self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()))
-                        else:
-                            d_im = cl.Image(self.clctx, mf.READ_ONLY, imformat, shape=(self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()))
+                        d_im = self.texPool.image(('FP', k, 0), (self.Nx[k].item(), self.Ny[k].item(), self.Nz[k].item()))
                     else:
-                        if VERSION[0] > 2024 or (VERSION[0] == 2024 and VERSION[1] > 2):
-                            d_imInt = cl.create_image(self.clctx, mf.READ_ONLY, imformat, shape=(self.Ny[k].item() + 1, self.Nz[k].item() + 1, self.Nx[k].item()))
-                            d_im = cl.create_image(self.clctx, mf.READ_ONLY, imformat, shape=(self.Nx[k].item() + 1, self.Nz[k].item() + 1, self.Ny[k].item()))
+                        d_imInt = self.texPool.image(('FP', k, 1), (self.Ny[k].item() + 1, self.Nz[k].item() + 1, self.Nx[k].item()))
+                        d_im = self.texPool.image(('FP', k, 0), (self.Nx[k].item() + 1, self.Nz[k].item() + 1, self.Ny[k].item()))
+                    if self.FPType == 5 and not (self.useAF and self.meanFP):
+                        if isinstance(f,list):
+                            f[k], d_imInt, d_im = loadSAT(self, f[k], k)
                         else:
-                            d_imInt = cl.Image(self.clctx, mf.READ_ONLY, imformat, shape=(self.Ny[k].item() + 1, self.Nz[k].item() + 1, self.Nx[k].item()))
-                            d_im = cl.Image(self.clctx, mf.READ_ONLY, imformat, shape=(self.Nx[k].item() + 1, self.Nz[k].item() + 1, self.Ny[k].item()))
-                    if isinstance(f,list):
+                            f, d_imInt, d_im = loadSAT(self, f, k)
+                    elif isinstance(f,list):
                         if self.use_psf:
                             f[k] = self.computeConvolution(f[k])
                         if self.useAF:
@@ -560,169 +628,169 @@ def forwardProjection(self, f, subset = -1):
                         else:
                             fPtr = f.raw_ptr()
                         d_im = cl.MemoryObject.from_int_ptr(fPtr)
-                kIndLoc = self.kIndF
-                if self.FPType == 1 or self.FPType == 2 or self.FPType == 3 or self.FPType == 4:
-                    if (self.attenuation_correction and not self.CTAttenuation):
-                        self.knlF.set_arg(kIndLoc, self.d_atten[subset].data)
-                        kIndLoc += 1
-                    # elif self.attenuation_correction and self.CTAttenuation:
-                    #     self.knlF.set_arg(kIndLoc, self.d_atten.data)
-                    #     kIndLoc += 1
-                if self.FPType == 5 or self.FPType == 4:
-                    self.knlF.set_arg(kIndLoc, self.d_Nxyz[k])
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_b[k])
-                    kIndLoc += 1
-                    if self.FPType == 5:
-                        self.knlF.set_arg(kIndLoc, self.dSize[k])
+                key = ('FP', k, subset)
+                argSet = self.kernelArgs.get(key)
+                if argSet is None:
+                    argSet = self.kernelArgs.record(self.knlF, key)
+                    kIndLoc = self.kIndF
+                    if self.FPType == 1 or self.FPType == 2 or self.FPType == 3 or self.FPType == 4:
+                        if (self.attenuation_correction and not self.CTAttenuation):
+                            argSet.set_arg(kIndLoc, self.d_atten[subset].data)
+                            kIndLoc += 1
+                        # elif self.attenuation_correction and self.CTAttenuation:
+                        #     self.knlF.set_arg(kIndLoc, self.d_atten.data)
+                        #     kIndLoc += 1
+                    if self.FPType == 5 or self.FPType == 4:
+                        argSet.set_arg(kIndLoc, self.d_Nxyz[k])
                         kIndLoc += 1
-                        self.knlF.set_arg(kIndLoc, self.d_d[k])
+                        argSet.set_arg(kIndLoc, self.d_b[k])
                         kIndLoc += 1
-                        self.knlF.set_arg(kIndLoc, self.d_Scale[k])
+                        if self.FPType == 5:
+                            argSet.set_arg(kIndLoc, self.dSize[k])
+                            kIndLoc += 1
+                            argSet.set_arg(kIndLoc, self.d_d[k])
+                            kIndLoc += 1
+                            argSet.set_arg(kIndLoc, self.d_Scale[k])
+                            kIndLoc += 1
+                        else:
+                            argSet.set_arg(kIndLoc, self.d_bmax[k])
+                            kIndLoc += 1
+                            argSet.set_arg(kIndLoc, self.d_Scale4[k])
+                            kIndLoc += 1
+                    if self.FPType == 4:
+                        if not self.useImages:
+                            raise ValueError('Projector type 4 forward projection only works with images!')
+                        argSet.perCall(kIndLoc, 'im')
                         kIndLoc += 1
-                    else:
-                        self.knlF.set_arg(kIndLoc, self.d_bmax[k])
+                        argSet.perCall(kIndLoc, 'y')
                         kIndLoc += 1
-                        self.knlF.set_arg(kIndLoc, self.d_Scale4[k])
+                        if (self.listmode == 0 and not self.CT):
+                            argSet.perCall(kIndLoc, 'x')
+                        else:
+                            argSet.set_arg(kIndLoc, self.d_x[subset].data)
                         kIndLoc += 1
-                if self.FPType == 4:
-                    if not self.useImages:
-                        raise ValueError('Projector type 4 forward projection only works with images!')
-                    self.knlF.set_arg(kIndLoc, d_im)
-                    kIndLoc += 1
-                    if self.useAF:
-                        self.knlF.set_arg(kIndLoc, yD)
-                    else:
-                        self.knlF.set_arg(kIndLoc, y.data)
-                    kIndLoc += 1
-                    if (self.listmode == 0 and not self.CT):
-                        self.knlF.set_arg(kIndLoc, self.d_x[0].data)
-                    else:
-                        self.knlF.set_arg(kIndLoc, self.d_x[subset].data)
-                    kIndLoc += 1
-                    if (self.CT or self.PET or self.listmode > 0):
-                        self.knlF.set_arg(kIndLoc, self.d_z[subset].data)
-                    else:
-                        self.knlF.set_arg(kIndLoc, self.d_z[0].data)
-                    kIndLoc += 1
-                    if self.useMaskFP:
-                        if self.maskFPZ > 1:
-                            self.knlF.set_arg(kIndLoc, self.d_maskFP[subset])
+                        if (self.CT or self.PET or self.listmode > 0):
+                            argSet.set_arg(kIndLoc, self.d_z[subset].data)
                         else:
-                            self.knlF.set_arg(kIndLoc, self.d_maskFP)
+                            argSet.set_arg(kIndLoc, self.d_z[0].data)
                         kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
-                    kIndLoc += 1
-                    if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
-                        self.knlF.set_arg(kIndLoc, self.d_xyindex[subset].data)
+                        if self.useMaskFP:
+                            if self.maskFPZ > 1:
+                                argSet.set_arg(kIndLoc, self.d_maskFP[subset])
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_maskFP)
+                            kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
                         kIndLoc += 1
-                        self.knlF.set_arg(kIndLoc, self.d_zindex[subset].data)
+                        if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
+                            argSet.set_arg(kIndLoc, self.d_xyindex[subset].data)
+                            kIndLoc += 1
+                            argSet.set_arg(kIndLoc, self.d_zindex[subset].data)
+                            kIndLoc += 1
+                        if (self.normalization_correction):
+                            argSet.set_arg(kIndLoc, self.d_norm[subset].data)
+                            kIndLoc += 1
+                        elif (self.additionalCorrection):
+                            argSet.set_arg(kIndLoc, self.d_corr[subset].data)
+                            kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
                         kIndLoc += 1
-                    if (self.normalization_correction):
-                        self.knlF.set_arg(kIndLoc, self.d_norm[subset].data)
+                        argSet.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
                         kIndLoc += 1
-                    elif (self.additionalCorrection):
-                        self.knlF.set_arg(kIndLoc, self.d_corr[subset].data)
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
                         kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.int)(k))
-                elif self.FPType == 5:
-                    self.knlF.set_arg(kIndLoc, self.d_x[subset].data)
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_z[subset].data)
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, d_im)
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, d_imInt)
-                    kIndLoc += 1
-                    if self.useAF:
-                        self.knlF.set_arg(kIndLoc, yD)
-                    else:
-                        self.knlF.set_arg(kIndLoc, y.data)
-                    kIndLoc += 1
-                    if self.useMaskFP:
-                        if self.maskFPZ > 1:
-                            self.knlF.set_arg(kIndLoc, self.d_maskFP[subset])
+                        argSet.set_arg(kIndLoc, (cl.cltypes.int)(k))
+                    elif self.FPType == 5:
+                        argSet.set_arg(kIndLoc, self.d_x[subset].data)
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, self.d_z[subset].data)
+                        kIndLoc += 1
+                        argSet.perCall(kIndLoc, 'im')
+                        kIndLoc += 1
+                        argSet.perCall(kIndLoc, 'imInt')
+                        kIndLoc += 1
+                        argSet.perCall(kIndLoc, 'y')
+                        kIndLoc += 1
+                        if self.useMaskFP:
+                            if self.maskFPZ > 1:
+                                argSet.set_arg(kIndLoc, self.d_maskFP[subset])
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_maskFP)
+                            kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
+                        # if self.meanFP:
+                    elif self.FPType in [1, 2, 3]:
+                        if self.useMaskFP:
+                            if self.maskFPZ > 1:
+                                argSet.set_arg(kIndLoc, self.d_maskFP[subset])
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_maskFP)
+                            kIndLoc += 1
+                        if (self.CT or self.PET or self.SPECT) and self.listmode == 0:
+                            argSet.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
+                            kIndLoc += 1
+                        if ((self.listmode == 0 or self.useIndexBasedReconstruction) and not (self.CT or self.SPECT)) or (not self.loadTOF and self.listmode > 0):
+                            argSet.perCall(kIndLoc, 'x')
                         else:
-                            self.knlF.set_arg(kIndLoc, self.d_maskFP)
+                            argSet.set_arg(kIndLoc, self.d_x[subset].data)
                         kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
-                    # if self.meanFP:
-                elif self.FPType in [1, 2, 3]:
-                    if self.useMaskFP:
-                        if self.maskFPZ > 1:
-                            self.knlF.set_arg(kIndLoc, self.d_maskFP[subset])
+                        if (self.CT or self.PET or self.SPECT or (self.listmode > 0 and not self.useIndexBasedReconstruction)):
+                            argSet.set_arg(kIndLoc, self.d_z[subset].data)
                         else:
-                            self.knlF.set_arg(kIndLoc, self.d_maskFP)
+                            argSet.set_arg(kIndLoc, self.d_z[0].data)
                         kIndLoc += 1
-                    if (self.CT or self.PET or self.SPECT) and self.listmode == 0:
-                        self.knlF.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
+                        if (self.normalization_correction):
+                            argSet.set_arg(kIndLoc, self.d_norm[subset].data)
+                            kIndLoc += 1
+                        elif (self.additionalCorrection):
+                            argSet.set_arg(kIndLoc, self.d_corr[subset].data)
+                            kIndLoc += 1
+                        argSet.set_arg(kIndLoc, self.d_Sens.data)
                         kIndLoc += 1
-                    if ((self.listmode == 0 or self.useIndexBasedReconstruction) and not (self.CT or self.SPECT)) or (not self.loadTOF and self.listmode > 0):
-                        self.knlF.set_arg(kIndLoc, self.d_x[0].data)
-                    else:
-                        self.knlF.set_arg(kIndLoc, self.d_x[subset].data)
-                    kIndLoc += 1
-                    if (self.CT or self.PET or self.SPECT or (self.listmode > 0 and not self.useIndexBasedReconstruction)):
-                        self.knlF.set_arg(kIndLoc, self.d_z[subset].data)
-                    else:
-                        self.knlF.set_arg(kIndLoc, self.d_z[0].data)
-                    kIndLoc += 1
-                    if (self.normalization_correction):
-                        self.knlF.set_arg(kIndLoc, self.d_norm[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_Nxyz[k])
                         kIndLoc += 1
-                    elif (self.additionalCorrection):
-                        self.knlF.set_arg(kIndLoc, self.d_corr[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_d[k])
                         kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_Sens.data)
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_Nxyz[k])
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_d[k])
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_b[k])
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, self.d_bmax[k])
-                    kIndLoc += 1
-                    if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
-                        self.knlF.set_arg(kIndLoc, self.d_xyindex[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_b[k])
                         kIndLoc += 1
-                        self.knlF.set_arg(kIndLoc, self.d_zindex[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_bmax[k])
                         kIndLoc += 1
-                    if self.useIndexBasedReconstruction and self.listmode > 0:
-                        if not self.loadTOF:
-                            self.knlF.set_arg(kIndLoc, self.d_trIndex[0].data)
+                        if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
+                            argSet.set_arg(kIndLoc, self.d_xyindex[subset].data)
                             kIndLoc += 1
-                            self.knlF.set_arg(kIndLoc, self.d_axIndex[0].data)
+                            argSet.set_arg(kIndLoc, self.d_zindex[subset].data)
                             kIndLoc += 1
+                        if self.useIndexBasedReconstruction and self.listmode > 0:
+                            if not self.loadTOF:
+                                argSet.perCall(kIndLoc, 'trIndex')
+                                kIndLoc += 1
+                                argSet.perCall(kIndLoc, 'axIndex')
+                                kIndLoc += 1
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_trIndex[subset].data)
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_axIndex[subset].data)
+                                kIndLoc += 1
+                        if not self.useImages and not self.useAF:
+                            argSet.perCall(kIndLoc, 'f')
                         else:
-                            self.knlF.set_arg(kIndLoc, self.d_trIndex[subset].data)
-                            kIndLoc += 1
-                            self.knlF.set_arg(kIndLoc, self.d_axIndex[subset].data)
-                            kIndLoc += 1
-                    if not self.useImages and not self.useAF:
-                        self.knlF.set_arg(kIndLoc, f.data)
-                    else:
-                        self.knlF.set_arg(kIndLoc, d_im)
-                    kIndLoc += 1
-                    if self.useAF:
-                        self.knlF.set_arg(kIndLoc, yD)
-                    else:
-                        self.knlF.set_arg(kIndLoc, y.data)
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
-                    kIndLoc += 1
-                    self.knlF.set_arg(kIndLoc, (cl.cltypes.int)(k))
-                cl.enqueue_nd_range_kernel(self.queue, self.knlF, self.globalSizeFP[subset], self.localSizeFP)
+                            argSet.perCall(kIndLoc, 'im')
+                        kIndLoc += 1
+                        argSet.perCall(kIndLoc, 'y')
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.int)(k))
+                knl = self.kernelArgs.bind(argSet, arvoF)
+                cl.enqueue_nd_range_kernel(self.queue, knl, self.globalSizeFP[subset], self.localSizeFP)
+                if self.useAF:
+                    self.queue.finish()
+            # All the volumes are enqueued back-to-back, synchronize only once
+            if sync and not self.useAF:
                 self.queue.finish()
         if volumes > 0 and not(isinstance(f,list)):
             self.nMultiVolumes = volumes
@@ -732,9 +800,17 @@ def forwardProjection(self, f, subset = -1):
                 af.device.unlock_array(f)
     return y
 
-def backwardProjection(self, y, subset = -1):
+def backwardProjection(self, y, subset = -1, sync = True):
     if subset == -1:
         subset = self.subset
+    if self.useNumPy:
+        from omegatomo.projector.numpyproj import backwardProjectionNumPy
+        return backwardProjectionNumPy(self, y, subset)
+    if self.useCPU:
+        from omegatomo.projector.cpuproj import backwardProjectionCPU
+        return backwardProjectionCPU(self, y, subset)
+    if not self.loadTOF and self.listmode > 0 and self.projector_type != 6:
+        loadListmodeSubset(self, subset)
     if self.nMultiVolumes > 0:
         f = [None] * (self.nMultiVolumes + 1)
     volumes = 0
@@ -967,17 +1043,14 @@ def backwardProjection(self, y, subset = -1):
                                 #     kIndLoc += (fD,)
                                 # else:
                                 if self.useImages:
-                                    chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                                    array = cp.cuda.texture.CUDAarray(chl, self.nRowsD, self.nColsD, self.nProjSubset[subset].item())
-                                    if self.useTorch:
-                                        array.copy_from(yD.reshape((self.nProjSubset[subset].item(), self.nColsD, self.nRowsD)))
+                                    # The same measurements are used by all the volumes, upload only once
+                                    if k > 0:
+                                        yTex = self.texPool.texture(('BP', 0), (self.nRowsD, self.nColsD, self.nProjSubset[subset].item()))
+                                    elif self.useTorch:
+                                        yTex = self.texPool.texture(('BP', 0), (self.nRowsD, self.nColsD, self.nProjSubset[subset].item()), yD.reshape((self.nProjSubset[subset].item(), self.nColsD, self.nRowsD)))
                                     else:
-                                        array.copy_from(y.reshape((self.nProjSubset[subset].item(), self.nColsD, self.nRowsD)))
-                                    res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                                    tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                            filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
-                                    yy = cp.cuda.texture.TextureObject(res, tdes)
-                                    kIndLoc += (yy,)
+                                        yTex = self.texPool.texture(('BP', 0), (self.nRowsD, self.nColsD, self.nProjSubset[subset].item()), y.reshape((self.nProjSubset[subset].item(), self.nColsD, self.nRowsD)))
+                                    kIndLoc += (yTex,)
                                 else:
                                     if self.useTorch:
                                         kIndLoc += (yD,)
@@ -1004,14 +1077,11 @@ def backwardProjection(self, y, subset = -1):
                                 #     kIndLoc += (fD,)
                                 # else:
                                 if self.useImages:
-                                    chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-                                    array = cp.cuda.texture.CUDAarray(chl, self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item())
-                                    array.copy_from(yy.reshape((self.nProjSubset[subset].item(), self.nColsD + 1, self.nRowsD + 1)))
-                                    res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-                                    tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp), 
-                                                                            filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
-                                    yy = cp.cuda.texture.TextureObject(res, tdes)
-                                    kIndLoc += (yy,)
+                                    if k > 0:
+                                        yTex = self.texPool.texture(('BP', 0), (self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item()))
+                                    else:
+                                        yTex = self.texPool.texture(('BP', 0), (self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item()), yy.reshape((self.nProjSubset[subset].item(), self.nColsD + 1, self.nRowsD + 1)))
+                                    kIndLoc += (yTex,)
                                 else:
                                     if self.useTorch:
                                         kIndLoc += (yD,)
@@ -1091,11 +1161,10 @@ def backwardProjection(self, y, subset = -1):
                     self.knlB((self.globalSizeBP[subset][k][0] // self.localSizeBP[0], self.globalSizeBP[subset][k][1] // self.localSizeBP[1], self.globalSizeBP[subset][k][2]), (self.localSizeBP[0], self.localSizeBP[1], 1), kIndLoc)
             else:
                 raise ValueError('Unsupported type. PyCUDA is no longer supported! Use CuPy instead.')
-            if self.useTorch:
+            if self.useTorch and sync:
                 torch.cuda.synchronize()
         else:
             import pyopencl as cl
-            from pyopencl.version import VERSION
             if self.useAF:
                 import arrayfire as af
                 cltype = af.Dtype.f32
@@ -1112,21 +1181,14 @@ def backwardProjection(self, y, subset = -1):
                 elif self.use_32bit_atomics:
                     cltype = cl.cltypes.uint
             if self.CT and self.BPType in [4,5]:
-                imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
                 if self.BPType < 5:
-                    if VERSION[0] > 2024 or (VERSION[0] == 2024 and VERSION[1] > 2):
-                        d_im = cl.create_image(self.clctx, cl.mem_flags.READ_ONLY, imformat, shape=(self.nRowsD, self.nColsD, self.nProjSubset[subset].item()))
-                    else:
-                        d_im = cl.Image(self.clctx, cl.mem_flags.READ_ONLY, imformat, shape=(self.nRowsD, self.nColsD, self.nProjSubset[subset].item()))
+                    d_im = self.texPool.image(('BP', 0), (self.nRowsD, self.nColsD, self.nProjSubset[subset].item()))
                     if self.useAF:
                         cl.enqueue_copy(self.queue, d_im, yD, offset=(0), origin=(0,0,0), region=(self.nRowsD, self.nColsD, self.nProjSubset[subset].item()));
                     else:
                         cl.enqueue_copy(self.queue, d_im, y.data, offset=(0), origin=(0,0,0), region=(self.nRowsD, self.nColsD, self.nProjSubset[subset].item()));
                 else:
-                    if VERSION[0] > 2024 or (VERSION[0] == 2024 and VERSION[1] > 2):
-                        d_im = cl.create_image(self.clctx, cl.mem_flags.READ_ONLY, imformat, shape=(self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item()))
-                    else:
-                        d_im = cl.Image(self.clctx, cl.mem_flags.READ_ONLY, imformat, shape=(self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item()))
+                    d_im = self.texPool.image(('BP', 0), (self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item()))
                     y = af.moddims(y, self.nRowsD, d1=self.nColsD, d2=self.nProjSubset[subset].item())
                     if self.meanBP:
                         d_meanBP = af.mean(af.mean(y, dim=0), dim=1)
@@ -1140,6 +1202,24 @@ def backwardProjection(self, y, subset = -1):
                     yD = cl.MemoryObject.from_int_ptr(yPtr)
                     cl.enqueue_copy(self.queue, d_im, yD, offset=(0), origin=(0,0,0), region=(self.nRowsD + 1, self.nColsD + 1, self.nProjSubset[subset].item()));
             
+            # Values of the per-call kernel arguments, see kernelargs.py
+            def arvoB(nimi):
+                if nimi == 'y':
+                    return yD if self.useAF else y.data
+                elif nimi == 'im':
+                    return d_im
+                elif nimi == 'meanBP':
+                    return dMeanBP
+                elif nimi == 'f':
+                    if self.useAF:
+                        return fD
+                    return f[k].data if isinstance(f, list) else f.data
+                elif nimi == 'x':
+                    return self.d_x[0].data
+                elif nimi == 'trIndex':
+                    return self.d_trIndex[0].data
+                else:
+                    return self.d_axIndex[0].data
             for k in range(self.nMultiVolumes + 1):
                 if self.useAF:
                     if self.nMultiVolumes > 0:
@@ -1154,224 +1234,201 @@ def backwardProjection(self, y, subset = -1):
                         f[k] = cl.array.zeros(self.queue, self.N[k].item(), dtype=cltype)
                     else:
                         f = cl.array.zeros(self.queue, self.N[k].item(), dtype=cltype)
-                kIndLoc = self.kIndB
-                if self.BPType in [1, 2, 3]:
-                    if (self.attenuation_correction and not self.CTAttenuation):
-                        self.knlB.set_arg(kIndLoc, self.d_atten[subset].data)
-                        kIndLoc += 1
-                    if self.useMaskFP:
-                        if self.maskFPZ > 1:
-                            self.knlB.set_arg(kIndLoc, self.d_maskFP[subset])
+                key = ('BP', k, subset)
+                argSet = self.kernelArgs.get(key)
+                if argSet is None:
+                    argSet = self.kernelArgs.record(self.knlB, key)
+                    kIndLoc = self.kIndB
+                    if self.BPType in [1, 2, 3]:
+                        if (self.attenuation_correction and not self.CTAttenuation):
+                            argSet.set_arg(kIndLoc, self.d_atten[subset].data)
+                            kIndLoc += 1
+                        if self.useMaskFP:
+                            if self.maskFPZ > 1:
+                                argSet.set_arg(kIndLoc, self.d_maskFP[subset])
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_maskFP)
+                            kIndLoc += 1
+                        if self.useMaskBP:
+                            argSet.set_arg(kIndLoc, self.d_maskBP)
+                            kIndLoc += 1
+                        if (self.CT or self.PET or self.SPECT) and self.listmode == 0:
+                            argSet.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
+                            kIndLoc += 1
+                        if ((self.listmode == 0 or self.useIndexBasedReconstruction) and not (self.CT or self.SPECT)) or (not self.loadTOF and self.listmode > 0):
+                            argSet.perCall(kIndLoc, 'x')
                         else:
-                            self.knlB.set_arg(kIndLoc, self.d_maskFP)
+                            argSet.set_arg(kIndLoc, self.d_x[subset].data)
                         kIndLoc += 1
-                    if self.useMaskBP:
-                        self.knlB.set_arg(kIndLoc, self.d_maskBP)
+                        if (self.CT or self.PET or self.SPECT or (self.listmode > 0 and not self.useIndexBasedReconstruction)):
+                            argSet.set_arg(kIndLoc, self.d_z[subset].data)
+                        else:
+                            argSet.set_arg(kIndLoc, self.d_z[0].data)
                         kIndLoc += 1
-                    if (self.CT or self.PET or self.SPECT) and self.listmode == 0:
-                        self.knlB.set_arg(kIndLoc, (cl.cltypes.long)(self.nProjSubset[subset].item()))
+                        if (self.normalization_correction):
+                            argSet.set_arg(kIndLoc, self.d_norm[subset].data)
+                            kIndLoc += 1
+                        if (self.additionalCorrection):
+                            argSet.set_arg(kIndLoc, self.d_corr[subset].data)
+                            kIndLoc += 1
+                        argSet.set_arg(kIndLoc, self.d_Sens.data)
                         kIndLoc += 1
-                    if ((self.listmode == 0 or self.useIndexBasedReconstruction) and not (self.CT or self.SPECT)) or (not self.loadTOF and self.listmode > 0):
-                        self.knlB.set_arg(kIndLoc, self.d_x[0].data)
-                    else:
-                        self.knlB.set_arg(kIndLoc, self.d_x[subset].data)
-                    kIndLoc += 1
-                    if (self.CT or self.PET or self.SPECT or (self.listmode > 0 and not self.useIndexBasedReconstruction)):
-                        self.knlB.set_arg(kIndLoc, self.d_z[subset].data)
-                    else:
-                        self.knlB.set_arg(kIndLoc, self.d_z[0].data)
-                    kIndLoc += 1
-                    if (self.normalization_correction):
-                        self.knlB.set_arg(kIndLoc, self.d_norm[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_Nxyz[k])
                         kIndLoc += 1
-                    if (self.additionalCorrection):
-                        self.knlB.set_arg(kIndLoc, self.d_corr[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_d[k])
                         kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, self.d_Sens.data)
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, self.d_Nxyz[k])
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, self.d_d[k])
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, self.d_b[k])
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, self.d_bmax[k])
-                    kIndLoc += 1
-                    if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
-                        self.knlB.set_arg(kIndLoc, self.d_xyindex[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_b[k])
                         kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, self.d_zindex[subset].data)
+                        argSet.set_arg(kIndLoc, self.d_bmax[k])
                         kIndLoc += 1
-                    if self.useIndexBasedReconstruction and self.listmode > 0:
-                        if not self.loadTOF:
-                            self.knlB.set_arg(kIndLoc, self.d_trIndex[0].data)
-                            kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_axIndex[0].data)
-                            kIndLoc += 1
-                        else:
-                            self.knlB.set_arg(kIndLoc, self.d_trIndex[subset].data)
+                        if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
+                            argSet.set_arg(kIndLoc, self.d_xyindex[subset].data)
                             kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_axIndex[subset].data)
+                            argSet.set_arg(kIndLoc, self.d_zindex[subset].data)
                             kIndLoc += 1
-                    if self.useAF:
-                        self.knlB.set_arg(kIndLoc, yD)
+                        if self.useIndexBasedReconstruction and self.listmode > 0:
+                            if not self.loadTOF:
+                                argSet.perCall(kIndLoc, 'trIndex')
+                                kIndLoc += 1
+                                argSet.perCall(kIndLoc, 'axIndex')
+                                kIndLoc += 1
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_trIndex[subset].data)
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_axIndex[subset].data)
+                                kIndLoc += 1
+                        argSet.perCall(kIndLoc, 'y')
                         kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, fD)
-                    else:
-                        self.knlB.set_arg(kIndLoc, y.data)
+                        # The backend and the multi-volume index are resolved in arvoB
+                        argSet.perCall(kIndLoc, 'f')
                         kIndLoc += 1
-                        if self.nMultiVolumes > 0:
-                            self.knlB.set_arg(kIndLoc, f[k].data)
-                        else:
-                            self.knlB.set_arg(kIndLoc, f.data)
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
-                    kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, (cl.cltypes.int)(k))
-                else:
-                    if self.CT:
-                        if self.OffsetLimit.size > 0:
-                            self.knlB.set_arg(kIndLoc, self.d_T[subset].data)
-                            kIndLoc += 1
-                        if self.BPType == 5 or self.BPType == 4:
-                            self.knlB.set_arg(kIndLoc, self.d_Nxyz[k])
-                            kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_b[k])
-                            kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_d[k])
-                            kIndLoc += 1
-                            if self.BPType == 5:
-                                self.knlB.set_arg(kIndLoc, self.d_Scale[k])
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
+                        kIndLoc += 1
+                        argSet.set_arg(kIndLoc, (cl.cltypes.int)(k))
+                    else:
+                        if self.CT:
+                            if self.OffsetLimit.size > 0:
+                                argSet.set_arg(kIndLoc, self.d_T[subset].data)
                                 kIndLoc += 1
-                                self.knlB.set_arg(kIndLoc, self.dSizeBP)
+                            if self.BPType == 5 or self.BPType == 4:
+                                argSet.set_arg(kIndLoc, self.d_Nxyz[k])
                                 kIndLoc += 1
-                            else:
-                                self.knlB.set_arg(kIndLoc, (cl.cltypes.float)(self.kerroin[k].item()))
+                                argSet.set_arg(kIndLoc, self.d_b[k])
                                 kIndLoc += 1
-                        if self.BPType == 4:
-                            self.knlB.set_arg(kIndLoc, d_im)
-                            kIndLoc += 1
-                            if self.useAF:
-                                self.knlB.set_arg(kIndLoc, fD)
-                            else:
-                                if isinstance(f, list):
-                                    self.knlB.set_arg(kIndLoc, f[k].data)
+                                argSet.set_arg(kIndLoc, self.d_d[k])
+                                kIndLoc += 1
+                                if self.BPType == 5:
+                                    argSet.set_arg(kIndLoc, self.d_Scale[k])
+                                    kIndLoc += 1
+                                    argSet.set_arg(kIndLoc, self.dSizeBP)
+                                    kIndLoc += 1
                                 else:
-                                    self.knlB.set_arg(kIndLoc, f.data)
-                            kIndLoc += 1
-                            if not self.loadTOF and self.listmode > 0:
-                                self.knlB.set_arg(kIndLoc, self.d_x[0].data)
+                                    argSet.set_arg(kIndLoc, (cl.cltypes.float)(self.kerroin[k].item()))
+                                    kIndLoc += 1
+                            if self.BPType == 4:
+                                argSet.perCall(kIndLoc, 'im')
+                                kIndLoc += 1
+                                argSet.perCall(kIndLoc, 'f')
+                                kIndLoc += 1
+                                if not self.loadTOF and self.listmode > 0:
+                                    argSet.perCall(kIndLoc, 'x')
+                                else:
+                                    argSet.set_arg(kIndLoc, self.d_x[subset].data)
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_z[subset].data)
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_Sens.data)
+                                kIndLoc += 1
                             else:
-                                self.knlB.set_arg(kIndLoc, self.d_x[subset].data)
+                                if not self.loadTOF and self.listmode > 0:
+                                    argSet.perCall(kIndLoc, 'x')
+                                else:
+                                    argSet.set_arg(kIndLoc, self.d_x[subset].data)
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_z[subset].data)
+                                kIndLoc += 1
+                                # Precomputed geometry; only present when the kernel was built with -DGEOM5
+                                if self.listmode == 0:
+                                    argSet.set_arg(kIndLoc, self.d_geom5[subset].data)
+                                    kIndLoc += 1
+                                argSet.perCall(kIndLoc, 'im')
+                                kIndLoc += 1
+                                argSet.perCall(kIndLoc, 'f')
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_Sens.data)
+                                kIndLoc += 1
+                                if self.meanBP:
+                                    argSet.perCall(kIndLoc, 'meanBP')
+                                    kIndLoc += 1
+                        else:
+                            argSet.set_arg(kIndLoc, self.d_Nxyz[k])
                             kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_z[subset].data)
+                            argSet.set_arg(kIndLoc, self.d_b[k])
                             kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_Sens.data)
+                            argSet.set_arg(kIndLoc, self.d_bmax[k])
                             kIndLoc += 1
-                        else:
-                            if not self.loadTOF and self.listmode > 0:
-                                self.knlB.set_arg(kIndLoc, self.d_x[0].data)
-                            else:
-                                self.knlB.set_arg(kIndLoc, self.d_x[subset].data)
+                            argSet.set_arg(kIndLoc, self.d_Scale4[k])
                             kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_z[subset].data)
+                            argSet.perCall(kIndLoc, 'y')
                             kIndLoc += 1
-                            # Precomputed geometry; only present when the kernel was built with -DGEOM5
-                            if self.listmode == 0:
-                                self.knlB.set_arg(kIndLoc, self.d_geom5[subset].data)
-                                kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, d_im)
+                            argSet.perCall(kIndLoc, 'f')
                             kIndLoc += 1
-                            if self.useAF:
-                                self.knlB.set_arg(kIndLoc, fD)
+                            if ((self.listmode == 0 or self.useIndexBasedReconstruction) and not self.CT) or (not self.loadTOF and self.listmode > 0):
+                                argSet.perCall(kIndLoc, 'x')
                             else:
-                                if isinstance(f, list):
-                                    self.knlB.set_arg(kIndLoc, f[k].data)
-                                else:
-                                    self.knlB.set_arg(kIndLoc, f.data)
+                                argSet.set_arg(kIndLoc, self.d_x[subset].data)
                             kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_Sens.data)
+                            if (self.CT or self.PET or (self.listmode > 0 and not self.useIndexBasedReconstruction)):
+                                argSet.set_arg(kIndLoc, self.d_z[subset].data)
+                            else:
+                                argSet.set_arg(kIndLoc, self.d_z[0].data)
                             kIndLoc += 1
-                            if self.meanBP:
-                                self.knlB.set_arg(kIndLoc, dMeanBP)
+                            if self.useMaskFP:
+                                if self.maskFPZ > 1:
+                                    argSet.set_arg(kIndLoc, self.d_maskFP[subset])
+                                else:
+                                    argSet.set_arg(kIndLoc, self.d_maskFP)
                                 kIndLoc += 1
-                    else:
-                        self.knlB.set_arg(kIndLoc, self.d_Nxyz[k])
-                        kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, self.d_b[k])
-                        kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, self.d_bmax[k])
-                        kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, self.d_Scale4[k])
-                        kIndLoc += 1
-                        if self.useAF:
-                            self.knlB.set_arg(kIndLoc, yD)
-                            kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, fD)
-                        else:
-                            self.knlB.set_arg(kIndLoc, y.data)
-                            kIndLoc += 1
-                            if isinstance(f, list):
-                                self.knlB.set_arg(kIndLoc, f[k].data)
-                            else:
-                                self.knlB.set_arg(kIndLoc, f.data)
-                        kIndLoc += 1
-                        if ((self.listmode == 0 or self.useIndexBasedReconstruction) and not self.CT) or (not self.loadTOF and self.listmode > 0):
-                            self.knlB.set_arg(kIndLoc, self.d_x[0].data)
-                        else:
-                            self.knlB.set_arg(kIndLoc, self.d_x[subset].data)
-                        kIndLoc += 1
-                        if (self.CT or self.PET or (self.listmode > 0 and not self.useIndexBasedReconstruction)):
-                            self.knlB.set_arg(kIndLoc, self.d_z[subset].data)
-                        else:
-                            self.knlB.set_arg(kIndLoc, self.d_z[0].data)
-                        kIndLoc += 1
-                        if self.useMaskFP:
-                            if self.maskFPZ > 1:
-                                self.knlB.set_arg(kIndLoc, self.d_maskFP[subset])
-                            else:
-                                self.knlB.set_arg(kIndLoc, self.d_maskFP)
+                            if self.useMaskBP:
+                                argSet.set_arg(kIndLoc, self.d_maskBP)
+                                kIndLoc += 1
+                            argSet.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nProjSubset[subset].item()))
                             kIndLoc += 1
-                        if self.useMaskBP:
-                            self.knlB.set_arg(kIndLoc, self.d_maskBP)
+                            if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
+                                argSet.set_arg(kIndLoc, self.d_xyindex[subset].data)
+                                kIndLoc += 1
+                                argSet.set_arg(kIndLoc, self.d_zindex[subset].data)
+                                kIndLoc += 1
+                            if (self.normalization_correction):
+                                argSet.set_arg(kIndLoc, self.d_norm[subset].data)
+                                kIndLoc += 1
+                            elif (self.additionalCorrection):
+                                argSet.set_arg(kIndLoc, self.d_corr[subset].data)
+                                kIndLoc += 1
+                            argSet.set_arg(kIndLoc, self.d_Sens.data)
                             kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nProjSubset[subset].item()))
+                        argSet.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
                         kIndLoc += 1
-                        if ((self.subsetType == 3 or self.subsetType == 6 or self.subsetType == 7) and self.subsets > 1 and self.listmode == 0):
-                            self.knlB.set_arg(kIndLoc, self.d_xyindex[subset].data)
-                            kIndLoc += 1
-                            self.knlB.set_arg(kIndLoc, self.d_zindex[subset].data)
-                            kIndLoc += 1
-                        if (self.normalization_correction):
-                            self.knlB.set_arg(kIndLoc, self.d_norm[subset].data)
+                        if self.CT:
+                            if self.useMaskBP:
+                                argSet.set_arg(kIndLoc, self.d_maskBP)
+                                kIndLoc += 1
+                            argSet.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nProjSubset[subset].item()))
                             kIndLoc += 1
-                        elif (self.additionalCorrection):
-                            self.knlB.set_arg(kIndLoc, self.d_corr[subset].data)
+                        else:
+                            argSet.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
                             kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, self.d_Sens.data)
-                        kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, (cl.cltypes.uchar)(self.no_norm))
-                    kIndLoc += 1
-                    if self.CT:
-                        if self.useMaskBP:
-                            self.knlB.set_arg(kIndLoc, self.d_maskBP)
+                            argSet.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
                             kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nProjSubset[subset].item()))
-                        kIndLoc += 1
-                    else:
-                        self.knlB.set_arg(kIndLoc, (cl.cltypes.ulong)(self.nMeasSubset[subset].item()))
-                        kIndLoc += 1
-                        self.knlB.set_arg(kIndLoc, (cl.cltypes.uint)(subset))
-                        kIndLoc += 1
-                    self.knlB.set_arg(kIndLoc, (cl.cltypes.int)(k))
-                            
-                cl.enqueue_nd_range_kernel(self.queue, self.knlB, self.globalSizeBP[subset][k], self.localSizeBP)
-                self.queue.finish()
+                        argSet.set_arg(kIndLoc, (cl.cltypes.int)(k))
+                knl = self.kernelArgs.bind(argSet, arvoB)
+                cl.enqueue_nd_range_kernel(self.queue, knl, self.globalSizeBP[subset][k], self.localSizeBP)
                 if self.useAF:
+                    self.queue.finish()
                     if self.nMultiVolumes > 0:
                         af.device.unlock_array(f[k])
                     else:
@@ -1398,6 +1455,8 @@ def backwardProjection(self, y, subset = -1):
                             f[k] = f[k].astype(cl.cltypes.float) / self.TH32
                         else:
                             f = f.astype(cl.cltypes.float) / self.TH32
+            if sync and not self.useAF:
+                self.queue.finish()
         if not(isinstance(f,list)) and volumes > 0:
             self.nMultiVolumes = volumes
         if self.use_psf:
@@ -1405,4 +1464,30 @@ def backwardProjection(self, y, subset = -1):
                 f[k] = self.computeConvolution(f[k])
             else:
                 f = self.computeConvolution(f)
-    return f
\ No newline at end of file
+    return f
+
+def forwardProjectionBatch(self, f, subset = -1):
+    """
+    Forward projects a batch of images, e.g. the Nt time steps of a dynamic
+    reconstruction. f is a list of images, one per frame, and each of them can
+    also be a list of the multi-resolution volumes. All the frames and volumes
+    are enqueued back-to-back using the same persistent images/textures and
+    the device is synchronized only once, after the last frame. Returns a list
+    of the forward projections.
+    """
+    y = []
+    for t in range(len(f)):
+        y.append(forwardProjection(self, f[t], subset, sync = t == len(f) - 1))
+    return y
+
+def backwardProjectionBatch(self, y, subset = -1):
+    """
+    Backprojects a batch of measurements, e.g. the Nt time steps of a dynamic
+    reconstruction. y is a list of the measurement vectors of each frame. As
+    with forwardProjectionBatch, the device is synchronized only after the
+    last frame. Returns a list of the backprojections.
+    """
+    f = []
+    for t in range(len(y)):
+        f.append(backwardProjection(self, y[t], subset, sync = t == len(y) - 1))
+    return f
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 18:12:26 2026
+
+Summed-area table (SAT) cache of the branchless distance-driven forward
+projector (projector type 5). The two SATs of each volume are computed into
+preallocated device buffers with the fused transpose + prefix sum kernels
+(SATRows/SATColumns in auxKernels.cl) and copied into the pooled images or
+textures (see texpool.py). The tables are rebuilt only when the input image
+changes, i.e. forward projecting the same image for several subsets costs one
+SAT computation.
+
+The image is identified by the array object and its version. PyTorch tensors
+have their own version counter, which is incremented by in-place operations.
+For the other array types, in-place modifications cannot be detected and
+projectorClass.imageUpdated() has to be called after modifying the image in
+place. Out-of-place updates (e.g. f = f - tau * g) are always detected. For
+this reason the cache is by default (cacheSAT = None) only used with PyTorch.
+"""
+
+class SATCache:
+    """
+    SAT buffers and cache keys owned by projectorClass (options.satCache). If
+    enabled is False, the tables are recomputed on every forward projection.
+    """
+    def __init__(self, enabled = True):
+        self.enabled = enabled
+        self.version = 0
+        self.buffers = {}
+        self.keys = {}
+
+    def __len__(self):
+        return len(self.buffers)
+
+    def imageVersion(self, f):
+        return (self.version, getattr(f, '_version', None))
+
+    def get(self, k, f, kohteet):
+        """
+        Returns the (possibly PSF-convolved) image stored with the tables of
+        volume k if the tables were computed from f and copied into the
+        images/textures kohteet, otherwise None.
+        """
+        if not self.enabled or k not in self.keys:
+            return None
+        lahde, versio, vanhat, fOut = self.keys[k]
+        if lahde is f and versio == self.imageVersion(f) and all(a is b for a, b in zip(vanhat, kohteet)):
+            return fOut
+        return None
+
+    def store(self, k, f, kohteet, fOut):
+        """
+        Marks the tables of volume k in kohteet as computed from f. The
+        reference to f is kept so that its memory cannot be reused by another
+        image.
+        """
+        if self.enabled:
+            self.keys[k] = (f, self.imageVersion(f), tuple(kohteet), fOut)
+
+    def buffer(self, key, koko, alloc):
+        """
+        Returns the preallocated buffer for key, e.g. (k, 0), of koko
+        elements. alloc(koko) allocates a new buffer.
+        """
+        avain = key + (koko,)
+        if avain not in self.buffers:
+            self.buffers[avain] = alloc(koko)
+        return self.buffers[avain]
+
+    def invalidate(self):
+        """
+        Forces the recomputation of the tables on the next forward projection.
+        """
+        self.version += 1
+        self.keys = {}
+
+    def release(self):
+        """
+        Frees the buffers and the references to the cached images.
+        """
+        self.keys = {}
+        self.buffers = {}
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:41:08 2026
+
+Pool of the device-side images (OpenCL) and textures (CUDA/CuPy) used by the
+forward and backward projections. The image/texture objects are created only
+once for each (name, volume, shape) and kept alive across subsets and
+iterations, after that only the data is re-uploaded.
+"""
+
+class TexturePool:
+    """
+    Texture/image object pool owned by projectorClass (options.texPool).
+
+    For CUDA, use texture to get a texture object and upload the data into it.
+    For OpenCL, use image to get the image and copy the data with
+    pyopencl.enqueue_copy. The cached objects can be freed with release.
+    """
+    def __init__(self, useCUDA = False, clctx = None):
+        self.useCUDA = useCUDA
+        self.clctx = clctx
+        self.objects = {}
+
+    def __len__(self):
+        return len(self.objects)
+
+    @property
+    def nbytes(self):
+        """Total size of the pooled images/textures in bytes (float32)."""
+        koko = 0
+        for key in self.objects:
+            shape = key[-1]
+            koko += 4 * shape[0] * shape[1] * shape[2]
+        return koko
+
+    def texture(self, key, shape, data = None, linear = True):
+        """
+        Returns the CUDA texture object for key, e.g. ('FP', k) for the k-th
+        volume. shape is the (width, height, depth) of the CUDA array and data
+        the (depth, height, width) CuPy array that is copied into it. If data
+        is None, the previously uploaded data is used. linear selects linear
+        filtering with normalized coordinates, otherwise point filtering with
+        non-normalized coordinates is used.
+        """
+        import cupy as cp
+        avain = key + (bool(linear), tuple(shape))
+        if avain not in self.objects:
+            chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
+            array = cp.cuda.texture.CUDAarray(chl, shape[0], shape[1], shape[2])
+            res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
+            if linear:
+                tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp),
+                                                        filterMode=cp.cuda.runtime.cudaFilterModeLinear, normalizedCoords=1)
+            else:
+                tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeClamp, cp.cuda.runtime.cudaAddressModeClamp,cp.cuda.runtime.cudaAddressModeClamp),
+                                                        filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
+            self.objects[avain] = (array, cp.cuda.texture.TextureObject(res, tdes))
+        if data is not None:
+            self.objects[avain][0].copy_from(data)
+        return self.objects[avain][1]
+
+    def image(self, key, shape):
+        """
+        Returns the read-only float OpenCL image for key, e.g. ('FP', k) for
+        the k-th volume, with the given shape. The caller copies the data into
+        the image.
+        """
+        import pyopencl as cl
+        from pyopencl.version import VERSION
+        avain = key + (tuple(shape),)
+        if avain not in self.objects:
+            imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
+            if VERSION[0] > 2024 or (VERSION[0] == 2024 and VERSION[1] > 2):
+                self.objects[avain] = cl.create_image(self.clctx, cl.mem_flags.READ_ONLY, imformat, shape=shape)
+            else:
+                self.objects[avain] = cl.Image(self.clctx, cl.mem_flags.READ_ONLY, imformat, shape=shape)
+        return self.objects[avain]
+
+    def release(self, name = None):
+        """
+        Frees the pooled objects. If name is given (e.g. 'FP' or 'BP'), only
+        the objects with that name are freed.
+        """
+        if name is None:
+            poista = list(self.objects.keys())
+        else:
+            poista = [key for key in self.objects if key[0] == name]
+        for key in poista:
+            obj = self.objects.pop(key)
+            if not self.useCUDA:
+                obj.release()
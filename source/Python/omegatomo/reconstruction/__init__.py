@@ -8,5 +8,6 @@ Created on Thu Mar  7 13:12:10 2024
 from .recomain import reconstructions_main
 from .recomain import reconstructions_mainCT
 from .recomain import reconstructions_mainSPECT
+from .dynamic import reconstructDynamic
 
-__all__ = ["reconstructions_main", "reconstructions_mainCT", "transferData", "reconstructions_mainSPECT"]
\ No newline at end of file
+__all__ = ["reconstructions_main", "reconstructions_mainCT", "transferData", "reconstructions_mainSPECT", "reconstructDynamic"]
\ No newline at end of file
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 16:21:40 2026
+
+Python-level dynamic (multi-frame) reconstruction driver. The projector
+(projectorClass) is initialized only once and the system geometry, the
+multiplicative corrections, the compiled kernels and the sensitivity images
+stay resident on the device for all the time steps. The additive corrections
+(randoms and scatter) are transferred with the measurements of each frame. The frames are reconstructed with OSEM in
+groups of framesInFlight frames, where the forward and backward projections
+of all the frames of a group are enqueued back-to-back with
+forwardProjectionBatch/backwardProjectionBatch.
+"""
+
+import time
+import numpy as np
+
+
+def _backend(A):
+    """
+    Returns the functions (toDevice, toHost, ones, clamp) of the backend
+    selected in the projector A.
+    """
+    if A.useNumPy or A.useCPU:
+        toDevice = lambda x : np.asarray(x, dtype=np.float32)
+        toHost = lambda x : np.asarray(x)
+        ones = lambda n : np.ones(n, dtype=np.float32)
+        clamp = lambda x, eps : np.maximum(x, np.float32(eps))
+    elif A.useAF:
+        import arrayfire as af
+        toDevice = lambda x : af.interop.np_to_af_array(np.ascontiguousarray(x, dtype=np.float32))
+        toHost = lambda x : x.to_ndarray()
+        ones = lambda n : af.constant(1., n)
+        clamp = lambda x, eps : af.arith.maxof(x, eps)
+    elif A.useTorch:
+        import torch
+        toDevice = lambda x : torch.tensor(np.ascontiguousarray(x, dtype=np.float32), device='cuda')
+        toHost = lambda x : x.cpu().numpy()
+        ones = lambda n : torch.ones(n, dtype=torch.float32, device='cuda')
+        clamp = lambda x, eps : torch.clamp(x, min=eps)
+    elif A.useCUDA:
+        if not A.useCuPy:
+            raise ValueError('Unsupported selection. Note that PyCUDA is no longer supported!')
+        import cupy as cp
+        toDevice = lambda x : cp.asarray(x, dtype=cp.float32)
+        toHost = lambda x : cp.asnumpy(x)
+        ones = lambda n : cp.ones(n, dtype=cp.float32)
+        clamp = lambda x, eps : cp.maximum(x, cp.float32(eps))
+    else:
+        import pyopencl as cl
+        import pyopencl.array
+        toDevice = lambda x : cl.array.to_device(A.queue, np.ascontiguousarray(x, dtype=np.float32))
+        toHost = lambda x : x.get()
+        ones = lambda n : cl.array.zeros(A.queue, n, dtype=np.float32) + np.float32(1.)
+        clamp = lambda x, eps : cl.array.maximum(x, np.float32(eps))
+    return toDevice, toHost, ones, clamp
+
+def frameData(SinM, t, Nt):
+    """
+    Returns the measurement data of the time step t as a column-major vector.
+    SinM is either a list of the frames or an array with the time steps as the
+    last dimension. No copy is made for Fortran contiguous data.
+    """
+    if isinstance(SinM, list):
+        return np.asarray(SinM[t]).ravel('F')
+    return np.reshape(SinM, (-1, Nt), order='F')[:, t]
+
+def subsetData(A, m, k):
+    """
+    Returns the measurements of the subset k from the (subset-ordered) frame
+    m, including all the TOF bins. For Nt > 1, nTotMeas contains the subsets
+    of all the time steps, the subsets of a single frame are the first
+    subsets + 1 values.
+    """
+    nBins = max(int(A.TOF_bins_used), 1) if A.TOF else 1
+    m = np.reshape(m, (-1, nBins), order='F')
+    if m.shape[0] != A.nTotMeas[A.subsets].item():
+        raise ValueError('The number of measurements in a frame (' + str(m.shape[0]) + ') does not match the number of measurements in the subsets (' + str(A.nTotMeas[A.subsets].item()) + ')!')
+    return m[A.nTotMeas[k].item() : A.nTotMeas[k + 1].item(), :].ravel('F')
+
+def reconstructDynamic(A, SinM = None, Nt = None, Niter = None, x0 = None, framesInFlight = 2, epps = 1e-6, verbose = None, additive = None):
+    """
+    Dynamic OSEM reconstruction of all the time steps with a single
+    initialized projector
+    Parameters
+    ----------
+    A : projectorClass object
+        The projector. initProj is called if it has not been initialized yet.
+        The measurement data are divided into the subsets by initProj, i.e.
+        the frames should be input into A.SinM, and the number of time steps
+        into A.partitions, before the initialization.
+    SinM : NumPy array or list, optional
+        The (subset-ordered) measurement data, either a list of the frames or
+        an array with the time steps as the last dimension. The default is
+        A.SinM.
+    Nt : int, optional
+        The number of time steps. The default is the number of frames in SinM,
+        i.e. the size of SinM divided by the number of measurements in a
+        frame. Any other value raises an error.
+    Niter : int, optional
+        The number of iterations per frame. The default is A.Niter.
+    x0 : NumPy array, optional
+        The initial value, same for all frames. The default is A.x0, or ones
+        if A.x0 is not of the correct size.
+    framesInFlight : int, optional
+        The number of frames whose projections are enqueued together. Larger
+        values keep the device busier at the cost of device memory. The
+        default is 2.
+    epps : float, optional
+        Small value used to prevent division by zero. The default is 1e-6.
+    verbose : int, optional
+        Prints the per-frame timings if > 0. The default is A.verbose.
+    additive : NumPy array or list, optional
+        The additive correction (e.g. randoms + scatter) that is added to the
+        forward projection, subset-ordered as SinM. Either a single frame used
+        for all the time steps, a list of the frames or an array with the time
+        steps as the last dimension. Required if randoms correction or
+        additive scatter correction is selected. The default is no additive
+        correction.
+
+    Returns
+    -------
+    output : NumPy array
+        The reconstructed images, of size (Nx, Ny, Nz, Nt).
+    timings : NumPy array
+        The reconstruction time (seconds) of each frame. The frames in the
+        same group share the group time evenly.
+    """
+    tic = time.perf_counter()
+    if not(A.projectorInitialized):
+        A.initProj()
+    if A.nMultiVolumes > 0:
+        raise ValueError('Multi-resolution reconstruction is not supported by the dynamic driver!')
+    from omegatomo.projector.projfunctions import forwardProjectionBatch, backwardProjectionBatch
+    if SinM is None:
+        SinM = A.SinM
+    nBins = max(int(A.TOF_bins_used), 1) if A.TOF else 1
+    frameSize = A.nTotMeas[A.subsets].item() * nBins
+    if isinstance(SinM, list):
+        NtData = len(SinM)
+    else:
+        if np.size(SinM) == 0 or np.size(SinM) % frameSize != 0:
+            raise ValueError('The size of SinM (' + str(np.size(SinM)) + ') is not a multiple of the number of measurements in a frame (' + str(frameSize) + ')!')
+        NtData = np.size(SinM) // frameSize
+    if Nt is None:
+        Nt = NtData
+    elif int(Nt) != NtData:
+        raise ValueError('Nt (' + str(Nt) + ') does not match the number of frames in SinM (' + str(NtData) + ')!')
+    Nt = int(Nt)
+    if additive is None:
+        if A.randoms_correction or (A.scatter_correction and not A.subtract_scatter):
+            raise ValueError('Randoms and additive scatter corrections have to be input as the additive term (additive) with the dynamic driver!')
+        NtAdd = 0
+    else:
+        NtAdd = len(additive) if isinstance(additive, list) else np.size(additive) // frameSize
+        if NtAdd != 1 and NtAdd != Nt:
+            raise ValueError('The additive term has to contain either one frame or Nt frames!')
+    if Niter is None:
+        Niter = int(A.Niter)
+    if verbose is None:
+        verbose = A.verbose
+    framesInFlight = max(1, min(int(framesInFlight), Nt))
+    N = A.Nx[0].item() * A.Ny[0].item() * A.Nz[0].item()
+    if x0 is None:
+        x0 = A.x0 if np.size(A.x0) == N else np.ones(N, dtype=np.float32)
+    elif np.size(x0) != N:
+        raise ValueError('The initial value x0 has to be of size Nx * Ny * Nz!')
+    x0 = np.asarray(x0, dtype=np.float32).ravel('F')
+    toDevice, toHost, ones, clamp = _backend(A)
+    # The sensitivity images are the same for all the frames
+    Sens = [None] * A.subsets
+    for k in range(A.subsets):
+        Sens[k] = clamp(backwardProjectionBatch(A, [ones(A.nMeasSubset[k].item() * nBins)], k)[0], epps)
+    if NtAdd == 1:
+        # The same additive term for all the frames is transferred only once
+        d_r0 = [toDevice(subsetData(A, frameData(additive, 0, 1), k)) for k in range(A.subsets)]
+    setupTime = time.perf_counter() - tic
+    output = np.zeros((N, Nt), dtype=np.float32, order='F')
+    timings = np.zeros(Nt, dtype=np.float64)
+    for alku in range(0, Nt, framesInFlight):
+        loppu = min(alku + framesInFlight, Nt)
+        ticF = time.perf_counter()
+        frames = range(alku, loppu)
+        m = [frameData(SinM, t, Nt) for t in frames]
+        d_m = [[toDevice(subsetData(A, m[ii], k)) for k in range(A.subsets)] for ii in range(len(m))]
+        if NtAdd > 1:
+            d_r = [[toDevice(subsetData(A, frameData(additive, t, Nt), k)) for k in range(A.subsets)] for t in frames]
+        elif NtAdd == 1:
+            d_r = [d_r0] * len(frames)
+        f = [toDevice(x0) for t in frames]
+        for it in range(Niter):
+            for k in range(A.subsets):
+                A.subset = k
+                fp = forwardProjectionBatch(A, f, k)
+                if NtAdd > 0:
+                    fp = [fp[ii] + d_r[ii][k] for ii in range(len(f))]
+                apu = [d_m[ii][k] / clamp(fp[ii], epps) for ii in range(len(f))]
+                bp = backwardProjectionBatch(A, apu, k)
+                f = [f[ii] / Sens[k] * bp[ii] for ii in range(len(f))]
+        for ii, t in enumerate(frames):
+            output[:, t] = toHost(f[ii])
+        apu = (time.perf_counter() - ticF) / len(frames)
+        timings[alku : loppu] = apu
+        if verbose > 0:
+            print(f"Frames {alku + 1}-{loppu} / {Nt} took {apu * len(frames):0.4f} seconds ({apu:0.4f} s per frame)")
+    if verbose > 0:
+        print(f"Dynamic reconstruction took {time.perf_counter() - tic:0.4f} seconds (setup {setupTime:0.4f} seconds)")
+    output = np.reshape(output, (A.Nx[0].item(), A.Ny[0].item(), A.Nz[0].item(), Nt), order='F')
+    return output, timings
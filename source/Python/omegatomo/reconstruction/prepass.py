@@ -479,8 +479,8 @@ def parseInputs(options, mDataFound = False):
             
     
     if options.Nt <= 1 and mDataFound and not options.largeDim and options.loadTOF:
-        options.SinM = np.asfortranarray(options.SinM)
-        options.SinM = options.SinM.ravel(order='F').astype(dtype=np.float32)
+        from .recomain import fortranVector
+        options.SinM = fortranVector(options.SinM, np.float32)
 
 
 def TVPrepass(options):
@@ -506,31 +506,38 @@ def TVPrepass(options):
     """
     from skimage.transform import resize #scikit-image
     def assembleS(alkuarvo,T,Ny,Nx,Nz):
-        S = np.zeros((Nx * Ny * Nz * 3, 3),order='F',dtype=np.float32)
-        f = -np.diff(alkuarvo, axis=1)
-        f = np.concatenate((f, np.zeros((Nx, 1, Nz),order='F',dtype=np.float32)), axis=1)
-        f = f.ravel('F')
-        g = -np.diff(alkuarvo, axis=0)
-        g = np.concatenate((g, np.zeros((1, Ny, Nz),order='F',dtype=np.float32)), axis=0)
-        g = g.ravel('F')
-        h = -np.diff(alkuarvo, axis=2)
-        h = np.concatenate((h, np.zeros((Nx, Ny, 1),order='F',dtype=np.float32)), axis=2)
-        h = h.ravel('F')
-        
-        gradvec = np.vstack((f, g, h))
-        
-        gradnorm = np.linalg.norm(gradvec, axis=0)
-        
-        gamma = np.exp(-gradnorm ** 2 / (T ** 2))
-        
-        # Construct the matrix S
-        for ll in range(np.size(gradnorm)):
-            if gradnorm[ll] > 0:
-                nu = gradvec[:, ll] / gradnorm[ll]
-                B = np.eye(3) - (1. - gamma[ll]) * np.outer(nu, nu)
-            else:
-                B = np.eye(3)
-            S[3 * ll:3 * ll + 3, :] = B
+        # The weight matrix of each voxel is B = I - (1 - gamma) * nu * nu^T,
+        # where nu is the normalized gradient. The nine components of B are
+        # returned component by component, i.e. B[0,0] of all voxels, B[0,1]
+        # of all voxels, etc.
+        N = Nx * Ny * Nz
+        grad = [None] * 3
+        for ii, axis in enumerate((1, 0, 2)):
+            apu = np.zeros((Nx, Ny, Nz), order='F', dtype=np.float32)
+            ind = [slice(None)] * 3
+            ind[axis] = slice(0, -1)
+            apu[tuple(ind)] = -np.diff(alkuarvo, axis=axis)
+            grad[ii] = apu.ravel('F')
+        gradnorm = grad[0] * grad[0]
+        gradnorm += grad[1] * grad[1]
+        gradnorm += grad[2] * grad[2]
+        # (1 - gamma) / |grad|^2, so that nu * nu^T need not be formed
+        coef = np.zeros(N, dtype=np.float32)
+        ind = gradnorm > 0
+        coef[ind] = (1. - np.exp(-gradnorm[ind] / (T ** 2))) / gradnorm[ind]
+        del gradnorm, ind
+        S = np.empty(9 * N, dtype=np.float32)
+        for ii in range(3):
+            for jj in range(3):
+                out = S[(3 * ii + jj) * N : (3 * ii + jj + 1) * N]
+                if jj < ii:
+                    # Symmetric
+                    out[:] = S[(3 * jj + ii) * N : (3 * jj + ii + 1) * N]
+                    continue
+                np.multiply(grad[ii], grad[jj], out=out)
+                out *= -coef
+                if ii == jj:
+                    out += 1.
         return S
     if options.TV_use_anatomical:
         if isinstance(options.TV_referenceImage, str):
@@ -566,18 +573,7 @@ def TVPrepass(options):
         options.TV_referenceImage = options.TV_referenceImage / np.max(options.TV_referenceImage)
         if options.TVtype == 1:
             options.TV_referenceImage = options.TV_referenceImage.reshape((options.Nx[0].item(), options.Ny[0].item(), options.Nz[0].item()),order='F')
-            S = assembleS(options.TV_referenceImage, options.T, options.Ny[0].item(), options.Nx[0].item(), options.Nz[0].item())
-            S = S.astype(dtype=np.float32)
-            s1 = S[0::3, 0]
-            s2 = S[0::3, 1]
-            s3 = S[0::3, 2]
-            s4 = S[1::3, 0]
-            s5 = S[1::3, 1]
-            s6 = S[1::3, 2]
-            s7 = S[2::3, 0]
-            s8 = S[2::3, 1]
-            s9 = S[2::3, 2]
-            options.s = np.asfortranarray(np.concatenate((s1.flatten(), s2.flatten(), s3.flatten(), s4.flatten(), s5.flatten(), s6.flatten(), s7.flatten(), s8.flatten(), s9.flatten())))
+            options.s = assembleS(options.TV_referenceImage, options.T, options.Ny[0].item(), options.Nx[0].item(), options.Nz[0].item())
         options.TV_referenceImage = np.asfortranarray(options.TV_referenceImage)
         options.TV_referenceImage = options.TV_referenceImage.ravel('F').astype(dtype=np.float32)
         
@@ -631,6 +627,48 @@ def APLSPrepass(options):
     options.APLS_ref_image = np.asfortranarray(options.APLS_ref_image)
     options.APLS_ref_image = options.APLS_ref_image.ravel('F')
 
+# Memoized neighborhood distance weights, see distanceWeights
+_weightCache = {}
+
+def distanceWeights(Ndx, Ndy, Ndz, distX, distY, distZ, zFastest = False):
+    """
+    Inverse Euclidean distances of the voxels of a (2 * Ndx + 1) x 
+    (2 * Ndy + 1) x (2 * Ndz + 1) neighborhood to the center voxel (which is
+    inf). The offsets are in descending order and x is the fastest varying
+    dimension, or z if zFastest is True. A zero distX, distY or distZ ignores
+    that dimension. The results are memoized.
+
+    Parameters
+    ----------
+    Ndx, Ndy, Ndz : int
+        The neighborhood size in each direction.
+    distX, distY, distZ : float
+        The voxel sizes.
+    zFastest : bool, optional
+        The order of the weights. The default is False.
+
+    Returns
+    -------
+    weights : ndarray
+        The float32 weights as a vector.
+
+    """
+    key = (int(Ndx), int(Ndy), int(Ndz), float(distX), float(distY), float(distZ), bool(zFastest))
+    if key not in _weightCache:
+        x = np.arange(Ndx, -Ndx - 1, -1) * float(distX)
+        y = np.arange(Ndy, -Ndy - 1, -1) * float(distY)
+        z = np.arange(Ndz, -Ndz - 1, -1) * float(distZ)
+        if zFastest:
+            edist = np.sqrt(x[:, None, None]**2 + y[None, :, None]**2 + z[None, None, :]**2)
+        else:
+            edist = np.sqrt(z[:, None, None]**2 + y[None, :, None]**2 + x[None, None, :]**2)
+        with np.errstate(divide='ignore'):
+            weights = 1.0 / edist.ravel().astype(dtype=np.float32)
+        if len(_weightCache) >= 16:
+            _weightCache.pop(next(iter(_weightCache)))
+        _weightCache[key] = weights
+    return _weightCache[key].copy()
+
 def computeWeights(options, GGMRF):
     """
     Computes distance-based weights for various regularization methods. A 
@@ -655,51 +693,28 @@ def computeWeights(options, GGMRF):
     distZ = options.axial_fov[0] / options.Nz[0]
     
     if np.size(options.weights) == 0:
-        options.weights = np.zeros(((options.Ndx * 2 + 1) * (options.Ndy * 2 + 1) * (options.Ndz * 2 + 1)),order='F',dtype=np.float32)
-        cc = np.zeros((options.Ndy * 2 + 1) * (options.Ndx * 2 + 1),order='F',dtype=np.float32)
-        lt = 0
         if GGMRF:
-            for jj in range(options.Ndx, -options.Ndx-1, -1):
-                lt += 1
-                ll = 0
-                for kk in range(options.Ndy, -options.Ndy-1, -1):
-                    ll += 1
-                    if options.Ndx == 0 or options.Nx[0] == 1:
-                        apu = np.column_stack(((np.arange(options.Ndz, -options.Ndz-1, -1) * distZ), (np.repeat(kk, options.Ndy*2+1) * distY)))
-                    else:
-                        if options.Ndx != options.Ndz:
-                            apu = np.column_stack(((np.arange(options.Ndz, -options.Ndz-1, -1) * distZ), (np.repeat(kk, options.Ndz*2+1) * distY), 
-                                                   (np.repeat(jj, options.Ndz*2+1) * distX)))
-                        else:
-                            apu = np.column_stack(((np.arange(options.Ndz, -options.Ndz-1, -1) * distZ), (np.repeat(kk, options.Ndy*2+1) * distY), (np.repeat(jj, options.Ndx*2+1) * distX)))
-                    edist = np.sqrt(np.sum(apu**2, axis=1))
-                    if options.Ndx != options.Ndz:
-                        cc[(options.Ndz*2+1)*(ll-1):(options.Ndz*2+1)*ll] = edist
-                    else:
-                        cc[(options.Ndy*2+1)*(ll-1):(options.Ndy*2+1)*ll] = edist
-                if options.Ndx != options.Ndz:
-                    cc = cc[0:(options.Ndx*2+1)*(options.Ndz*2+1)]
-                options.weights[(options.Ndz*2+1)*(options.Ndy*2+1)*(lt-1):(options.Ndz*2+1)*(options.Ndy*2+1)*lt] = cc
+            # z is the fastest dimension, x is ignored with 2D data
+            if options.Ndx == 0 or options.Nx[0] == 1:
+                distX = 0.
+            options.weights = distanceWeights(options.Ndx, options.Ndy, options.Ndz, distX, distY, distZ, True)
         else:
-            for jj in range(options.Ndz, -options.Ndz-1, -1):
-                lt += 1
-                ll = 0
-                for kk in range(options.Ndy, -options.Ndy-1, -1):
-                    ll += 1
-                    if options.Ndz == 0 or options.Nz[0].item() == 1:
-                        apu = np.column_stack(((np.arange(options.Ndx, -options.Ndx-1, -1) * distX), (np.repeat(kk, options.Ndy*2+1) * distY)))
-                    else:
-                        if options.Ndz != options.Ndx:
-                            apu = np.column_stack(((np.arange(options.Ndx, -options.Ndx-1, -1) * distX), (np.repeat(kk, options.Ndy*2+1) * distY), 
-                                                   (np.concatenate((np.zeros(options.Ndx-options.Ndz), np.repeat(jj, options.Ndz*2+1) * distZ, np.zeros(options.Ndx-options.Ndz))))))
-                        else:
-                            apu = np.column_stack(((np.arange(options.Ndx, -options.Ndx-1, -1) * distX), (np.repeat(kk, options.Ndy*2+1) * distY), (np.repeat(jj, options.Ndz*2+1) * distZ)))
-                    edist = np.sqrt(np.sum(apu**2, axis=1))
-                    cc[(options.Ndy*2+1)*(ll-1):(options.Ndy*2+1)*ll] = edist
-                options.weights[(options.Ndx*2+1)*(options.Ndy*2+1)*(lt-1):(options.Ndx*2+1)*(options.Ndy*2+1)*lt] = cc
-        options.weights = 1.0 / options.weights
-        options.weights = options.weights.astype(dtype=np.float32)
+            # x is the fastest dimension, z is ignored with 2D data
+            if options.Ndz == 0 or options.Nz[0].item() == 1:
+                distZ = 0.
+            options.weights = distanceWeights(options.Ndx, options.Ndy, options.Ndz, distX, distY, distZ)
         
+def normalizedWeights(weights, removeCenter = True):
+    """
+    Normalizes the weights to sum to one (ignoring the inf center weight)
+    and optionally removes the center element.
+    """
+    weights = weights / np.sum(weights[np.isfinite(weights)])
+    if removeCenter:
+        half_len = np.size(weights) // 2
+        weights = np.concatenate((weights[:half_len], weights[half_len + 1:]))
+    return weights
+
 def quadWeights(options, isEmpty):
     """
     Normalizes the weights. If the weights are manually input, no normalization
@@ -718,11 +733,7 @@ def quadWeights(options, isEmpty):
 
     """
     if isEmpty:
-        non_inf_weights_sum = np.sum(options.weights[~np.isinf(options.weights)])
-        options.weights_quad = options.weights / non_inf_weights_sum
-        if not options.GGMRF:
-            half_len = np.size(options.weights_quad) // 2
-            options.weights_quad = np.concatenate((options.weights_quad[:half_len], options.weights_quad[half_len + 1:]))
+        options.weights_quad = normalizedWeights(options.weights, not options.GGMRF)
     else:
         options.weights_quad = options.weights
     # if not options.GGMRF:
@@ -744,10 +755,7 @@ def huberWeights(options):
 
     """
     if np.size(options.weights_huber) == 0:
-        non_inf_weights_sum = np.sum(options.weights[np.isfinite(options.weights)])
-        options.weights_huber = options.weights / non_inf_weights_sum
-        half_len = np.size(options.weights_huber) // 2
-        options.weights_huber = np.concatenate((options.weights_huber[:half_len], options.weights_huber[half_len + 1:]))
+        options.weights_huber = normalizedWeights(options.weights)
     options.weights_huber = options.weights_huber[~np.isinf(options.weights_huber)]
     options.weights_huber = options.weights_huber.astype(dtype=np.float32)
     
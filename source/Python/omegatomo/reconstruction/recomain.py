@@ -20,6 +20,30 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 import ctypes
 import numpy as np
 
+# Loaded reconstruction libraries (*_matrixfree_lib), keyed by the full path
+_libCache = {}
+
+def loadLibrary(libname):
+    """
+    Returns the ctypes handle of the library libname. Each library is loaded
+    only once per Python session, subsequent calls use the cached handle.
+    """
+    c_lib = _libCache.get(libname)
+    if c_lib is None:
+        c_lib = ctypes.CDLL(libname)
+        _libCache[libname] = c_lib
+    return c_lib
+
+def fortranVector(arr, dtype=None):
+    """
+    Returns arr as a column-major (Fortran order) vector of type dtype. No copy
+    is made if arr is already Fortran contiguous and of the correct type, e.g.
+    memory-mapped measurement data. Otherwise a single copy is made. The output
+    can share memory with arr and should therefore not be modified in place.
+    """
+    arr = np.asarray(arr, dtype=dtype, order='F')
+    return arr.ravel('F')
+
 def transferData(options):
     """
     Transfers the Python variables to the corresponding C-struct
@@ -90,6 +114,9 @@ def transferData(options):
     options.param.localSizeZ = ctypes.c_int32(int(localSize[2]))
     # Optional: compute the spatial prior only every regEveryIter-th (sub)iteration (1 = every time).
     options.param.regEveryIter = ctypes.c_int32(int(options.regEveryIter))
+    # Accumulation of the CPU backprojection (0 = atomic operations, 1 = per-thread images).
+    options.param.BPAccumulation = ctypes.c_uint32(int(options.BPAccumulation))
+    options.param.CPUThreads = ctypes.c_uint32(int(options.CPUThreads))
     options.param.NiterAD = ctypes.c_uint32(options.NiterAD)
     if isinstance(options.inffi, np.ndarray):
         options.param.inffi = ctypes.c_uint32(options.inffi.item())
@@ -602,12 +629,18 @@ def reconstructions_main(options):
         else:
             options.empty_weight = True
     parseInputs(options, True)
-    if isinstance(options.SinM, list):
+    # True if SinM is a copy made here, i.e. it can be modified in place
+    omaKopio = isinstance(options.SinM, list)
+    if omaKopio:
         options.SinM = np.concatenate(options.SinM)
     if isinstance(options.SinDelayed, list):
         options.SinDelayed = np.concatenate(options.SinDelayed)
-    if not options.CT and (not options.LSQR and not options.CGLS):
-        options.SinM[options.SinM < 0] = 0
+    if not options.CT and (not options.LSQR and not options.CGLS) and not np.issubdtype(options.SinM.dtype, np.unsignedinteger):
+        if omaKopio and options.SinM.flags.writeable:
+            options.SinM[options.SinM < 0] = 0
+        elif np.any(options.SinM < 0):
+            # Never write into the input array (or the memory-mapped input file)
+            options.SinM = np.maximum(options.SinM, 0)
     if options.FDK:
         options.precondTypeMeas[1] = True
     prepassPhase(options)
@@ -643,17 +676,21 @@ def reconstructions_main(options):
     else:
         libdir = os.path.abspath(os.path.join(os.path.dirname( __file__ ), '..', '..'))
         options.headerDir = os.path.abspath(os.path.join(os.path.dirname( __file__ ), '..', '..', '..', 'opencl')) + "/"
+    if options.SPECT and options.rayShiftsCompact and not options.useCPU:
+        # The OpenCL/CUDA libraries use the dense ray shifts
+        from omegatomo.projector.detcoord import expandRayShifts
+        expandRayShifts(options)
     transferData(options)
     inStr = options.headerDir.encode('utf-8')
     # point_ptr = ctypes.pointer(options.param)
     if isinstance(options.SinM, list):
         options.SinM = np.concatenate(options.SinM)
     if not options.SinM.dtype == 'float32' and not options.largeDim and options.loadTOF:
-        options.SinM = options.SinM.astype(np.float32)
+        options.SinM = fortranVector(options.SinM, np.float32)
     elif not options.SinM.dtype == 'uint16' and not options.SinM.dtype == 'uint8':
-        options.SinM = options.SinM.astype(np.float32)
-    if options.SinM.ndim > 1:
-        options.SinM = options.SinM.ravel('F')
+        options.SinM = fortranVector(options.SinM, np.float32)
+    else:
+        options.SinM = fortranVector(options.SinM)
     if options.useCUDA:
         if options.SinM.dtype == 'uint16':
             libN = 'CUDA_matrixfree_uint16_lib'
@@ -669,7 +706,7 @@ def reconstructions_main(options):
             libname = str(os.path.join(libdir,libN + ".so"))
     elif options.useCPU:
         if not options.SinM.dtype == 'float32':
-            options.SinM = options.SinM.astype(np.float32)
+            options.SinM = fortranVector(options.SinM, np.float32)
         if os.name == 'posix':
             libname = str(os.path.join(libdir,"CPU_matrixfree_lib.so"))
         elif os.name == 'nt':
@@ -698,7 +735,7 @@ def reconstructions_main(options):
         SinoP = options.SinM.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
     outputP = output.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
     FPOutputP = FPOutput.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
-    c_lib = ctypes.CDLL(libname)
+    c_lib = loadLibrary(libname)
     c_lib.omegaMain(options.param, ctypes.c_char_p(inStr), SinoP, outputP, FPOutputP, residualP)
     try:
         if options.useMultiResolutionVolumes and not options.storeMultiResolution:
@@ -7,8 +7,32 @@ Created on Thu Jul 24 17:37:24 2025
 
 import numpy as np
 
+def detectorNumbers(x, y, detectors_x, detectors_y, tol = 1e-3):
+    """
+    Finds the (one-based) detector number of both endpoints of each LOR with a
+    KD-tree nearest neighbor lookup. LORs without a detector within tol get 0.
+    """
+    from scipy.spatial import cKDTree
+    tree = cKDTree(np.column_stack((detectors_x, detectors_y)))
+    det_num = np.zeros((x.shape[0], 2), dtype=np.int32)
+    for ii in range(2):
+        dist, ind = tree.query(np.column_stack((x[:, ii], y[:, ii])), k=1, distance_upper_bound=tol)
+        found = np.isfinite(dist) & (dist < tol)
+        det_num[found, ii] = ind[found] + 1
+    return det_num
+
 def Randoms_variance_reduction(Randoms, options):
-    """Applies 3D fan-sum variance reduction to input randoms."""
+    """
+    Applies 3D fan-sum variance reduction to input randoms.
+
+    Randoms can be a single sinogram (Ndist x Nang x TotSinos), a 4D array
+    where the last dimension contains the dynamic time steps or a list of
+    frames. The detector lookup is done only once for all the frames. Each
+    output frame is an Ndist x Nang x TotSinos array. Vector (or N x 1 x 1)
+    frames are reshaped in column-major (Fortran) order, as the measurement
+    data elsewhere. Note that previously N x 1 x 1 input was reshaped in
+    row-major (C) order.
+    """
     from omegatomo.projector.detcoord import detectorCoordinates, sinogramCoordinates2D, sinogramCoordinates3D
     if options.verbose > 0:
         print("Starting Randoms variance reduction")
@@ -23,83 +47,77 @@ def Randoms_variance_reduction(Randoms, options):
 
     detectors_ring = options.detectors // options.rings
 
-    if Randoms.ndim == 3 and Randoms.shape[2] == 1:
-        Randoms = Randoms.reshape((options.Ndist, options.Nang, options.TotSinos))
-
     sino_amount = int(np.sum(options.segment_table))
-    coeff_matrix = np.zeros_like(Randoms, dtype=np.float32)
-    det_num = np.zeros((options.Ndist, options.Nang, 2), dtype=np.int32, order='F')
 
     # Normalize z to start from zero
     z = z - np.min(z)
     ring = (np.round(z / z[1, 0]) + 1).astype(np.int32)
 
     # Determine each LOR's detector index
-    for u in range(options.Ndist * options.Nang):
-        i = u % options.Ndist
-        j = u // options.Ndist
-
-        for d in range(len(detectors_x)):
-            if np.linalg.norm([x[u, 0] - detectors_x[d], y[u, 0] - detectors_y[d]]) < 1e-3:
-                det_num[i, j, 0] = d + 1
-                break
-        for d in range(len(detectors_x)):
-            if np.linalg.norm([x[u, 1] - detectors_x[d], y[u, 1] - detectors_y[d]]) < 1e-3:
-                det_num[i, j, 1] = d + 1
-                break
-
-    # Vectorized construction
-    testi1 = det_num[:, :, 0].flatten('F')
-    testi2 = det_num[:, :, 1].flatten('F')
-
-    ring1 = ring[:, 0].reshape(1, -1)
-    ring2 = ring[:, 1].reshape(1, -1)
-
-    testi1 = (np.reshape(testi1, (-1, 1)) + ((ring1 - 1) * detectors_ring)).astype(np.int32) - 1
-    testi2 = (np.reshape(testi2, (-1, 1)) + ((ring2 - 1) * detectors_ring)).astype(np.int32) - 1
-
-    randoms_flat = Randoms.flatten('F')
-    size = max(testi1.flatten('F').max(), testi2.flatten('F').max()) + 1
-
-    # Sum values into bins (like accumarray)
-    randoms_det = np.zeros(size, dtype=np.float32)
+    det_num = detectorNumbers(x, y, detectors_x, detectors_y)
+
+    # The detector index of a sinogram bin is det_num + (ring - 1) * detectors_ring - 1.
+    # Instead of forming it for every bin, use tables of size (unique rings, LORs)
+    nLOR = options.Ndist * options.Nang
+    tables = [None] * 2
+    for ii in range(2):
+        uniq, inv = np.unique(ring[:, ii], return_inverse=True)
+        ind = (det_num[:, ii].reshape(1, -1).astype(np.int64) + (uniq.reshape(-1, 1).astype(np.int64) - 1) * detectors_ring) - 1
+        # One-hot matrix that sums the sinograms with the same ring number
+        summa = np.zeros((ring.shape[0], uniq.size), dtype=np.float32)
+        summa[np.arange(ring.shape[0]), inv.ravel()] = 1.
+        tables[ii] = (inv.ravel(), ind, summa)
+    size = max(tables[0][1].max(), tables[1][1].max()) + 1
     hits_det = np.zeros(size, dtype=np.float32)
-    
-    # Bin summation
-    randoms_det1 = np.bincount(testi1.flatten('F'), weights=randoms_flat, minlength=size)
-    randoms_det2 = np.bincount(testi2.flatten('F'), weights=randoms_flat, minlength=size)
-    hits_det1 = np.bincount(testi1.flatten('F'), minlength=size)
-    hits_det2 = np.bincount(testi2.flatten('F'), minlength=size)
-    
-    # Combine results
-    randoms_det[:size] = randoms_det1 + randoms_det2
-    hits_det[:size] = hits_det1 + hits_det2
-
-    with np.errstate(divide='ignore', invalid='ignore'):
-        randoms_det = np.divide(randoms_det, hits_det, out=np.zeros_like(randoms_det), where=hits_det > 0)
-
-    # Compute mean inverse
-    mean_det = np.nanmean(randoms_det[hits_det > 0])
-    coeffs_detectors = np.zeros_like(randoms_det)
-    coeffs_detectors[hits_det > 0] = mean_det / randoms_det[hits_det > 0]
-
-    for k in range(sino_amount):
-        r1 = ring[k, 0]
-        r2 = ring[k, 1]
-        for i in range(options.Ndist):
-            for j in range(options.Nang):
-                d1 = det_num[i, j, 0] + (r1 - 1) * detectors_ring - 1
-                d2 = det_num[i, j, 1] + (r2 - 1) * detectors_ring - 1
-                coeff_matrix[i, j, k] = coeffs_detectors[d1] * coeffs_detectors[d2]
-
-    New_randoms = Randoms.astype(dtype=np.float32) * coeff_matrix
-
-    # Scale back total counts
-    total_original = np.reshape(np.sum(np.sum(Randoms, axis=0), axis = 0), (1, 1, -1))
-    total_new = np.reshape(np.sum(np.sum(New_randoms, axis=0), axis = 0), (1, 1, -1))
-    New_randoms *= total_original / total_new
+    for inv, ind, summa in tables:
+        nSinos = np.sum(summa, axis=0, dtype=np.float64)
+        hits_det += np.bincount(ind.ravel(), weights=np.broadcast_to(nSinos.reshape(-1, 1), ind.shape).ravel(), minlength=size).astype(np.float32)
+    hits = hits_det > 0
+
+    if isinstance(Randoms, list):
+        frames = Randoms
+    elif Randoms.ndim == 4:
+        frames = [Randoms[:, :, :, t] for t in range(Randoms.shape[3])]
+    else:
+        frames = [Randoms]
+
+    New = [None] * len(frames)
+    for t in range(len(frames)):
+        R = frames[t]
+        if R.ndim != 3 or R.shape[2] == 1:
+            R = R.reshape((options.Ndist, options.Nang, -1), order='F')
+        R2 = R.reshape((nLOR, -1), order='F').astype(np.float32, copy=False)
+
+        # Fan sums, first over the sinograms of each ring then over the detectors
+        randoms_det = np.zeros(size, dtype=np.float64)
+        for inv, ind, summa in tables:
+            randoms_det += np.bincount(ind.ravel(), weights=(R2 @ summa).T.ravel(), minlength=size)
+        randoms_det = randoms_det.astype(np.float32)
+        randoms_det = np.divide(randoms_det, hits_det, out=np.zeros_like(randoms_det), where=hits)
+
+        # Compute mean inverse
+        mean_det = np.nanmean(randoms_det[hits])
+        coeffs_detectors = np.zeros_like(randoms_det)
+        coeffs_detectors[hits] = mean_det / randoms_det[hits]
+
+        # Coefficients as (sinogram, LOR), i.e. column-major (Ndist, Nang, sinogram)
+        coeff_matrix = coeffs_detectors[tables[0][1]][tables[0][0]]
+        coeff_matrix *= coeffs_detectors[tables[1][1]][tables[1][0]]
+        coeff_matrix[sino_amount:, :] = 0.
+
+        New_randoms = np.asfortranarray(R, dtype=np.float32) * coeff_matrix.T.reshape(R.shape, order='F')
+
+        # Scale back total counts
+        total_original = np.sum(R, axis=(0, 1), dtype=np.float64).reshape((1, 1, -1))
+        total_new = np.sum(New_randoms, axis=(0, 1), dtype=np.float64).reshape((1, 1, -1))
+        New_randoms *= (total_original / total_new).astype(np.float32)
+        New[t] = New_randoms
 
     if options.verbose > 0:
         print("Randoms variance reduction completed")
 
-    return New_randoms
\ No newline at end of file
+    if isinstance(Randoms, list):
+        return New
+    elif Randoms.ndim == 4:
+        return np.stack(New, axis=3)
+    return New[0]
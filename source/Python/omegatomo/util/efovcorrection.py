@@ -5,8 +5,80 @@ Created on Thu Mar  7 14:08:02 2024
 @author: Ville-Veikko Wettenhovi
 """
 
-def CTEFOVCorrection(options, extrapLengthTransaxial = None, extrapLengthAxial = None, eFOVLengthTransaxial = None, eFOVLengthAxial = None):
-    import numpy as np
+import numpy as np
+
+
+def extrapolationOutput(out, shape, dtype):
+    """
+    Returns the output array of the extrapolation. If out is None, a new array
+    is allocated. If out is a string, a (memory-mapped) .npy file with that
+    name is created. Otherwise out has to be an array of the correct shape.
+    """
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if isinstance(out, str):
+        return np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+    if tuple(out.shape) != tuple(shape):
+        raise ValueError('The output array has shape ' + str(tuple(out.shape)) + ', but ' + str(tuple(shape)) + ' is required')
+    return out
+
+def extrapolateProjections(proj, PnTr, PnAx, flat = None, useWeighting = False, eps = 1e-10, out = None, chunkSize = 64):
+    """
+    Extrapolates the projections proj (rows x columns x projections) by PnTr
+    rows to both sides (transaxial) and then by PnAx columns to both sides
+    (axial), by repeating the edge values. With useWeighting, the repeated
+    values are scaled to the air (flat) value with a logarithmic profile.
+    eps is added to the edge values (and the profile) to avoid division by
+    zero.
+
+    The projections are processed in angular blocks of chunkSize projections
+    and written directly to out, which can be a preallocated (or
+    memory-mapped) array, a filename for a memory-mapped .npy output or None.
+    Only the output and temporaries of the size of one block are allocated.
+    """
+    size1 = proj.shape[0] + PnTr * 2
+    size2 = proj.shape[1] + PnAx * 2
+    nProj = proj.shape[2]
+    out = extrapolationOutput(out, (size1, size2, nProj), proj.dtype)
+    # The same weighting profiles are used for every block
+    if useWeighting:
+        flat = np.single(flat)
+        perProjection = flat.ndim > 0 and flat.size == nProj and nProj > 1
+        wTr = (np.log(np.linspace(1, np.exp(1), PnTr)) + eps).reshape((-1, 1, 1))
+        wTrR = (np.log(np.linspace(np.exp(1), 1, PnTr)) + eps).reshape((-1, 1, 1))
+        wAx = (np.log(np.linspace(1, np.exp(1), PnAx)) + eps).reshape((1, -1, 1))
+        wAxR = (np.log(np.linspace(np.exp(1), 1, PnAx)) + eps).reshape((1, -1, 1))
+    else:
+        wTr = wTrR = wAx = wAxR = None
+    def edge(apu, w, f):
+        apu = apu + eps
+        if w is not None:
+            apu = f / np.exp(np.log(f / apu) * w)
+        return apu
+    r1 = proj.shape[0] + PnTr
+    c1 = proj.shape[1] + PnAx
+    chunkSize = max(int(chunkSize), 1)
+    for alku in range(0, nProj, chunkSize):
+        loppu = min(alku + chunkSize, nProj)
+        f = flat.ravel()[alku : loppu] if useWeighting and perProjection else flat
+        o = out[:, :, alku : loppu]
+        o[PnTr : r1, PnAx : c1, :] = proj[:, :, alku : loppu]
+        if PnTr > 0:
+            o[: PnTr, PnAx : c1, :] = edge(proj[0 : 1, :, alku : loppu], wTr, f)
+            o[r1 :, PnAx : c1, :] = edge(proj[-1 :, :, alku : loppu], wTrR, f)
+        if PnAx > 0:
+            o[:, : PnAx, :] = edge(o[:, PnAx : PnAx + 1, :], wAx, f)
+            o[:, c1 :, :] = edge(o[:, c1 - 1 : c1, :], wAxR, f)
+    return out
+
+def CTEFOVCorrection(options, extrapLengthTransaxial = None, extrapLengthAxial = None, eFOVLengthTransaxial = None, eFOVLengthAxial = None, chunkSize = 64, out = None, scatterOut = None):
+    """
+    Extrapolates the projections (options.SinM) and/or extends the FOV. The
+    extrapolation is done in angular blocks of chunkSize projections. The
+    extrapolated projections can be written directly to a preallocated
+    (optionally memory-mapped) array out, or to a memory-mapped .npy file if
+    out is a filename. scatterOut is the same for options.ScatterC.
+    """
     if options.useExtrapolation:
         print('Extrapolating the projections')
         if extrapLengthTransaxial == None:
@@ -29,89 +101,17 @@ def CTEFOVCorrection(options, extrapLengthTransaxial = None, extrapLengthAxial =
                 PnAx = int(np.floor(options.SinM.shape[1] * 0.25))
         else:
             PnAx = int(np.floor(options.SinM.shape[1] * extrapLengthAxial))
-        if options.transaxialExtrapolation:
-            size1 = options.SinM.shape[0] + PnTr * 2
-        else:
-            size1 = options.SinM.shape[0]
-        if options.axialExtrapolation:
-            size2 = options.SinM.shape[1] + PnAx * 2
-        else:
-            size2 = options.SinM.shape[1]
-        erotus1 = size1 - options.SinM.shape[0]
-        erotus2 = size2 - options.SinM.shape[1]
-        newProj = np.zeros((size1, size2, options.SinM.shape[2]), dtype=options.SinM.dtype)
-        newProj[erotus1 // 2 : options.SinM.shape[0] + erotus1 // 2, erotus2 // 2 : options.SinM.shape[1] + erotus2 // 2, :] = options.SinM
-        if options.transaxialExtrapolation:
-            apu = np.tile(options.SinM[0,:,:], (erotus1 // 2, 1, 1)) + 1e-10
-            if options.useExtrapolationWeighting:
-                apu = np.log(np.single(options.flat) / apu)
-                pituus = int(np.round(apu.shape[0] / (6/6)))
-                pituus2 = apu.shape[0] - pituus
-                if pituus2 == 0:
-                    apu = apu * (np.log(np.linspace(1, np.exp(1), pituus)).reshape((-1, 1, 1)) + 1e-10)
-                else:
-                    apu = apu * (np.concatenate((np.zeros((pituus2), dtype=apu.dtype), np.log(np.linspace(1, np.exp(1), pituus)))).reshape((-1, 1, 1)) + 1e-10)
-                apu = np.single(options.flat) / np.exp(apu)
-            newProj[0: erotus1 // 2, erotus2 // 2 : options.SinM.shape[1] + erotus2 // 2, :] = apu
-            apu = np.tile(options.SinM[-1,:,:], (erotus1 // 2, 1, 1)) + 1e-10
-            if options.useExtrapolationWeighting:
-                apu = np.log(np.single(options.flat) / apu)
-                if pituus2 == 0:
-                    apu = apu * (np.log(np.linspace(np.exp(1), 1, pituus)).reshape(-1, 1, 1) + 1e-10)
-                else:
-                    apu = apu * (np.concatenate((np.log(np.linspace(np.exp(1), 1, pituus))), np.zeros((pituus2), dtype=apu.dtype)).reshape(-1, 1, 1) + 1e-10)
-                apu = np.single(options.flat) / np.exp(apu)
-            newProj[options.SinM.shape[0] + erotus1 // 2 : , erotus2 // 2 : options.SinM.shape[1] + erotus2 // 2, :] = apu
-        if options.axialExtrapolation:
-            apu = np.tile(newProj[:,erotus2 // 2, :].reshape(newProj.shape[0], 1, newProj.shape[2]), (1, erotus2 // 2, 1)) + 1e-10
-            if options.useExtrapolationWeighting:
-                apu = np.log(np.single(options.flat) / apu)
-                apu = apu * (np.log(np.linspace(1, np.exp(1), apu.shape[1])).reshape(1, -1, 1) + 1e-10)
-                apu = np.single(options.flat) / np.exp(apu)
-            newProj[:, : erotus2 // 2, :] = apu
-            apu = np.tile(newProj[:,options.SinM.shape[1] + erotus2 // 2 - 1, :].reshape(newProj.shape[0], 1, newProj.shape[2]), (1, erotus2 // 2, 1)) + 1e-10
-            if options.useExtrapolationWeighting:
-                apu = np.log(np.single(options.flat) / apu)
-                apu = apu * (np.log(np.linspace(np.exp(1), 1, apu.shape[1])).reshape(1, -1, 1) + 1e-10)
-                apu = np.single(options.flat) / np.exp(apu)
-            newProj[:, options.SinM.shape[1] + erotus2 // 2 : , :] = apu
-        options.SinM = newProj
+        # Number of rows/columns added to each side
+        PnTr = PnTr if options.transaxialExtrapolation else 0
+        PnAx = PnAx if options.axialExtrapolation else 0
+        flat = options.flat if options.useExtrapolationWeighting else None
+        options.SinM = extrapolateProjections(options.SinM, PnTr, PnAx, flat, options.useExtrapolationWeighting, 1e-10, out, chunkSize)
         options.nRowsDOrig = options.nRowsD
         options.nColsDOrig = options.nColsD
         options.nRowsD = options.SinM.shape[0]
         options.nColsD = options.SinM.shape[1]
         if options.scatter_correction and options.corrections_during_reconstruction:
-            newProj = np.zeros((size1, size2, options.ScatterC.shape[2]), dtype=options.ScatterC.dtype)
-            newProj[erotus1 // 2 : options.ScatterC.shape[0] + erotus1 // 2, erotus2 // 2 : options.ScatterC.shape[1] + erotus2 // 2,:] = options.ScatterC
-            if options.transaxialExtrapolation:
-                apu = np.tile(np.reshape(options.ScatterC[0,:,:], (1, options.ScatterC.shape[1], options.ScatterC.shape[2])), (erotus1 // 2, 1, 1))
-                if options.useExtrapolationWeighting:
-                    apu = np.log(np.single(options.flat) / apu)
-                    pituus = int(np.round(apu.shape[0] / (6/6)))
-                    pituus2 = apu.shape[0] - pituus
-                    apu = apu * np.log(np.linspace(1, np.exp(1), pituus)).reshape(-1, 1, 1)
-                    apu = np.single(options.flat) / np.exp(apu)
-                newProj[0: erotus1 // 2, erotus2 // 2 : options.ScatterC.shape[1] + erotus2 // 2, :] = apu
-                apu = np.tile(options.ScatterC[-1,:,:], (erotus1 // 2, 1, 1))
-                if options.useExtrapolationWeighting:
-                    apu = np.log(np.single(options.flat) / apu)
-                    apu = apu * np.log(np.linspace(np.exp(1), 1, pituus)).reshape(-1, 1, 1)
-                    apu = np.single(options.flat) / np.exp(apu)
-                newProj[options.ScatterC.shape[0] + erotus1 // 2 : , erotus2 // 2 : options.ScatterC.shape[1] + erotus2 // 2, :] = apu
-            if options.axialExtrapolation:
-                apu = np.tile(np.reshape(newProj[:,erotus2 // 2, :], (newProj.shape[0], 1, newProj.shape[2])), (1, erotus2 // 2, 1))
-                if options.useExtrapolationWeighting:
-                    apu = np.log(np.single(options.flat) / apu)
-                    apu = apu * np.reshape(np.log(np.linspace(1, np.exp(1), apu.shape[1])), (1, -1, 1))
-                    apu = np.single(options.flat) / np.exp(apu)
-                newProj[:, 0: erotus2 // 2, :] = apu
-                apu = np.tile(np.reshape(newProj[:,options.ScatterC.shape[1] + erotus2 // 2, :], (newProj.shape[0], 1, newProj.shape[2])), (1, erotus2 // 2, 1))
-                if options.useExtrapolationWeighting:
-                    apu = np.log(np.single(options.flat) / apu)
-                    apu = apu * np.reshape(np.log(np.linspace(np.exp(1), 1, apu.shape[1])), (1, -1, 1))
-                    apu = np.single(options.flat) / np.exp(apu)
-                newProj[:, options.ScatterC.shape[1] + erotus2 // 2 : , :] = apu
-            options.ScatterC = newProj
+            options.ScatterC = extrapolateProjections(options.ScatterC, PnTr, PnAx, flat, options.useExtrapolationWeighting, 0., scatterOut, chunkSize)
     if options.useEFOV:
         print('Extending the FOV')
         if not(options.transaxialEFOV) and not(options.axialEFOV):
@@ -18,6 +18,111 @@ You should have received a copy of the GNU General Public License
 along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
+import numpy as np
+
+# cuFFT plans of the CuPy path, keyed by (direction, Nf, shape)
+_planCache = {}
+
+def halfSpectrum(filt, Nf):
+    """
+    Returns the non-negative frequencies (the first Nf // 2 + 1 elements) of
+    the real and symmetric filter filt, i.e. the filter used with the
+    real-to-complex transforms.
+    """
+    return np.ascontiguousarray(np.asarray(filt, dtype=np.float32).ravel()[: Nf // 2 + 1])
+
+def _transformLength(options):
+    # Length of the filtered dimension of the (subset) measurements
+    if options.subsets > 1 and options.subsetType == 5:
+        return options.nColsD
+    return options.nRowsD
+
+def _deviceFilter(options, nimi, cacheName, key, muunna):
+    # Returns the device copy of the half-spectrum filter options.<nimi>,
+    # cached into the dict options.<cacheName> with key (Nf, shape)
+    if not isinstance(getattr(options, cacheName, None), dict):
+        setattr(options, cacheName, {})
+    cache = getattr(options, cacheName)
+    if key not in cache:
+        cache[key] = muunna(halfSpectrum(getattr(options, nimi), options.Nf))
+    return cache[key]
+
+def _cupyPlan(var, Nf, valueType):
+    import cupyx.scipy.fft as cufft
+    key = (valueType, Nf, var.shape, var.dtype.str)
+    if key not in _planCache:
+        if len(_planCache) >= 16:
+            _planCache.pop(next(iter(_planCache)))
+        _planCache[key] = cufft.get_fft_plan(var, shape=(Nf,), axes=(-1,), value_type=valueType)
+    return _planCache[key]
+
+def filterMeasurements(options, var, nimi = 'filter0', cacheName = 'filterG', divide = False):
+    """
+    Multiplies (or divides, if divide = True) the measurements var in the
+    frequency domain with the real and symmetric filter options.<nimi>. The
+    measurements are zero-padded to options.Nf and only the non-negative half
+    of the spectrum is computed (real-to-complex transforms). The device
+    filters are cached to options.<cacheName>.
+    """
+    n = _transformLength(options)
+    Nf = options.Nf
+    if options.useAF:
+        import arrayfire as af
+        var = af.moddims(var, n, d1=var.elements() // n)
+        filt = _deviceFilter(options, nimi, cacheName, (Nf, var.dims()[1]), lambda h : af.tile(af.interop.np_to_af_array(h), 1, d1=var.dims()[1]))
+        temp = af.fft_r2c(var, dim0=Nf)
+        if divide:
+            temp /= filt
+        else:
+            temp *= filt
+        af.eval(temp)
+        temp = af.fft_c2r(temp)
+        var = af.flat(temp[:n, :])
+    elif options.useTorch:
+        import torch
+        filt = _deviceFilter(options, nimi, cacheName, (Nf,), lambda h : torch.tensor(h, device='cuda'))
+        var = torch.reshape(var, (var.numel() // n, n))
+        temp = torch.fft.rfft(var, n=Nf, dim=1)
+        if divide:
+            temp /= filt
+        else:
+            temp *= filt
+        temp = torch.fft.irfft(temp, n=Nf, dim=1)
+        var = torch.ravel(temp[:, :n])
+    elif options.useCuPy:
+        import cupy as cp
+        import cupyx.scipy.fft as cufft
+        filt = _deviceFilter(options, nimi, cacheName, (Nf,), cp.asarray)
+        var = cp.reshape(var, (var.size // n, n))
+        if var.shape[1] < Nf:
+            var = cp.pad(var, ((0, 0), (0, Nf - var.shape[1])))
+        temp = cufft.rfft(var, n=Nf, axis=-1, plan=_cupyPlan(var, Nf, 'R2C'))
+        if divide:
+            temp /= filt
+        else:
+            temp *= filt
+        temp = cufft.irfft(temp, n=Nf, axis=-1, overwrite_x=True, plan=_cupyPlan(temp, Nf, 'C2R'))
+        var = cp.ascontiguousarray(temp[:, :n]).ravel()
+    elif isinstance(var, np.ndarray):
+        # CPU (NumPy) data, multi-threaded pocketfft from SciPy if available
+        try:
+            import scipy.fft as fft
+            kwargs = {'workers' : options.numPyThreads if getattr(options, 'numPyThreads', 0) > 0 else -1}
+        except ImportError:
+            import numpy.fft as fft
+            kwargs = {}
+        filt = _deviceFilter(options, nimi, cacheName, (Nf,), lambda h : h)
+        dtype = var.dtype
+        var = np.reshape(var, (var.size // n, n))
+        temp = fft.rfft(var, n=Nf, axis=-1, **kwargs)
+        if divide:
+            temp /= filt
+        else:
+            temp *= filt
+        temp = fft.irfft(temp, n=Nf, axis=-1, **kwargs)
+        var = np.ascontiguousarray(temp[:, :n], dtype=dtype).ravel()
+    return var
+
 def applyMeasPreconditioning(options, var):
     """
     Computes the measurement-based preconditioning for the input data.
@@ -26,73 +131,17 @@ def applyMeasPreconditioning(options, var):
     ----------
     options : class object
         OMEGA class object used to contain all the necessary data.
-    var : arrayfire array or torch tensor
+    var : arrayfire array, torch tensor, CuPy array or NumPy array
         The input data that is filtered.
 
     Returns
     -------
-    var : arrayfire array or toch tensor
+    var : arrayfire array, torch tensor, CuPy array or NumPy array
         The filtered input data.
 
     """
-    if (options.precondTypeMeas[0].item() or options.precondTypeMeas[1].item()):
-        if options.useAF:
-            import arrayfire as af
-            if options.precondTypeMeas[1].item():
-                if not hasattr(options, 'filterG'):
-                    options.filterG = af.interop.np_to_af_array(options.filter0)
-                if (options.subsets > 1 and (options.subsetType == 5 or options.subsetType == 4)):
-                    if options.subsetType == 4:
-                        var = af.moddims(var, options.nRowsD, d1=var.elements() // options.nRowsD)
-                    else:
-                        var = af.moddims(var, options.nColsD, d1=var.elements() // options.nColsD)
-                else:
-                    var = af.moddims(var, options.nRowsD, d1=options.nColsD, d2=var.elements() // (options.nRowsD * options.nColsD))
-                temp = af.fft(var, options.Nf)
-                temp = temp * af.tile(options.filterG, 1, d1=temp.shape[1], d2=temp.shape[2])
-                af.eval(temp)
-                af.ifft_inplace(temp)
-                var = af.flat(af.real(temp[:var.shape[0], :, :]))
-        elif options.useTorch:
-            # def reshape_fortran(x, shape):
-            #     if len(x.shape) > 0:
-            #         x = x.permute(*reversed(range(len(x.shape))))
-            #     return x.reshape(*reversed(shape)).permute(*reversed(range(len(shape))))
-            import torch
-            if options.precondTypeMeas[1].item():
-                if not hasattr(options, 'filterG'):
-                    import numpy as np
-                    options.filter0 = np.reshape(options.filter0, (1, 1, -1))
-                    options.filterG = torch.tensor(options.filter0, device='cuda')
-                if (options.subsets > 1 and (options.subsetType == 5 or options.subsetType == 4)):
-                    if options.subsetType == 4:
-                        var = torch.reshape(var, (var.numel() // options.nRowsD, options.nRowsD))
-                    else:
-                        var = torch.reshape(var, (var.numel() // options.nColsD, options.nColsD))
-                else:
-                    # var = reshape_fortran(var, (options.nRowsD, options.nColsD, var.numel() // (options.nRowsD * options.nColsD)))
-                    var = torch.reshape(var, (options.nColsD, var.numel() // (options.nRowsD * options.nColsD), options.nRowsD))
-                temp = torch.fft.fft(var, n=options.Nf, dim=2)
-                temp *= options.filterG
-                temp = torch.fft.ifft(temp, dim=2)
-                var = torch.ravel(torch.real(temp[:,:,:var.shape[2]]))
-        elif options.useCuPy:
-            import cupy as cp
-            if options.precondTypeMeas[1].item():
-                if not hasattr(options, 'filterG'):
-                    options.filterG = cp.asarray(options.filter0)
-                if options.subsets > 1 and (options.subsetType == 5 or options.subsetType == 4):
-                    if options.subsetType == 4:
-                        var = cp.reshape(var, (options.nRowsD, var.size // options.nRowsD), order='F')
-                    else:
-                        var = cp.reshape(var, (options.nColsD, var.size // options.nColsD), order='F')
-                else:
-                    var = cp.reshape(var, (options.nRowsD, options.nColsD, var.size // (options.nRowsD * options.nColsD)), order='F')
-                temp = cp.fft.fft(var, n=options.Nf, axis=0)
-                temp *= options.filterG.reshape((-1, 1, 1), order='F')
-                temp = cp.fft.ifft(temp, axis=0)
-                var = cp.real(temp[:var.shape[0], :, :]).ravel(order='F')
-                
+    if options.precondTypeMeas[1].item():
+        var = filterMeasurements(options, var, 'filter0', 'filterG')
     return var
             
 def circulantInverse(options, var):
@@ -104,61 +153,13 @@ def circulantInverse(options, var):
     ----------
     options : class object
         OMEGA class object used to contain all the necessary data.
-    var : arrayfire array or torch tensor
+    var : arrayfire array, torch tensor, CuPy array or NumPy array
         The partially computed dual estimate of the PDHG.
 
     Returns
     -------
-    var : arrayfire array or torch tensor
+    var : arrayfire array, torch tensor, CuPy array or NumPy array
         The fully computed dual estimate.
 
     """
-    if options.useAF:
-        import arrayfire as af
-        if not hasattr(options, 'FilterG'):
-            options.FilterG = af.interop.np_to_af_array(options.Ffilter)
-        if (options.subsets > 1 and (options.subsetType == 5 or options.subsetType == 4)):
-            if options.subsetType == 4:
-                var = af.moddims(var, options.nRowsD, d1=var.elements() // options.nRowsD)
-            else:
-                var = af.moddims(var, options.nColsD, d1=var.elements() // options.nColsD)
-        else:
-            var = af.moddims(var, options.nRowsD, d1=options.nColsD, d2=var.elements() // (options.nRowsD * options.nColsD))
-        temp = af.fft(var, options.Nf)
-        temp /= af.tile(options.FilterG, 1, d1=temp.shape[1], d2=temp.shape[2])
-        af.eval(temp)
-        af.ifft_inplace(temp)
-        var = af.flat(af.real(temp[:var.shape[0], :, :]))
-    elif options.useTorch:
-        import torch
-        if not hasattr(options, 'FilterG'):
-            import numpy as np
-            options.Ffilter = np.reshape(options.Ffilter, (1, 1, -1))
-            options.FilterG = torch.tensor(options.Ffilter, device='cuda')
-        if options.subsets > 1 and (options.subsetType == 5 or options.subsetType == 4):
-            if options.subsetType == 4:
-                var = torch.reshape(var, (options.nRowsD, var.numel() // options.nRowsD))
-            else:
-                var = torch.reshape(var, (options.nColsD, var.numel() // options.nColsD))
-        else:
-            var = torch.reshape(var, (options.nColsD, var.numel() // (options.nRowsD * options.nColsD), options.nRowsD))
-        temp = torch.fft.fft(var, n=options.Nf, dim=2)
-        temp /= options.FilterG
-        temp = torch.fft.ifft(temp, dim=2)
-        var = torch.ravel(torch.real(temp[:,:,:var.shape[2]]))
-    elif options.useCuPy:
-        import cupy as cp
-        if not hasattr(options, 'FilterG'):
-            options.FilterG = cp.asarray(options.Ffilter)
-        if options.subsets > 1 and (options.subsetType == 5 or options.subsetType == 4):
-            if options.subsetType == 4:
-                var = cp.reshape(var, (options.nRowsD, var.size // options.nRowsD), order='F')
-            else:
-                var = cp.reshape(var, (options.nColsD, var.size // options.nColsD), order='F')
-        else:
-            var = cp.reshape(var, (options.nRowsD, options.nColsD, var.size // (options.nRowsD * options.nColsD)), order='F')
-        temp = cp.fft.fft(var, n=options.Nf, axis=0)
-        temp /= options.FilterG.reshape((-1, 1, 1), order='F')
-        temp = cp.fft.ifft(temp, axis=0)
-        var = cp.real(temp[:var.shape[0], :, :]).ravel(order='F')
-    return var
\ No newline at end of file
+    return filterMeasurements(options, var, 'Ffilter', 'FilterG', True)
@@ -2,6 +2,10 @@
 import numpy as np
 import warnings
 
+# Parker weight maps of the previous geometries
+_weightCache = {}
+_maxCached = 4
+
 def _S(x):
     """Smooth S-function transition."""
     y = np.zeros_like(x)
@@ -49,6 +53,36 @@ def ParkerWeights(options):
     if len(betaIn) < 2:
         raise ValueError('options.angles must contain at least two projection angles.')
         
+    W = parkerWeightMap(betaIn, DSD, nU, du, q, detOffset)
+    
+    # Apply the weights in-place in contiguous chunks, i.e. one projection at
+    # a time for Fortran-ordered data and 16 detector rows at a time otherwise
+    if not np.issubdtype(options.SinM.dtype, np.floating):
+        # Integer (e.g. uint16) projections cannot hold the weighted values
+        options.SinM = options.SinM.astype(np.float32)
+    W = W.astype(options.SinM.dtype, copy=False)
+    if options.SinM.flags.f_contiguous:
+        for kk in range(W.shape[1]):
+            apu = options.SinM[:, :, kk]
+            apu *= W[:, kk : kk + 1]
+    else:
+        for alku in range(0, nU, 16):
+            apu = options.SinM[alku : alku + 16, :, :]
+            apu *= W[alku : alku + 16, None, :]
+            
+    # return options
+
+def parkerWeightMap(betaIn, DSD, nU, du, q = 0.25, detOffset = 0):
+    """
+    Computes the nU x nProjections Parker weight map for the given geometry.
+    The maps are cached, i.e. repeated calls with the same angles,
+    source-to-detector distance, detector pitch, offset and q return the
+    previously computed map (do not modify the returned array).
+    """
+    avain = (np.asarray(betaIn, dtype=np.float64).tobytes(), float(DSD), int(nU), float(du), float(q), np.asarray(detOffset, dtype=np.float64).tobytes())
+    if avain in _weightCache:
+        return _weightCache[avain]
+    
     # Flat-panel detector coordinate u
     u = (np.arange(nU) - (nU - 1) / 2) * du + detOffset
     
@@ -76,25 +110,26 @@ def ParkerWeights(options):
         
     epsilon = max(scanRange - (np.pi + 2 * delta), 0)
     
-    # Compute weights
-    for iu in range(nU):
-        g = alpha[iu]
-        
-        B = epsilon + 2 * delta - 2 * g
-        b = q * B
-        B2 = epsilon + 2 * delta + 2 * g
-        b2 = q * B2
-        
-        if b <= 0 or b2 <= 0:
-            raise ValueError('Encountered nonpositive transition length b. Check geometry.')
-            
-        x1 = betaRel / b - 0.5
-        x2 = (betaRel - B) / b + 0.5
-        x3 = (betaRel - np.pi + 2 * g) / b2 - 0.5
-        x4 = (betaRel - np.pi - 2 * delta - epsilon) / b2 + 0.5
+    # Compute the weights of all detector rows at once, rows x projections
+    g = alpha.reshape(-1, 1)
+    betaRel = betaRel.reshape(1, -1)
+    
+    B = epsilon + 2 * delta - 2 * g
+    b = q * B
+    B2 = epsilon + 2 * delta + 2 * g
+    b2 = q * B2
+    
+    if np.any(b <= 0) or np.any(b2 <= 0):
+        raise ValueError('Encountered nonpositive transition length b. Check geometry.')
         
-        w2 = 0.5 * (_S(x1) + _S(x2) - _S(x3) - _S(x4))
-        w2 = np.clip(w2, 0, 1)
-        options.SinM[iu, :, :] *= w2.reshape(1, -1)
-            
-    # return options
\ No newline at end of file
+    x1 = betaRel / b - 0.5
+    x2 = (betaRel - B) / b + 0.5
+    x3 = (betaRel - np.pi + 2 * g) / b2 - 0.5
+    x4 = (betaRel - np.pi - 2 * delta - epsilon) / b2 + 0.5
+    
+    W = 0.5 * (_S(x1) + _S(x2) - _S(x3) - _S(x4))
+    W = np.clip(W, 0, 1).astype(np.float32)
+    if len(_weightCache) >= _maxCached:
+        _weightCache.pop(next(iter(_weightCache)))
+    _weightCache[avain] = W
+    return W
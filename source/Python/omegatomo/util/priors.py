@@ -1,11 +1,350 @@
 # -*- coding: utf-8 -*-
 
-def RDP(im, Nx, Ny, Nz, gamma, beta, rType = 0, clctx = -1, queue = -1):
+import os
+import numpy as np
+
+# Compiled prior programs, keyed by (backend, context, build options)
+_programCache = {}
+# Device images (textures) of the input images, keyed by (backend, context, Nx, Ny, Nz)
+_imageCache = {}
+# PyOpenCL context and queue objects of ArrayFire, keyed by the pointer values
+_afCache = {}
+# auxKernels.cl with the general functions header
+_source = []
+
+def _cacheValue(cache, key, value, maxSize = 16):
+    if len(cache) >= maxSize:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+    return value
+
+def _priorSource():
+    if len(_source) == 0:
+        headerDir = os.path.abspath(os.path.join(os.path.dirname( __file__ ), '..', '..', '..', 'opencl')) + "/"
+        with open(headerDir + 'general_opencl_functions.h', encoding="utf8") as f:
+            hlines = f.read()
+        with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
+            lines = f.read()
+        _source.append(hlines + lines)
+    return _source[0]
+
+def _afContext():
+    # PyOpenCL context and queue of the current ArrayFire device
+    import pyopencl as cl
+    import arrayfire as af
+    key = (af.opencl.get_context(retain=False), af.opencl.get_queue(retain=False))
+    if key not in _afCache:
+        _cacheValue(_afCache, key, (cl.Context.from_int_ptr(key[0]), cl.CommandQueue.from_int_ptr(key[1])))
+    return _afCache[key]
+
+def _contextKey(rType, clctx):
+    if rType == 0 or rType == 3:
+        return ('OpenCL', clctx.int_ptr)
+    import cupy as cp
+    return ('CUDA', cp.cuda.Device().id)
+
+def _program(rType, clctx, bOpt):
+    """
+    Returns the compiled prior program (PyOpenCL program or CuPy module)
+    for the build options bOpt. The programs are compiled only once per
+    context and build options.
+    """
+    key = _contextKey(rType, clctx) + (bOpt,)
+    if key not in _programCache:
+        if rType == 0 or rType == 3:
+            import pyopencl as cl
+            prg = cl.Program(clctx, _priorSource()).build(bOpt)
+        else:
+            import cupy as cp
+            prg = cp.RawModule(code=_priorSource(), options=bOpt)
+        _cacheValue(_programCache, key, prg, 32)
+    return _programCache[key]
+
+def _deviceImage(rType, clctx, Nx, Ny, Nz, key = None):
+    """
+    Returns the device image (OpenCL) or the CUDA array and the texture
+    object (CUDA) for a Nx x Ny x Nz image. If key is given, the image is
+    cached and reused.
+    """
+    if key is not None:
+        key = _contextKey(rType, clctx) + (key, Nx, Ny, Nz)
+        if key in _imageCache:
+            return _imageCache[key]
+    if rType == 0 or rType == 3:
+        import pyopencl as cl
+        imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
+        d_im = cl.Image(clctx, cl.mem_flags.READ_ONLY, imformat, shape=(Nx, Ny, Nz))
+    else:
+        import cupy as cp
+        chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
+        array = cp.cuda.texture.CUDAarray(chl, Nx, Ny, Nz)
+        res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
+        tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeBorder, cp.cuda.runtime.cudaAddressModeBorder,cp.cuda.runtime.cudaAddressModeBorder), 
+                                                filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
+        d_im = (array, cp.cuda.texture.TextureObject(res, tdes))
+    if key is not None:
+        _cacheValue(_imageCache, key, d_im, 8)
+    return d_im
+
+def _copyToImage(rType, queue, d_im, im, Nx, Ny, Nz):
+    # Copies the input image im to the device image d_im
+    if rType == 0 or rType == 3:
+        import pyopencl as cl
+        if rType == 0:
+            import arrayfire as af
+            imD = cl.MemoryObject.from_int_ptr(im.raw_ptr())
+            cl.enqueue_copy(queue, d_im, imD, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
+            af.device.unlock_array(im)
+        else:
+            cl.enqueue_copy(queue, d_im, im.data, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
+    else:
+        import cupy as cp
+        if rType == 2:
+            im = cp.asarray(im)
+        d_im[0].copy_from(im.reshape((Nz, Ny, Nx)))
+
+class PriorOperator:
+    """
+    Standalone prior (RDP, NLReg or TV) with the compiled kernel, the device
+    images, the constant kernel arguments and the output buffer held across
+    the calls. Use this in iterative algorithms instead of the RDP, NLReg and
+    TV functions, which do the same setup on every call (the compiled programs
+    are cached on module level in both cases).
+    
+    Args:
+        prior: 'RDP', 'NLReg' or 'TV'.
+        
+        Nx/Ny/Nz: Number of voxels in x/y/z-direction.
+        
+        rType: Reconstruction type. 0 = ArrayFire (OpenCL), 1 = CuPy, 2 = PyTorch, 
+        3 = PyOpenCL, 4 = NumPy (CPU). Default is 0.
+        
+        clctx/queue: Only used by PyOpenCL, omit otherwise.
+        
+        nThreads: Only used by NumPy, omit otherwise.
+        
+        reuseOutput: If True (default), the same output buffer is used on every
+        call, i.e. the previous gradient is overwritten. Not used with ArrayFire
+        or NumPy.
+        
+        The remaining keyword arguments are the parameters of the selected prior,
+        with the same names and defaults as in RDP, NLReg and TV, e.g. 
+        PriorOperator('RDP', Nx, Ny, Nz, rType=3, clctx=ctx, queue=queue, gamma=2., beta=0.1).
+        The reference image (refIm) of NLReg is copied to the device only once.
+    
+    Usage:
+        with PriorOperator('TV', Nx, Ny, Nz, rType=1, beta=0.1) as P:
+            for it in range(Niter):
+                grad = P(im)
+    """
+    defaults = {'RDP' : {'gamma' : None, 'beta' : None},
+                'NLReg' : {'h' : None, 'beta' : None, 'SW' : (1, 1, 1), 'PW' : (1, 1, 1), 'NLType' : 0, 'STD' : 1., 'gamma' : 10., 'phi' : 10., 
+                           'useAdaptive' : False, 'adaptiveConstant' : 5e-6, 'GGMRFpqc' : (2., 1.5, 0.001), 'refIm' : None},
+                'TV' : {'beta' : None, 'sValue' : 1e-4, 'Lange' : False, 'sigma' : 10.}}
+    
+    def __init__(self, prior, Nx, Ny, Nz, rType = 0, clctx = -1, queue = -1, nThreads = None, reuseOutput = True, **kwargs):
+        if prior not in self.defaults:
+            raise ValueError('Unknown prior ' + str(prior) + '! Available priors are RDP, NLReg and TV.')
+        for nimi in kwargs:
+            if nimi not in self.defaults[prior]:
+                raise ValueError('Unknown parameter ' + nimi + ' for ' + prior + '!')
+        self.params = dict(self.defaults[prior], **kwargs)
+        for nimi, arvo in self.params.items():
+            if arvo is None and nimi != 'refIm':
+                raise ValueError('The parameter ' + nimi + ' is required for ' + prior + '!')
+        if isinstance(self.params.get('refIm'), list):
+            self.params['refIm'] = None
+        self.prior = prior
+        self.Nx, self.Ny, self.Nz = (int(np.asarray(N).item()) for N in (Nx, Ny, Nz))
+        self.rType = rType
+        self.nThreads = nThreads
+        self.reuseOutput = reuseOutput
+        self.f = None
+        if rType == 4:
+            return
+        if rType == 0:
+            clctx, queue = _afContext()
+            self.bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
+        elif rType == 1 or rType == 2:
+            self.bOpt = ('-DCUDA', '-DPYTHON',)
+        elif rType == 3:
+            self.bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
+        else:
+            raise ValueError('Unknown rType ' + str(rType) + '!')
+        self.clctx = clctx
+        self.queue = queue
+        p = self.params
+        # Constant kernel arguments before (pre) and after (post) the image dimensions
+        pre = []
+        if prior == 'RDP':
+            self.bOpt += ('-DRDP', '-DUSEIMAGES', '-DLOCAL_SIZE=16', '-DLOCAL_SIZE2=16',)
+            self.kernelName = 'RDPKernel'
+            post = [p['gamma'], 1e-8, p['beta']]
+        elif prior == 'TV':
+            self.bOpt += ('-DTVGRAD', '-DUSEIMAGES', '-DLOCAL_SIZE=16', '-DLOCAL_SIZE2=16',)
+            if p['Lange']:
+                self.bOpt += ('-DSATV',)
+            self.kernelName = 'TVKernel'
+            post = [p['sigma'], p['sValue'], p['beta']]
+        else:
+            SW = p['SW']
+            PW = p['PW']
+            self.bOpt += ('-DNLM_', '-DUSEIMAGES', '-DLOCAL_SIZE=16', '-DLOCAL_SIZE2=16', '-DNLTYPE=' + str(p['NLType']), '-DSWINDOWX=' + str(SW[0]), 
+                     '-DSWINDOWY=' + str(SW[1]), '-DSWINDOWZ=' + str(SW[2]), '-DPWINDOWX=' + str(PW[0]), '-DPWINDOWY=' + str(PW[1]), 
+                     '-DPWINDOWZ=' + str(PW[2]),)
+            if p['useAdaptive']:
+                self.bOpt += ('-DNLMADAPTIVE',)
+            if p.get('refIm') is not None:
+                self.bOpt += ('-DNLMREF',)
+            self.kernelName = 'NLM'
+            STD = p['STD']
+            x = np.linspace(-PW[0], PW[0], 2 * PW[0] + 1, dtype=np.float32)
+            y = np.linspace(-PW[1], PW[1], 2 * PW[1] + 1, dtype=np.float32)
+            z = np.linspace(-PW[2], PW[2], 2 * PW[2] + 1, dtype=np.float32)
+            gaussK = np.exp(-(np.add.outer(np.add.outer(x**2 / (2*STD**2), y**2 / (2*STD**2)), z**2 / (2*STD**2))))
+            gaussK = gaussK.flatten('F').astype(dtype=np.float32)
+            gamma = p['phi'] if (p['NLType'] == 4 or p['NLType'] == 5) else p['gamma']
+            post = [p['h'], 1e-8, p['beta']]
+            if p['NLType'] >= 3:
+                post += [gamma]
+            if p['NLType'] == 6:
+                post += list(p['GGMRFpqc'])
+            if p['useAdaptive']:
+                post += [p['adaptiveConstant']]
+        Nx, Ny, Nz = self.Nx, self.Ny, self.Nz
+        localSize = (16, 16, 1)
+        self.localSize = localSize
+        self.globalSize = [Nx + (localSize[0] - Nx % localSize[0]) % localSize[0], Ny + (localSize[1] - Ny % localSize[1]) % localSize[1], Nz]
+        prg = _program(rType, clctx, self.bOpt)
+        self.d_im = _deviceImage(rType, clctx, Nx, Ny, Nz, 'im')
+        self.d_ref = None
+        if p.get('refIm') is not None:
+            self.d_ref = _deviceImage(rType, clctx, Nx, Ny, Nz)
+            if rType == 0 or rType == 3:
+                queue.finish()
+            _copyToImage(rType, queue, self.d_ref, p['refIm'], Nx, Ny, Nz)
+        if rType == 0 or rType == 3:
+            import pyopencl as cl
+            self.kernel = cl.Kernel(prg, self.kernelName)
+            kIndLoc = 1
+            self.kernel.set_arg(kIndLoc, self.d_im)
+            kIndLoc += 1
+            if prior == 'NLReg':
+                self.d_gaussian = cl.array.to_device(queue, gaussK)
+                self.kernel.set_arg(kIndLoc, self.d_gaussian.data)
+                kIndLoc += 1
+            d_Nxyz = cl.cltypes.make_int3(Nx, Ny, Nz)
+            self.kernel.set_arg(kIndLoc, d_Nxyz)
+            kIndLoc += 1
+            self.kernel.set_arg(kIndLoc, d_Nxyz)
+            for arvo in post:
+                kIndLoc += 1
+                self.kernel.set_arg(kIndLoc, (cl.cltypes.float)(arvo))
+            if self.d_ref is not None:
+                kIndLoc += 1
+                self.kernel.set_arg(kIndLoc, self.d_ref)
+        else:
+            import cupy as cp
+            self.kernel = prg.get_function(self.kernelName)
+            self.args = (self.d_im[1],)
+            if prior == 'NLReg':
+                self.d_gaussian = cp.asarray(gaussK)
+                self.args += (self.d_gaussian,)
+            self.args += (cp.int32(Nx), cp.int32(Ny), cp.int32(Nz), cp.int32(Nx), cp.int32(Ny), cp.int32(Nz),)
+            self.args += tuple(cp.float32(arvo) for arvo in post)
+            if self.d_ref is not None:
+                self.args += (self.d_ref[1],)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.release()
+        return False
+    
+    def release(self):
+        """
+        Releases the output buffer and the device reference image. The compiled
+        programs stay in the module cache.
+        """
+        self.f = None
+        self.d_ref = None
+    
+    def _output(self):
+        # Zero-initialized output buffer, reused if reuseOutput is True
+        N = self.Nx * self.Ny * self.Nz
+        if self.rType == 0:
+            import arrayfire as af
+            return af.data.constant(0, N, dtype=af.Dtype.f32)
+        if self.f is not None and self.reuseOutput:
+            if self.rType == 2:
+                self.f.zero_()
+            else:
+                self.f.fill(0)
+            return self.f
+        if self.rType == 1:
+            import cupy as cp
+            f = cp.zeros(N, dtype=cp.float32)
+        elif self.rType == 2:
+            import torch
+            f = torch.zeros(N, dtype=torch.float32, device='cuda')
+        else:
+            import pyopencl as cl
+            f = cl.array.zeros(self.queue, N, dtype=cl.cltypes.float)
+        if self.reuseOutput:
+            self.f = f
+        return f
+    
+    def __call__(self, im):
+        """
+        Computes the gradient of the prior at im. Returns a vector of the same
+        type as im.
+        """
+        p = self.params
+        if self.rType == 4:
+            from omegatomo.util.priorsnumpy import RDPNumPy, NLRegNumPy, TVNumPy
+            if self.prior == 'RDP':
+                return RDPNumPy(im, self.Nx, self.Ny, self.Nz, p['gamma'], p['beta'], self.nThreads)
+            elif self.prior == 'TV':
+                return TVNumPy(im, self.Nx, self.Ny, self.Nz, p['beta'], p['sValue'], p['Lange'], p['sigma'], self.nThreads)
+            return NLRegNumPy(im, self.Nx, self.Ny, self.Nz, p['h'], p['beta'], p['SW'], p['PW'], p['NLType'], p['STD'], p['gamma'], p['phi'], 
+                              p['useAdaptive'], p['adaptiveConstant'], p['GGMRFpqc'], p['refIm'], self.nThreads)
+        Nx, Ny, Nz = self.Nx, self.Ny, self.Nz
+        if self.rType == 0 or self.rType == 3:
+            import pyopencl as cl
+            self.queue.finish()
+            f = self._output()
+            if self.rType == 0:
+                import arrayfire as af
+                fD = cl.MemoryObject.from_int_ptr(f.raw_ptr())
+                self.kernel.set_arg(0, fD)
+            else:
+                self.kernel.set_arg(0, f.data)
+            _copyToImage(self.rType, self.queue, self.d_im, im, Nx, Ny, Nz)
+            cl.enqueue_nd_range_kernel(self.queue, self.kernel, self.globalSize, self.localSize)
+            self.queue.finish()
+            if self.rType == 0:
+                af.device.unlock_array(f)
+        else:
+            import cupy as cp
+            f = self._output()
+            if self.rType == 2:
+                import torch
+                fD = cp.asarray(f)
+            else:
+                fD = f
+            _copyToImage(self.rType, self.queue, self.d_im, im, Nx, Ny, Nz)
+            self.kernel((self.globalSize[0] // self.localSize[0], self.globalSize[1] // self.localSize[1], self.globalSize[2]), (self.localSize[0], self.localSize[1], 1), (fD,) + self.args)
+            if self.rType == 2:
+                torch.cuda.synchronize()
+        return f
+
+def RDP(im, Nx, Ny, Nz, gamma, beta, rType = 0, clctx = -1, queue = -1, nThreads = None):
     """
     Relative difference prior
     This is a standalone function for computing relative difference prior.
-    Supports ArrayFire arrays, PyOpenCL arrays, CuPy arrays or PyTorch tensors
-    as the input. Use rType to specify the input type.
+    Supports ArrayFire arrays, PyOpenCL arrays, CuPy arrays, PyTorch tensors
+    or NumPy arrays as the input. Use rType to specify the input type.
     
     Args:
         im: The image where the regularization should be applied. This should be a 
@@ -20,161 +359,31 @@ def RDP(im, Nx, Ny, Nz, gamma, beta, rType = 0, clctx = -1, queue = -1):
         beta: Regularization paramerer/hyperparameter. Scalar float.
         
         rType: Reconstruction type. 0 = ArrayFire (OpenCL), 1 = CuPy, 2 = PyTorch, 
-        3 = PyOpenCL. Default is 0.
+        3 = PyOpenCL, 4 = NumPy (CPU). Default is 0.
         
         clctx: Only used by PyOpenCL, omit otherwise. The PyOpenCL context value.
         
         queue: Only used by PyOpenCL, omit otherwise. The PyOpenCL command queue value.
+        
+        nThreads: Only used by NumPy, omit otherwise. The number of threads used.
+        Default (None) uses all the CPUs.
     
     Returns:
         f: The gradient of the RDP. Vector of the same type as the input im.
     """
-    if rType == 0:
-        import pyopencl as cl
-        import arrayfire as af
-    elif rType == 1:
-        import cupy as cp
-    elif rType == 2:
-        import cupy as cp
-        import torch
-    elif rType == 3:
-        import pyopencl as cl
-    import os
-    import numpy as np
-    
-    if type(Nx) == np.ndarray:
-        Nx = Nx.item()
-    if type(Ny) == np.ndarray:
-        Ny = Ny.item()
-    if type(Nz) == np.ndarray:
-        Nz = Nz.item()
-        
-    if rType == 0:
-        ctx = af.opencl.get_context(retain=True)
-        clctx = cl.Context.from_int_ptr(ctx)
-        q = af.opencl.get_queue(True)
-        queue = cl.CommandQueue.from_int_ptr(q)
-        bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
-    elif rType == 1 or rType == 2:
-        bOpt = ('-DCUDA', '-DPYTHON',)
-    elif rType == 3:
-        bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
-    
-    bOpt += ('-DRDP', '-DUSEIMAGES', '-DLOCAL_SIZE=16', '-DLOCAL_SIZE2=16',)
-    
-    epps = 1e-8
-    localSize = (16, 16, 1)
-    apu = [Nx % localSize[0], Ny % localSize[1], 0]
-    erotus = [0] * 2
-    if apu[0] > 0:
-        erotus[0] = localSize[0] - apu[0]
-    if apu[1] > 0:
-        erotus[1] = localSize[1] - apu[1]
-    
-    globalSize = [None] * 3
-    globalSize[0] = Nx + erotus[0]
-    globalSize[1] = Ny + erotus[1]
-    globalSize[2] = Nz
-    
-    headerDir = os.path.abspath(os.path.join(os.path.dirname( __file__ ), '..', '..', '..', 'opencl')) + "/"
-    with open(headerDir + 'general_opencl_functions.h', encoding="utf8") as f:
-        hlines = f.read()
-    with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
-        lines = f.read()
-    lines = hlines + lines
-    if rType == 0 or rType == 3:
-        queue.finish()
-        d_Nxyz = cl.cltypes.make_int3(Nx, Ny, Nz)
-        prg = cl.Program(clctx, lines).build(bOpt)
-        knlRDP = prg.RDPKernel
-        if rType == 0:
-            imPtr = im.raw_ptr()
-            imD = cl.MemoryObject.from_int_ptr(imPtr)
-            f = af.data.constant(0, Nx * Ny * Nz, dtype=af.Dtype.f32)
-            fPtr = f.raw_ptr()
-            fD = cl.MemoryObject.from_int_ptr(fPtr)
-        else:
-            f = cl.array.zeros(queue, Nx * Ny * Nz, dtype=cl.cltypes.float)
-        imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
-        mf = cl.mem_flags
-        d_im = cl.Image(clctx, mf.READ_ONLY, imformat, shape=(Nx, Ny, Nz))
-        if rType == 0:
-            cl.enqueue_copy(queue, d_im, imD, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-            af.device.unlock_array(im)
-        else:
-            cl.enqueue_copy(queue, d_im, im.data, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-        kIndLoc = 0
-        if rType == 0:
-            knlRDP.set_arg(kIndLoc, fD)
-        else:
-            knlRDP.set_arg(kIndLoc, f.data)
-        kIndLoc += 1
-        knlRDP.set_arg(kIndLoc, d_im)
-        kIndLoc += 1
-        knlRDP.set_arg(kIndLoc, d_Nxyz)
-        kIndLoc += 1
-        knlRDP.set_arg(kIndLoc, d_Nxyz)
-        kIndLoc += 1
-        knlRDP.set_arg(kIndLoc, (cl.cltypes.float)(gamma))
-        kIndLoc += 1
-        knlRDP.set_arg(kIndLoc, (cl.cltypes.float)(epps))
-        kIndLoc += 1
-        knlRDP.set_arg(kIndLoc, (cl.cltypes.float)(beta))
-        cl.enqueue_nd_range_kernel(queue, knlRDP, globalSize, localSize)
-        queue.finish()
-        if rType == 0:
-            af.device.unlock_array(f)
-    else:
-        mod = cp.RawModule(code=lines, options=bOpt)
-        knlRDP = mod.get_function('RDPKernel')
-        if rType == 2:
-            imD = cp.asarray(im)
-            f = torch.zeros(Nx * Ny * Nz, dtype=torch.float32, device='cuda')
-            fD = cp.asarray(f)
-        else:
-            f = cp.zeros(Nx * Ny * Nz, dtype=cp.float32)
-        chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-        array = cp.cuda.texture.CUDAarray(chl, Nx, Ny, Nz)
-        if rType == 2:
-            array.copy_from(imD.reshape((Nz, Ny, Nx)))
-        else:
-            array.copy_from(im.reshape((Nz, Ny, Nx)))
-        res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-        tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeBorder, cp.cuda.runtime.cudaAddressModeBorder,cp.cuda.runtime.cudaAddressModeBorder), 
-                                                filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
-        d_im = cp.cuda.texture.TextureObject(res, tdes)
-        if rType == 2:
-            kIndLoc = (fD,)
-        else:
-            kIndLoc = (f,)
-        kIndLoc += (d_im,)
-        # kIndLoc += (cp.array([cp.int32(Nx), cp.int32(Ny), cp.int32(Nz)], dtype=cp.int32),)
-        # kIndLoc += (cp.array([cp.int32(Nx), cp.int32(Ny), cp.int32(Nz)], dtype=cp.int32),)
-        kIndLoc += (cp.int32(Nx),)
-        kIndLoc += (cp.int32(Ny),)
-        kIndLoc += (cp.int32(Nz),)
-        kIndLoc += (cp.int32(Nx),)
-        kIndLoc += (cp.int32(Ny),)
-        kIndLoc += (cp.int32(Nz),)
-        kIndLoc += (cp.float32(gamma),)
-        kIndLoc += (cp.float32(epps),)
-        kIndLoc += (cp.float32(beta),)
-        knlRDP((globalSize[0] // localSize[0], globalSize[1] // localSize[1], globalSize[2]), (localSize[0], localSize[1], 1), kIndLoc)
-        if rType == 2:
-            torch.cuda.synchronize()
-    return f
+    return PriorOperator('RDP', Nx, Ny, Nz, rType, clctx, queue, nThreads, False, gamma=gamma, beta=beta)(im)
 
 
 def NLReg(im, Nx, Ny, Nz, h, beta, SW = (1, 1, 1), PW = (1, 1, 1), rType = 0, clctx = -1, queue = -1, NLType = 0, STD = 1., gamma = 10., phi = 10., useAdaptive = False, adaptiveConstant = 5e-6, 
-       GGMRFpqc = (2., 1.5, 0.001), refIm = []):
+       GGMRFpqc = (2., 1.5, 0.001), refIm = [], nThreads = None):
     """
     Non-local regularization methods
     This is a standalone function for computing non-local regularization. Supported
     non-local methods are: non-local means (NLM), non-local TV (NLTV), non-local
     relative difference (NLRD), NLM filtering, non-local Lange (NLLange), NL filtering 
     with Lange and non-local GGMRF. NLM is used by default.
-    Supports ArrayFire arrays, PyOpenCL arrays, CuPy arrays or PyTorch tensors
-    as the input. Use rType to specify the input type.
+    Supports ArrayFire arrays, PyOpenCL arrays, CuPy arrays, PyTorch tensors
+    or NumPy arrays as the input. Use rType to specify the input type.
     
     Args:
         im: The image where the regularization should be applied. This should be a 
@@ -189,7 +398,7 @@ def NLReg(im, Nx, Ny, Nz, h, beta, SW = (1, 1, 1), PW = (1, 1, 1), rType = 0, cl
         beta: Regularization paramerer/hyperparameter. Scalar float.
         
         rType: Reconstruction type. 0 = ArrayFire (OpenCL), 1 = CuPy, 2 = PyTorch, 
-        3 = PyOpenCL. Default is 0.
+        3 = PyOpenCL, 4 = NumPy (CPU). Default is 0.
         
         NLType: The regularization type. 0 = NLM, 1 = NLTV, 2 = NLM filtered, 3 = 
         NLRD, 4 = NL Lange, 5 = NL filtered with Lange, and 6 = NLGGMRF.
@@ -229,222 +438,27 @@ def NLReg(im, Nx, Ny, Nz, h, beta, SW = (1, 1, 1), PW = (1, 1, 1), rType = 0, cl
         clctx: Only used by PyOpenCL, omit otherwise. The PyOpenCL context value.
         
         queue: Only used by PyOpenCL, omit otherwise. The PyOpenCL command queue value.
+        
+        nThreads: Only used by NumPy, omit otherwise. The number of threads used.
+        Default (None) uses all the CPUs.
     
     Returns:
         f: The gradient of the selected NL regularization. Vector of the same type as the 
         input im.
     """
-    if rType == 0:
-        import pyopencl as cl
-        import arrayfire as af
-    elif rType == 1:
-        import cupy as cp
-    elif rType == 2:
-        import cupy as cp
-        import torch
-    elif rType == 3:
-        import pyopencl as cl
-    import os
-    import numpy as np
-    
-    if type(Nx) == np.ndarray:
-        Nx = Nx.item()
-    if type(Ny) == np.ndarray:
-        Ny = Ny.item()
-    if type(Nz) == np.ndarray:
-        Nz = Nz.item()
-        
-    if rType == 0:
-        ctx = af.opencl.get_context(retain=True)
-        clctx = cl.Context.from_int_ptr(ctx)
-        q = af.opencl.get_queue(True)
-        queue = cl.CommandQueue.from_int_ptr(q)
-        bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
-    elif rType == 1 or rType == 2:
-        bOpt = ('-DCUDA', '-DPYTHON',)
-    elif rType == 3:
-        bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
-    
-    bOpt += ('-DNLM_', '-DUSEIMAGES', '-DLOCAL_SIZE=16', '-DLOCAL_SIZE2=16', '-DNLTYPE=' + str(NLType), '-DSWINDOWX=' + str(SW[0]), 
-             '-DSWINDOWY=' + str(SW[1]), '-DSWINDOWZ=' + str(SW[2]), '-DPWINDOWX=' + str(PW[0]), '-DPWINDOWY=' + str(PW[1]), 
-             '-DPWINDOWZ=' + str(PW[2]),)
-    if (useAdaptive):
-        bOpt += ('-DNLMADAPTIVE',)
-    if type(im) == type(refIm):
-        bOpt += ('-DNLMREF',)
-        useRef = True
-    else:
-        useRef = False
-    
-    epps = 1e-8
-    localSize = (16, 16, 1)
-    apu = [Nx % localSize[0], Ny % localSize[1], 0]
-    erotus = [0] * 2
-    if apu[0] > 0:
-        erotus[0] = localSize[0] - apu[0]
-    if apu[1] > 0:
-        erotus[1] = localSize[1] - apu[1]
-    
-    globalSize = [None] * 3
-    globalSize[0] = Nx + erotus[0]
-    globalSize[1] = Ny + erotus[1]
-    globalSize[2] = Nz
-    
-    headerDir = os.path.abspath(os.path.join(os.path.dirname( __file__ ), '..', '..', '..', 'opencl')) + "/"
-    with open(headerDir + 'general_opencl_functions.h', encoding="utf8") as f:
-        hlines = f.read()
-    with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
-        lines = f.read()
-    lines = hlines + lines
-    x = np.linspace(-PW[0], PW[0], 2 * PW[0] + 1, dtype=np.float32)
-    y = np.linspace(-PW[1], PW[1], 2 * PW[1] + 1, dtype=np.float32)
-    z = np.linspace(-PW[2], PW[2], 2 * PW[2] + 1, dtype=np.float32)
-    gaussK = np.exp(-(np.add.outer(np.add.outer(x**2 / (2*STD**2), y**2 / (2*STD**2)), z**2 / (2*STD**2))))
-    gaussK = gaussK.flatten('F').astype(dtype=np.float32)
-    if NLType == 4 or NLType == 5:
-        gamma = phi
-    if rType == 0 or rType == 3:
-        queue.finish()
-        d_Nxyz = cl.cltypes.make_int3(Nx, Ny, Nz)
-        prg = cl.Program(clctx, lines).build(bOpt)
-        knlNLM = prg.NLM
-        if rType == 0:
-            imPtr = im.raw_ptr()
-            imD = cl.MemoryObject.from_int_ptr(imPtr)
-            f = af.data.constant(0, Nx * Ny * Nz, dtype=af.Dtype.f32)
-            fPtr = f.raw_ptr()
-            fD = cl.MemoryObject.from_int_ptr(fPtr)
-            if useRef:
-                RefimPtr = refIm.raw_ptr()
-                RefimD = cl.MemoryObject.from_int_ptr(RefimPtr)
-        else:
-            f = cl.array.zeros(queue, Nx * Ny * Nz, dtype=cl.cltypes.float)
-        d_gaussian = cl.array.to_device(queue, gaussK)
-        imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
-        mf = cl.mem_flags
-        d_im = cl.Image(clctx, mf.READ_ONLY, imformat, shape=(Nx, Ny, Nz))
-        if useRef:
-            d_refIm = cl.Image(clctx, mf.READ_ONLY, imformat, shape=(Nx, Ny, Nz))
-        if rType == 0:
-            cl.enqueue_copy(queue, d_im, imD, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-            af.device.unlock_array(im)
-            if useRef:
-                cl.enqueue_copy(queue, d_refIm, RefimD, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-                af.device.unlock_array(refIm)
-        else:
-            cl.enqueue_copy(queue, d_im, im.data, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-            if useRef:
-                cl.enqueue_copy(queue, d_refIm, refIm.data, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-        kIndLoc = 0
-        if rType == 0:
-            knlNLM.set_arg(kIndLoc, fD)
-        else:
-            knlNLM.set_arg(kIndLoc, f.data)
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, d_im)
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, d_gaussian.data)
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, d_Nxyz)
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, d_Nxyz)
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(h))
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(epps))
-        kIndLoc += 1
-        knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(beta))
-        if NLType >= 3:
-            kIndLoc += 1
-            knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(gamma))
-        if NLType == 6:
-            kIndLoc += 1
-            knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(GGMRFpqc[0]))
-            kIndLoc += 1
-            knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(GGMRFpqc[1]))
-            kIndLoc += 1
-            knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(GGMRFpqc[2]))
-        if useAdaptive:
-            kIndLoc += 1
-            knlNLM.set_arg(kIndLoc, (cl.cltypes.float)(adaptiveConstant))
-        if useRef:
-            kIndLoc += 1
-            knlNLM.set_arg(kIndLoc, d_refIm)
-        cl.enqueue_nd_range_kernel(queue, knlNLM, globalSize, localSize)
-        queue.finish()
-        if rType == 0:
-            af.device.unlock_array(f)
-    else:
-        mod = cp.RawModule(code=lines, options=bOpt)
-        knlNLM = mod.get_function('NLM')
-        if rType == 2:
-            imD = cp.asarray(im)
-            f = torch.zeros(Nx * Ny * Nz, dtype=torch.float32, device='cuda')
-            fD = cp.asarray(f)
-            if useRef:
-                RefimD = cp.asarray(refIm)
-        else:
-            f = cp.zeros(Nx * Ny * Nz, dtype=cp.float32)
-        d_gaussian = cp.asarray(gaussK)
-        chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-        array = cp.cuda.texture.CUDAarray(chl, Nx, Ny, Nz)
-        if useRef:
-            arrayRef = cp.cuda.texture.CUDAarray(chl, Nx, Ny, Nz)
-        if rType == 2:
-            array.copy_from(imD.reshape((Nz, Ny, Nx)))
-            if useRef:
-                arrayRef.copy_from(RefimD.reshape((Nz, Ny, Nx)))
-        else:
-            array.copy_from(im.reshape((Nz, Ny, Nx)))
-            if useRef:
-                arrayRef.copy_from(refIm.reshape((Nz, Ny, Nx)))
-        res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-        tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeBorder, cp.cuda.runtime.cudaAddressModeBorder,cp.cuda.runtime.cudaAddressModeBorder), 
-                                                filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
-        d_im = cp.cuda.texture.TextureObject(res, tdes)
-        if useRef:
-            resRef = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=arrayRef)
-            d_refIm = cp.cuda.texture.TextureObject(resRef, tdes)
-        if rType == 2:
-            kIndLoc = (fD,)
-        else:
-            kIndLoc = (f,)
-        kIndLoc += (d_im,)
-        kIndLoc += (d_gaussian,)
-        # kIndLoc += (cp.array([cp.int32(Nx), cp.int32(Ny), cp.int32(Nz)], dtype=cp.int32),)
-        # kIndLoc += (cp.array([cp.int32(Nx), cp.int32(Ny), cp.int32(Nz)], dtype=cp.int32),)
-        kIndLoc += (cp.int32(Nx),)
-        kIndLoc += (cp.int32(Ny),)
-        kIndLoc += (cp.int32(Nz),)
-        kIndLoc += (cp.int32(Nx),)
-        kIndLoc += (cp.int32(Ny),)
-        kIndLoc += (cp.int32(Nz),)
-        kIndLoc += (cp.float32(h),)
-        kIndLoc += (cp.float32(epps),)
-        kIndLoc += (cp.float32(beta),)
-        if NLType >= 3:
-            kIndLoc += (cp.float32(gamma),)
-        if NLType == 6:
-            kIndLoc += (cp.float32(GGMRFpqc[0]),)
-            kIndLoc += (cp.float32(GGMRFpqc[1]),)
-            kIndLoc += (cp.float32(GGMRFpqc[2]),)
-        if useAdaptive:
-            kIndLoc += (cp.float32(adaptiveConstant),)
-        if useRef:
-            kIndLoc += (d_refIm,)
-        knlNLM((globalSize[0] // localSize[0], globalSize[1] // localSize[1], globalSize[2]), (localSize[0], localSize[1], 1), kIndLoc)
-        if rType == 2:
-            torch.cuda.synchronize()
-    return f
+    if type(im) != type(refIm):
+        refIm = None
+    return PriorOperator('NLReg', Nx, Ny, Nz, rType, clctx, queue, nThreads, False, h=h, beta=beta, SW=SW, PW=PW, NLType=NLType, STD=STD, gamma=gamma, phi=phi, 
+                         useAdaptive=useAdaptive, adaptiveConstant=adaptiveConstant, GGMRFpqc=GGMRFpqc, refIm=refIm)(im)
 
-def TV(im, Nx, Ny, Nz, beta, sValue = 1e-4, rType = 0, clctx = -1, queue = -1, Lange = False, sigma = 10.):
+def TV(im, Nx, Ny, Nz, beta, sValue = 1e-4, rType = 0, clctx = -1, queue = -1, Lange = False, sigma = 10., nThreads = None):
     """
     Total variation prior
     This is a standalone function for computing total variation prior. This is the
     gradient version of the prior and is thus not differentiable without additional
     "smoothing" parameter.
-    Supports ArrayFire arrays, PyOpenCL arrays, CuPy arrays or PyTorch tensors
-    as the input. Use rType to specify the input type.
+    Supports ArrayFire arrays, PyOpenCL arrays, CuPy arrays, PyTorch tensors
+    or NumPy arrays as the input. Use rType to specify the input type.
     
     Args:
         im: The image where the regularization should be applied. This should be a 
@@ -459,12 +473,15 @@ def TV(im, Nx, Ny, Nz, beta, sValue = 1e-4, rType = 0, clctx = -1, queue = -1, L
         1e-4. Scalar float.
         
         rType: Reconstruction type. 0 = ArrayFire (OpenCL), 1 = CuPy, 2 = PyTorch, 
-        3 = PyOpenCL. Default is 0.
+        3 = PyOpenCL, 4 = NumPy (CPU). Default is 0.
         
         clctx: Only used by PyOpenCL, omit otherwise. The PyOpenCL context value.
         
         queue: Only used by PyOpenCL, omit otherwise. The PyOpenCL command queue value.
         
+        nThreads: Only used by NumPy, omit otherwise. The number of threads used.
+        Default (None) uses all the CPUs.
+        
         Lange: If True, computes the Lange prior instead of TV. Default is False.
         
         sigma: Adjustable parameter for the Lange prior. Scalar float. Default value
@@ -473,139 +490,4 @@ def TV(im, Nx, Ny, Nz, beta, sValue = 1e-4, rType = 0, clctx = -1, queue = -1, L
     Returns:
         f: The gradient of the TV prior. Vector of the same type as the input im.
     """
-    if rType == 0:
-        import pyopencl as cl
-        import arrayfire as af
-    elif rType == 1:
-        import cupy as cp
-    elif rType == 2:
-        import cupy as cp
-        import torch
-    elif rType == 3:
-        import pyopencl as cl
-    import os
-    import numpy as np
-    
-    if type(Nx) == np.ndarray:
-        Nx = Nx.item()
-    if type(Ny) == np.ndarray:
-        Ny = Ny.item()
-    if type(Nz) == np.ndarray:
-        Nz = Nz.item()
-        
-    if rType == 0:
-        ctx = af.opencl.get_context(retain=True)
-        clctx = cl.Context.from_int_ptr(ctx)
-        q = af.opencl.get_queue(True)
-        queue = cl.CommandQueue.from_int_ptr(q)
-        bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
-    elif rType == 1 or rType == 2:
-        bOpt = ('-DCUDA', '-DPYTHON',)
-    elif rType == 3:
-        bOpt = ('-cl-single-precision-constant', '-DOPENCL', '-DCAST=float',)
-    
-    bOpt += ('-DTVGRAD', '-DUSEIMAGES', '-DLOCAL_SIZE=16', '-DLOCAL_SIZE2=16',)
-    
-    if Lange:
-        bOpt += ('-DSATV',)
-    
-    localSize = (16, 16, 1)
-    apu = [Nx % localSize[0], Ny % localSize[1], 0]
-    erotus = [0] * 2
-    if apu[0] > 0:
-        erotus[0] = localSize[0] - apu[0]
-    if apu[1] > 0:
-        erotus[1] = localSize[1] - apu[1]
-    
-    globalSize = [None] * 3
-    globalSize[0] = Nx + erotus[0]
-    globalSize[1] = Ny + erotus[1]
-    globalSize[2] = Nz
-    
-    headerDir = os.path.abspath(os.path.join(os.path.dirname( __file__ ), '..', '..', '..', 'opencl')) + "/"
-    with open(headerDir + 'general_opencl_functions.h', encoding="utf8") as f:
-        hlines = f.read()
-    with open(headerDir + 'auxKernels.cl', encoding="utf8") as f:
-        lines = f.read()
-    lines = hlines + lines
-    if rType == 0 or rType == 3:
-        queue.finish()
-        d_Nxyz = cl.cltypes.make_int3(Nx, Ny, Nz)
-        prg = cl.Program(clctx, lines).build(bOpt)
-        knlTV = prg.TVKernel
-        if rType == 0:
-            imPtr = im.raw_ptr()
-            imD = cl.MemoryObject.from_int_ptr(imPtr)
-            f = af.data.constant(0, Nx * Ny * Nz, dtype=af.Dtype.f32)
-            fPtr = f.raw_ptr()
-            fD = cl.MemoryObject.from_int_ptr(fPtr)
-        else:
-            f = cl.array.zeros(queue, Nx * Ny * Nz, dtype=cl.cltypes.float)
-        imformat = cl.ImageFormat(cl.channel_order.A, cl.channel_type.FLOAT)
-        mf = cl.mem_flags
-        d_im = cl.Image(clctx, mf.READ_ONLY, imformat, shape=(Nx, Ny, Nz))
-        if rType == 0:
-            cl.enqueue_copy(queue, d_im, imD, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-            af.device.unlock_array(im)
-        else:
-            cl.enqueue_copy(queue, d_im, im.data, offset=(0), origin=(0,0,0), region=(Nx, Ny, Nz))
-        kIndLoc = 0
-        if rType == 0:
-            knlTV.set_arg(kIndLoc, fD)
-        else:
-            knlTV.set_arg(kIndLoc, f.data)
-        kIndLoc += 1
-        knlTV.set_arg(kIndLoc, d_im)
-        kIndLoc += 1
-        knlTV.set_arg(kIndLoc, d_Nxyz)
-        kIndLoc += 1
-        knlTV.set_arg(kIndLoc, d_Nxyz)
-        kIndLoc += 1
-        knlTV.set_arg(kIndLoc, (cl.cltypes.float)(sigma))
-        kIndLoc += 1
-        knlTV.set_arg(kIndLoc, (cl.cltypes.float)(sValue))
-        kIndLoc += 1
-        knlTV.set_arg(kIndLoc, (cl.cltypes.float)(beta))
-        cl.enqueue_nd_range_kernel(queue, knlTV, globalSize, localSize)
-        queue.finish()
-        if rType == 0:
-            af.device.unlock_array(f)
-    else:
-        mod = cp.RawModule(code=lines, options=bOpt)
-        knlTV = mod.get_function('TVKernel')
-        if rType == 2:
-            imD = cp.asarray(im)
-            f = torch.zeros(Nx * Ny * Nz, dtype=torch.float32, device='cuda')
-            fD = cp.asarray(f)
-        else:
-            f = cp.zeros(Nx * Ny * Nz, dtype=cp.float32)
-        chl = cp.cuda.texture.ChannelFormatDescriptor(32,0,0,0, cp.cuda.runtime.cudaChannelFormatKindFloat)
-        array = cp.cuda.texture.CUDAarray(chl, Nx, Ny, Nz)
-        if rType == 2:
-            array.copy_from(imD.reshape((Nz, Ny, Nx)))
-        else:
-            array.copy_from(im.reshape((Nz, Ny, Nx)))
-        res = cp.cuda.texture.ResourceDescriptor(cp.cuda.runtime.cudaResourceTypeArray, cuArr=array)
-        tdes= cp.cuda.texture.TextureDescriptor(addressModes=(cp.cuda.runtime.cudaAddressModeBorder, cp.cuda.runtime.cudaAddressModeBorder,cp.cuda.runtime.cudaAddressModeBorder), 
-                                                filterMode=cp.cuda.runtime.cudaFilterModePoint, normalizedCoords=0)
-        d_im = cp.cuda.texture.TextureObject(res, tdes)
-        if rType == 2:
-            kIndLoc = (fD,)
-        else:
-            kIndLoc = (f,)
-        kIndLoc += (d_im,)
-        # kIndLoc += (cp.array([cp.int32(Nx), cp.int32(Ny), cp.int32(Nz)], dtype=cp.int32),)
-        # kIndLoc += (cp.array([cp.int32(Nx), cp.int32(Ny), cp.int32(Nz)], dtype=cp.int32),)
-        kIndLoc += (cp.int32(Nx),)
-        kIndLoc += (cp.int32(Ny),)
-        kIndLoc += (cp.int32(Nz),)
-        kIndLoc += (cp.int32(Nx),)
-        kIndLoc += (cp.int32(Ny),)
-        kIndLoc += (cp.int32(Nz),)
-        kIndLoc += (cp.float32(sigma),)
-        kIndLoc += (cp.float32(sValue),)
-        kIndLoc += (cp.float32(beta),)
-        knlTV((globalSize[0] // localSize[0], globalSize[1] // localSize[1], globalSize[2]), (localSize[0], localSize[1], 1), kIndLoc)
-        if rType == 2:
-            torch.cuda.synchronize()
-    return f
\ No newline at end of file
+    return PriorOperator('TV', Nx, Ny, Nz, rType, clctx, queue, nThreads, False, beta=beta, sValue=sValue, Lange=Lange, sigma=sigma)(im)
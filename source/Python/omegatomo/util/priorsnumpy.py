@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 14:02:11 2026
+
+Pure NumPy (CPU) versions of the standalone priors RDP, NLReg and TV of
+omegatomo.util.priors (rType = 4). These compute the same gradients as the
+RDPKernel, NLM and TVKernel kernels of auxKernels.cl. The neighborhoods are
+formed from an edge-padded copy of the image, i.e. the voxels outside the
+image have the value of the closest edge voxel, same as with the OpenCL image
+reads (CLK_ADDRESS_CLAMP_TO_EDGE). The image is divided into slabs in the
+z-direction and the slabs are computed in parallel threads.
+"""
+
+import numpy as np
+
+
+def _dims(Nx, Ny, Nz):
+    # The image dimensions as Python ints
+    return tuple(int(np.asarray(N).item()) for N in (Nx, Ny, Nz))
+
+def _volume(im, Nx, Ny, Nz):
+    # Column-major vector to a (Nz, Ny, Nx) float32 volume
+    return np.reshape(np.asarray(im, dtype=np.float32), (Nz, Ny, Nx))
+
+def _slabs(func, Nz, nThreads = None):
+    """
+    Calls func(z0, z1) for the z-slabs of the image, in parallel if more than
+    one thread is available. nThreads = None uses all the CPUs.
+    """
+    import os
+    if nThreads is None or nThreads <= 0:
+        nThreads = os.cpu_count() or 1
+    nSlabs = min(int(nThreads), Nz)
+    rajat = np.linspace(0, Nz, nSlabs + 1).astype(np.int64)
+    if nSlabs <= 1:
+        func(0, Nz)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=nSlabs) as executor:
+            list(executor.map(lambda ii : func(rajat[ii], rajat[ii + 1]), range(nSlabs)))
+
+class _Shifter:
+    """
+    Edge-padded image with the padding r = (rz, ry, rx). Returns the
+    neighboring voxels, offset by (dz, dy, dx), of the z-slab z0...z1-1 of the
+    original image, optionally extended by e = (ez, ey, ex) voxels to each
+    side.
+    """
+    def __init__(self, u, r):
+        self.r = r
+        self.N = u.shape
+        self.up = np.pad(u, ((r[0], r[0]), (r[1], r[1]), (r[2], r[2])), mode='edge')
+
+    def __call__(self, dz, dy, dx, z0, z1, e = (0, 0, 0)):
+        r = self.r
+        return self.up[r[0] + dz + z0 - e[0] : r[0] + dz + z1 + e[0], r[1] + dy - e[1] : r[1] + dy + self.N[1] + e[1],
+                       r[2] + dx - e[2] : r[2] + dx + self.N[2] + e[2]]
+
+def RDPNumPy(im, Nx, Ny, Nz, gamma, beta, nThreads = None):
+    """
+    Relative difference prior (6-neighborhood) gradient, same as RDPKernel.
+    """
+    Nx, Ny, Nz = _dims(Nx, Ny, Nz)
+    u = _volume(im, Nx, Ny, Nz)
+    sh = _Shifter(u, (1, 1, 1))
+    gamma = np.float32(gamma)
+    epps = np.float32(1e-8)
+    epps2 = epps * epps
+    grad = np.empty_like(u)
+    def laske(z0, z1):
+        uj = u[z0 : z1]
+        output = [None, None]
+        # Positive (x) and negative (y) neighbors are summed separately, as
+        # the float2 components of the kernel
+        for ii, s in enumerate((1, -1)):
+            for dz, dy, dx in ((0, 0, s), (0, s, 0), (s, 0, 0)):
+                uk = sh(dz, dy, dx, z0, z1)
+                delta = uj - uk
+                aDelta = gamma * np.abs(delta)
+                divPow = uj + uk + aDelta
+                apu = delta * (aDelta + uj + np.float32(3.) * uk + epps2) / (divPow * divPow + epps)
+                output[ii] = apu if output[ii] is None else output[ii] + apu
+            output[ii][np.isnan(output[ii])] = 0.
+        grad[z0 : z1] = np.float32(beta) * (output[0] + output[1])
+    _slabs(laske, Nz, nThreads)
+    return grad.ravel()
+
+def TVNumPy(im, Nx, Ny, Nz, beta, sValue = 1e-4, Lange = False, sigma = 10., nThreads = None):
+    """
+    TV (or modified Lange, if Lange = True) gradient, same as TVKernel.
+    """
+    Nx, Ny, Nz = _dims(Nx, Ny, Nz)
+    u = _volume(im, Nx, Ny, Nz)
+    sh = _Shifter(u, (1, 1, 1))
+    epps = np.float32(sValue)
+    sigma = np.float32(sigma)
+    grad = np.empty_like(u)
+    def laske(z0, z1):
+        uijk = u[z0 : z1]
+        if Lange:
+            output = [None, None]
+            for ii, s in enumerate((1, -1)):
+                for dz, dy, dx in ((0, 0, s), (0, s, 0), (s, 0, 0)):
+                    d = uijk - sh(dz, dy, dx, z0, z1)
+                    uabs = d / (np.abs(d) + epps)
+                    apu = uabs - uabs / (np.abs(d) / sigma + np.float32(1.))
+                    output[ii] = apu if output[ii] is None else output[ii] + apu
+            grad[z0 : z1] = np.float32(beta) * (output[0] + output[1])
+            return
+        def sqrtVal(x, y, z):
+            return np.sqrt(x * x + y * y + z * z + epps)
+        Px, Py, Pz = sh(0, 0, 1, z0, z1), sh(0, 1, 0, z0, z1), sh(1, 0, 0, z0, z1)
+        Mx, My, Mz = sh(0, 0, -1, z0, z1), sh(0, -1, 0, z0, z1), sh(-1, 0, 0, z0, z1)
+        pvalijk = sqrtVal(Px - uijk, Py - uijk, Pz - uijk)
+        output = (np.float32(3.) * uijk - Px - Py - Pz) / pvalijk
+        output += (uijk - Mx) / sqrtVal(uijk - Mx, sh(0, 1, -1, z0, z1) - Mx, sh(1, 0, -1, z0, z1) - Mx)
+        output += (uijk - My) / sqrtVal(sh(0, -1, 1, z0, z1) - My, uijk - My, sh(1, -1, 0, z0, z1) - My)
+        output += (uijk - Mz) / sqrtVal(sh(-1, 0, 1, z0, z1) - Mz, sh(-1, 1, 0, z0, z1) - Mz, uijk - Mz)
+        grad[z0 : z1] = np.float32(beta) * (output + np.float32(1e-7))
+    _slabs(laske, Nz, nThreads)
+    return grad.ravel()
+
+def NLRegNumPy(im, Nx, Ny, Nz, h, beta, SW = (1, 1, 1), PW = (1, 1, 1), NLType = 0, STD = 1., gamma = 10., phi = 10., useAdaptive = False,
+               adaptiveConstant = 5e-6, GGMRFpqc = (2., 1.5, 0.001), refIm = None, nThreads = None):
+    """
+    Non-local regularization gradient, same as the NLM kernel. The Gaussian
+    patch weights are separable, so the weighted patch distances are computed
+    with three 1D weighted sums per search window offset.
+    """
+    Nx, Ny, Nz = _dims(Nx, Ny, Nz)
+    u = _volume(im, Nx, Ny, Nz)
+    # Padding needed for the search window + patch window
+    r = (SW[2] + PW[2], SW[1] + PW[1], SW[0] + PW[0])
+    e = (PW[2], PW[1], PW[0])
+    sh = _Shifter(u, r)
+    if refIm is not None:
+        shRef = _Shifter(_volume(refIm, Nx, Ny, Nz), r)
+    else:
+        shRef = sh
+    h = np.float32(h)
+    epps = np.float32(1e-8)
+    if NLType == 4 or NLType == 5:
+        gamma = phi
+    gamma = np.float32(gamma)
+    p, q, c = (np.float32(apu) for apu in GGMRFpqc)
+    cpq = np.float32(c ** (p - q))
+    s = np.float32(adaptiveConstant)
+    pSize = np.float32((PW[0] * 2 + 1) * (PW[1] * 2 + 1) * (PW[2] * 2 + 1))
+    # 1D Gaussian weights for x, y and z (the kernel uses their product)
+    g = [np.exp(-(np.arange(-PW[ii], PW[ii] + 1, dtype=np.float32) ** 2) / np.float32(2. * STD**2)).astype(np.float32) for ii in range(3)]
+    grad = np.empty_like(u)
+    def patchSum(D, z1):
+        # Gaussian weighted sum over the patch window, D is extended by e
+        for axis, ww, n in ((2, g[0], Nx), (1, g[1], Ny), (0, g[2], z1)):
+            apu = None
+            for ii in range(ww.size):
+                osa = [slice(None)] * 3
+                osa[axis] = slice(ii, ii + n)
+                osa = D[tuple(osa)] * ww[ii]
+                apu = osa if apu is None else apu + osa
+            D = apu
+        return D
+    def laske(z0, z1):
+        uj = u[z0 : z1]
+        Pj = shRef(0, 0, 0, z0, z1, e)
+        weight_sum = np.full(uj.shape, epps, dtype=np.float32)
+        output = np.zeros(uj.shape, dtype=np.float32)
+        if NLType == 1:
+            outputAla = np.full(uj.shape, epps, dtype=np.float32)
+        for k in range(-SW[2], SW[2] + 1):
+            for j in range(-SW[1], SW[1] + 1):
+                for i in range(-SW[0], SW[0] + 1):
+                    if i == 0 and j == 0 and k == 0:
+                        continue
+                    PP = Pj - shRef(k, j, i, z0, z1, e)
+                    distance = patchSum(PP * PP, z1 - z0)
+                    if useAdaptive:
+                        hh = distance / pSize
+                        weight = np.exp(-distance / (hh * h + s))
+                    else:
+                        weight = np.exp(-distance / h)
+                    weight_sum += weight
+                    uk = sh(k, j, i, z0, z1)
+                    if NLType == 2 or NLType == 5:
+                        output += weight * uk
+                    elif NLType == 0:
+                        output += weight * (uj - uk)
+                    elif NLType == 3:
+                        apu = uj - uk
+                        divPow = uj + uk + gamma * np.abs(apu) + epps
+                        output += weight * apu * (gamma * np.abs(apu) + uj + np.float32(3.) * uk + epps * epps) / (divPow * divPow)
+                    elif NLType == 4:
+                        uabs = np.sign(uj - uk)
+                        output += weight * (uabs - uabs / (np.abs(uj - uk) / gamma + np.float32(1.)))
+                    elif NLType == 6:
+                        delta = uj - uk
+                        dcpq = np.abs(delta / c) ** (p - q)
+                        deltapqc = np.float32(1.) + dcpq
+                        output += weight * (np.abs(delta) ** (p - np.float32(1.)) / deltapqc) * (p - gamma * ((dcpq * cpq) / deltapqc)) * np.sign(delta)
+                    elif NLType == 7:
+                        apu = uk - uj
+                        apu2 = apu * apu + gamma * gamma
+                        output += (np.float32(2.) * apu * apu * apu) / (apu2 * apu2) - np.float32(2.) * (apu / apu2)
+                    else:
+                        apu = uj - uk
+                        output += weight * apu
+                        outputAla += weight * apu * apu
+        weight_sum = np.float32(1.) / weight_sum
+        output *= weight_sum
+        if NLType == 2:
+            output = uj - output
+        elif NLType == 5:
+            output = uj - output
+            uabs = np.sign(output)
+            output = uabs - uabs / (np.abs(output) / gamma + np.float32(1.))
+        elif NLType == 1:
+            output /= np.sqrt(outputAla * weight_sum + epps)
+        grad[z0 : z1] = np.float32(beta) * output
+    _slabs(laske, Nz, nThreads)
+    return grad.ravel()
@@ -19,19 +19,11 @@ def increaseSampling(options, x=None, y=None, interpolate_sinogram=False):
     yy1 = y[:, 0].reshape((options.Ndist, options.Nang), order='F')
     yy2 = y[:, 1].reshape((options.Ndist, options.Nang), order='F')
 
-    x_vals = np.arange(1, options.Nang + 1)
-    y_vals = np.arange(1, options.Ndist * options.sampling + 1, options.sampling)
-    points = (y_vals, x_vals)
-    
-    yq_vals = np.arange(1, options.Ndist * options.sampling + 1)
-    xq_vals = np.arange(1, options.Nang + 1)
-    Yq, Xq = np.meshgrid(yq_vals, xq_vals, indexing='ij')
-    query_points = np.stack([Yq.ravel(), Xq.ravel()], axis=-1)
-    
     # Interpolation
     def interp_surface(data):
-        from scipy.interpolate import interpn
-        return np.asfortranarray((interpn(points, data.astype(np.float64), query_points, method=options.sampling_interpolation_method, bounds_error=False).reshape(Yq.shape)))
+        out = np.empty((options.Ndist * options.sampling, options.Nang), dtype=np.float64, order='F')
+        radialInterpolation(data.astype(np.float64), options.sampling, options.sampling_interpolation_method, out, options.Nang)
+        return out
     
     x1 = interp_surface(xx1)
     x2 = interp_surface(xx2)
@@ -55,39 +47,70 @@ def increaseSampling(options, x=None, y=None, interpolate_sinogram=False):
     return x, y, options
 
 
-def interpolateSinog(SinM, sampling, Ndist, Nang, sampling_interpolation_method):
-    from scipy.interpolate import interpn
+def radialInterpolation(A, sampling, method, out, nCols):
+    """
+    Interpolates the columns of the 2D array A (radial x other dimensions)
+    into out, which has sampling times more rows. The original samples are
+    at rows 0, sampling, 2 * sampling, ... of out. The rows after the last
+    original sample are outside the grid and set to NaN. method is any
+    method of scipy.interpolate.interpn. 'linear' and 'nearest' are computed
+    directly, the other methods with interpn for each 2D array of nCols
+    columns (i.e. a single Ndist x Nang sinogram).
+    """
+    Ndist = A.shape[0]
+    nValid = (Ndist - 1) * sampling + 1
+    if method != 'nearest' and method != 'linear':
+        from scipy.interpolate import interpn
+        points = (np.arange(0, nValid, sampling), np.arange(nCols))
+        Yq, Xq = np.meshgrid(np.arange(out.shape[0]), np.arange(nCols), indexing='ij')
+        query_points = np.column_stack((Yq.ravel('F'), Xq.ravel('F')))
+        for alku in range(0, A.shape[1], nCols):
+            out[:, alku : alku + nCols] = interpn(points, A[:, alku : alku + nCols].astype(np.float64), query_points, method=method, bounds_error=False).reshape((out.shape[0], nCols), order='F')
+        return
+    q = np.arange(nValid)
+    i0 = q // sampling
+    t = (q - i0 * sampling) / sampling
+    if method == 'nearest':
+        # Ties are rounded down, as in interpn
+        out[:nValid, :] = A[np.minimum(i0 + (t > 0.5), Ndist - 1), :]
+    else:
+        # Computed in double precision (as interpn), i.e. the float32
+        # output is the same as with interpn
+        i1 = np.minimum(i0 + 1, Ndist - 1)
+        t = t.reshape(-1, 1)
+        out[:nValid, :] = A[i0, :] * (1. - t) + A[i1, :] * t
+    out[nValid:, :] = np.nan
+
+def interpolateSinog(SinM, sampling, Ndist, Nang, sampling_interpolation_method, nThreads = None):
+    """
+    Increases the radial sampling of the (Ndist x Nang x NSinos x Nt)
+    sinogram(s) SinM by sampling. The interpolation is computed in float64
+    and stored in a float32 output, split into chunks of sinograms that are
+    interpolated in parallel with nThreads threads (default is the number of
+    CPUs). Returns the interpolated sinograms as a float32 Fortran-ordered
+    vector.
+    """
     if SinM.ndim == 1 or SinM.shape[2] == 1:
         SinM = np.reshape(SinM, (Ndist, Nang, -1), order='F')
     if SinM.ndim == 3:
         SinM = np.reshape(SinM, (SinM.shape[0], SinM.shape[1], SinM.shape[2], 1), order='F')
     
-    y = np.arange(1, Ndist * sampling + 1, sampling)
-    x = np.arange(1, Nang + 1)
-    grid = (np.asfortranarray(y), np.asfortranarray(x))
-
-    yq = np.arange(1, Ndist * sampling + 1)
-    xq = np.arange(1, Nang + 1)
-    Xq, Yq = np.meshgrid(xq, yq, indexing='xy')
-    Xq = Xq.T
-    Yq = Yq.T
-    query_points = np.asfortranarray(np.column_stack((Yq.ravel(), Xq.ravel())))
+    # All the sinograms as columns, the interpolation is only along the radial dimension
+    A = np.reshape(SinM, (SinM.shape[0], -1), order='F')
+    SinM_uus = np.empty((SinM.shape[0] * sampling, A.shape[1]), dtype=np.float32, order='F')
     
-    SinM_uus = np.zeros((SinM.shape[0] * sampling, Nang, SinM.shape[2], SinM.shape[3]), dtype=np.float32, order='F')
-
-    for uu in range(SinM.shape[3]):
-        for kk in range(SinM.shape[2]):
-            sinogram_slice = SinM[:, :, kk, uu].astype(np.float64)
-
-            interpolated = interpn(
-                grid,
-                sinogram_slice,
-                query_points,
-                method=sampling_interpolation_method,
-                bounds_error=False
-            )
-            interpolated = interpolated.reshape(Ndist * sampling, Nang, order='F')
-
-            SinM_uus[:, :, kk, uu] = np.asfortranarray(interpolated)
-
-    return SinM_uus.astype(np.float32).ravel('F')
\ No newline at end of file
+    # 16 sinograms per chunk
+    chunk = SinM.shape[1] * 16
+    alut = range(0, A.shape[1], chunk)
+    def interp(alku):
+        radialInterpolation(A[:, alku : alku + chunk], sampling, sampling_interpolation_method, SinM_uus[:, alku : alku + chunk], SinM.shape[1])
+    if nThreads == 1 or len(alut) == 1:
+        for alku in alut:
+            interp(alku)
+    else:
+        import os
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=nThreads if nThreads is not None else (os.cpu_count() or 1)) as executor:
+            list(executor.map(interp, alut))
+
+    return SinM_uus.ravel('F')
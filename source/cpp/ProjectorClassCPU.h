@@ -28,6 +28,8 @@ class ProjectorClass {
 
 public:
 	uint8_t no_norm = 0;
+	// Number of threads, 0 uses all
+	uint32_t nCores = 0;
 	float* d_x, * d_z, * input, * output, * SensIm = nullptr, *d_norm = nullptr, *d_atten = nullptr, * extraCor = nullptr;
 	uint16_t* detIndices = nullptr, *zIndex = nullptr;
 	uint32_t* xyIndex = nullptr;
@@ -84,6 +86,8 @@ public:
 		param.nProjections = inputScalars.nProjections;
 		param.useMaskBP = inputScalars.maskBP;
 		param.useMaskFP = inputScalars.maskFP;
+		param.BPAccumulation = inputScalars.BPAccumulation;
+		nCores = inputScalars.CPUThreads;
 		if (param.useMaskFP)
 			param.maskFP = w_vec.maskFP;
 		if (param.useMaskBP)
@@ -98,6 +102,12 @@ public:
 		return 0;
 	}
 
+	// Changes the backprojection accumulation (see paramStruct) and the number of threads of an existing projector
+	inline void setCPUOptions(const uint32_t BPAccumulation, const uint32_t threads) {
+		param.BPAccumulation = BPAccumulation;
+		nCores = threads;
+	}
+
 	inline int createBuffers(scalarStruct& inputScalars, Weighting& w_vec, const float* x, const float* z_det, const uint32_t* xy_index,
 		const uint16_t* z_index, const uint16_t* L, const int64_t* pituus, const float* atten, const float* norm, const float* extraCorr,
 		const std::vector<int64_t>& length, const RecMethods& MethodList, const int type = 0) {
@@ -168,7 +178,7 @@ public:
 		param.computeSensIm = false;
 		param.projType = inputScalars.FPType;
 
-		projectorType123Implementation4<float>(param, length[osa_iter] * vecSize, d_output, d_x, d_z, vec_opencl.d_im_os, inputScalars.CT, inputScalars.SPECT, 1, SensIm, detIndices);
+		projectorType123Implementation4<float>(param, length[osa_iter] * vecSize, d_output, d_x, d_z, vec_opencl.d_im_os, inputScalars.CT, inputScalars.SPECT, 1, SensIm, detIndices, nCores);
 
 		if (inputScalars.verbose >= 3 || DEBUG)
 			mexPrint("Forward projection completed");
@@ -230,7 +240,7 @@ public:
 		param.currentSubset = osa_iter;
 		param.nMeas = length[osa_iter];
 
-		projectorType123Implementation4<float>(param, nMeas, vec_opencl.d_rhs_os[ii], d_x, d_z, d_output, inputScalars.CT, inputScalars.SPECT, 2, d_Summ[uu], detIndices);
+		projectorType123Implementation4<float>(param, nMeas, vec_opencl.d_rhs_os[ii], d_x, d_z, d_output, inputScalars.CT, inputScalars.SPECT, 2, d_Summ[uu], detIndices, nCores);
 		return 0;
 	}
 
@@ -110,6 +110,10 @@ struct inputStruct {
     // Compute the spatial prior/regularization only every regEveryIter-th (sub)iteration (optional).
     // 1 (or less) computes it every time (original behavior); the first and last are always computed.
     int32_t regEveryIter = 1;
+    // Accumulation of the CPU backprojection (optional). 0 uses atomic operations, 1 per-thread images.
+    uint32_t BPAccumulation = 0;
+    // Number of threads used by the CPU projector (optional), 0 uses all
+    uint32_t CPUThreads = 0;
     // Number of iterations with anisotropic diffusion smoothing (optional)
     uint32_t NiterAD = 1;
     // The index for the center voxel for some priors, such as quadratic (optional)
@@ -915,6 +919,9 @@ void copyStruct(inputStruct& options, structForScalars& inputScalars, Weighting&
     inputScalars.localSize[2] = options.localSizeZ;
     // Optional: compute the spatial prior only every regEveryIter-th (sub)iteration (1 = every time).
     inputScalars.regEveryIter = options.regEveryIter;
+    // Optional: accumulation of the CPU backprojection (0 = atomic operations, 1 = per-thread images).
+    inputScalars.BPAccumulation = options.BPAccumulation;
+    inputScalars.CPUThreads = options.CPUThreads;
 
     inputScalars.Nxy = inputScalars.Nx[0] * inputScalars.Ny[0];
     inputScalars.im_dim[0] = static_cast<int64_t>(inputScalars.Nxy) * static_cast<int64_t>(inputScalars.Nz[0]);
@@ -1470,4 +1477,13 @@ int omegaMain(inputStruct options, const char* header_directory, const uint16_t
 int omegaMain(inputStruct options, const char* header_directory, const uint8_t* Sino, float* outputPtr, float* FPptr = nullptr, float* residual = nullptr);
 #else
 int omegaMain(inputStruct options, const char* header_directory, const float* Sino, float* outputPtr, float* FPptr = nullptr, float* residual = nullptr);
-#endif
\ No newline at end of file
+#endif
+
+#ifdef CPU
+// Per-call CPU projector, see omega_maincpp.cpp
+extern "C" DLL_FUNCTION void* omegaCPUProjectorCreate(inputStruct options);
+extern "C" DLL_FUNCTION int omegaCPUForwardProject(void* projector, const float* input, float* output, const uint32_t subset, const uint32_t timestep, const uint32_t ii);
+extern "C" DLL_FUNCTION int omegaCPUBackwardProject(void* projector, const float* input, float* output, const uint32_t subset, const uint32_t timestep, const uint32_t ii);
+extern "C" DLL_FUNCTION int omegaCPUProjectorSettings(void* projector, const uint32_t BPAccumulation, const uint32_t nThreads);
+extern "C" DLL_FUNCTION void omegaCPUProjectorFree(void* projector);
+#endif
@@ -170,6 +170,11 @@ inline void loadInput(scalarStruct& inputScalars, const mxArray* options, const
 	// Optional: compute the spatial prior only every regEveryIter-th (sub)iteration (1 = every time).
 	if (mxGetFieldNumber(options, "regEveryIter") >= 0)
 		inputScalars.regEveryIter = getScalarInt32(options, 0, "regEveryIter");
+	// Optional: accumulation of the CPU backprojection (0 = atomic operations, 1 = per-thread images).
+	if (mxGetFieldNumber(options, "BPAccumulation") >= 0)
+		inputScalars.BPAccumulation = getScalarUInt32(options, 0, "BPAccumulation");
+	if (mxGetFieldNumber(options, "CPUThreads") >= 0)
+		inputScalars.CPUThreads = getScalarUInt32(options, 0, "CPUThreads");
 	const uint32_t* devPointer = getUint32s(options, "use_device");
 	size_t devLength = mxGetNumberOfElements(mxGetField(options, 0, "use_device"));
 	inputScalars.usedDevices = std::vector<uint32_t>(devPointer, devPointer + devLength);
@@ -140,4 +140,121 @@ int omegaMain(inputStruct options, const char* header_directory, const float* Si
 	fflush(stdout);
 
 	return 0;
-}
\ No newline at end of file
+}
+#ifdef CPU
+// Persistent CPU projector for the per-call forward and backward projections of projectorClass (Python)
+// All the pointers in the input struct have to stay valid for the lifetime of the projector
+struct CPUProjector {
+	scalarStruct inputScalars;
+	Weighting w_vec;
+	RecMethods MethodList;
+	ProjectorClass proj;
+	std::vector<int64_t> length;
+	std::vector<int64_t> pituus;
+};
+
+void* omegaCPUProjectorCreate(inputStruct options) {
+
+	CPUProjector* cpuProj = new CPUProjector;
+	scalarStruct& inputScalars = cpuProj->inputScalars;
+	Weighting& w_vec = cpuProj->w_vec;
+
+	copyStruct(options, inputScalars, w_vec, cpuProj->MethodList);
+
+	inputScalars.size_z = options.sizeZ;
+	inputScalars.size_of_x = options.sizeX;
+	inputScalars.size_atten = options.sizeAtten;
+	inputScalars.size_norm = options.sizeNorm;
+	inputScalars.sizeXY = options.sizeXYind;
+	inputScalars.sizeZ = options.sizeZind;
+	float* x = options.x;
+
+	size_t mDim = options.measElem / static_cast<size_t>(inputScalars.Nt);
+
+	if (inputScalars.listmode) {
+		if (inputScalars.indexBased) {
+			w_vec.trIndex = options.trIndices;
+			w_vec.axIndex = options.axIndices;
+		}
+		else {
+			w_vec.listCoord = options.x;
+			x = options.uV;
+		}
+		if (inputScalars.TOF)
+			w_vec.TOFIndices = options.TOFIndices;
+		inputScalars.kokoNonTOF = mDim;
+	}
+	else
+		inputScalars.kokoNonTOF = mDim / inputScalars.nBins;
+	inputScalars.kokoTOF = mDim;
+
+	// Number of measurements in each subset and time step
+	const size_t nSubsets = static_cast<size_t>(inputScalars.subsets) * static_cast<size_t>(inputScalars.Nt);
+	cpuProj->pituus.assign(options.pituus, options.pituus + nSubsets + 1);
+	cpuProj->length.resize(nSubsets);
+	for (size_t kk = 0; kk < nSubsets; kk++)
+		cpuProj->length[kk] = cpuProj->pituus[kk + 1] - cpuProj->pituus[kk];
+
+	inputScalars.subsetsUsed = inputScalars.subsets;
+	inputScalars.loadTOF = true;
+	inputScalars.TOFsubsets = inputScalars.subsetsUsed;
+
+	int status = cpuProj->proj.addProjector(inputScalars, w_vec, cpuProj->MethodList);
+	if (status != 0) {
+		delete cpuProj;
+		return nullptr;
+	}
+	// The sensitivity image is computed separately, if needed
+	cpuProj->proj.no_norm = 1;
+	status = cpuProj->proj.createBuffers(inputScalars, w_vec, x, options.z, options.xy_index, options.z_index, nullptr, cpuProj->pituus.data(),
+		options.atten, options.norm, options.corrVector, cpuProj->length, cpuProj->MethodList);
+	if (status != 0) {
+		delete cpuProj;
+		return nullptr;
+	}
+	if (inputScalars.verbose >= 3)
+		mexPrint("CPU projector created");
+	return static_cast<void*>(cpuProj);
+}
+
+// Forward projection of the image volume ii into the measurement vector output (subset subset, time step timestep)
+// output has to be zero-initialized and contain length[subset] * nRowsD * nColsD (or length[subset] for list-mode) elements
+int omegaCPUForwardProject(void* projector, const float* input, float* output, const uint32_t subset, const uint32_t timestep, const uint32_t ii) {
+	CPUProjector* cpuProj = static_cast<CPUProjector*>(projector);
+	if (cpuProj == nullptr || subset >= cpuProj->inputScalars.subsets || timestep >= cpuProj->inputScalars.Nt || ii > cpuProj->inputScalars.nMultiVolumes)
+		return -1;
+	const uint32_t osa_iter = subset + timestep * cpuProj->inputScalars.subsets;
+	cpuProj->proj.vec_opencl.d_im_os = const_cast<float*>(input);
+	cpuProj->proj.d_output = output;
+	return cpuProj->proj.forwardProjection(cpuProj->inputScalars, cpuProj->w_vec, osa_iter, timestep, cpuProj->length, cpuProj->pituus.data(), ii);
+}
+
+// Backprojection of the measurement vector input into the image volume ii (output)
+// output has to be zero-initialized, the backprojection is added to it
+int omegaCPUBackwardProject(void* projector, const float* input, float* output, const uint32_t subset, const uint32_t timestep, const uint32_t ii) {
+	CPUProjector* cpuProj = static_cast<CPUProjector*>(projector);
+	if (cpuProj == nullptr || subset >= cpuProj->inputScalars.subsets || timestep >= cpuProj->inputScalars.Nt || ii > cpuProj->inputScalars.nMultiVolumes)
+		return -1;
+	const uint32_t osa_iter = subset + timestep * cpuProj->inputScalars.subsets;
+	if (cpuProj->proj.vec_opencl.d_rhs_os.size() <= ii)
+		cpuProj->proj.vec_opencl.d_rhs_os.resize(ii + 1);
+	cpuProj->proj.vec_opencl.d_rhs_os[ii] = output;
+	cpuProj->proj.d_output = const_cast<float*>(input);
+	return cpuProj->proj.backwardProjection(cpuProj->inputScalars, cpuProj->w_vec, osa_iter, timestep, cpuProj->length, cpuProj->pituus.data(), false, ii);
+}
+
+// Changes the backprojection accumulation (0 = atomic operations, 1 = per-thread images) and the number of threads (0 = all)
+int omegaCPUProjectorSettings(void* projector, const uint32_t BPAccumulation, const uint32_t nThreads) {
+	CPUProjector* cpuProj = static_cast<CPUProjector*>(projector);
+	if (cpuProj == nullptr)
+		return -1;
+	cpuProj->inputScalars.BPAccumulation = BPAccumulation;
+	cpuProj->inputScalars.CPUThreads = nThreads;
+	cpuProj->proj.setCPUOptions(BPAccumulation, nThreads);
+	return 0;
+}
+
+void omegaCPUProjectorFree(void* projector) {
+	delete static_cast<CPUProjector*>(projector);
+}
+#endif
@@ -86,6 +86,11 @@ typedef struct structForScalars {
 	// of 1 (or less) computes it every time (original behavior). The first and last time are always
 	// computed. See subiterStep.h and iterStep.h.
 	int32_t regEveryIter = 1;
+	// Accumulation of the CPU backprojection. 0 uses atomic operations, 1 per-thread images that are
+	// summed after the projection (see projectorType123Implementation4).
+	uint32_t BPAccumulation = 0;
+	// Number of threads used by the CPU projector, 0 uses all
+	uint32_t CPUThreads = 0;
 	int64_t nBins = 1, nProjections = 0, numelY = 0, numelZ = 0, TOFSize = 0, seed = -1;
 	std::vector<int64_t> im_dim{ 1 };
 	size_t size_of_x, size_atten = 1, size_norm = 1, size_center_x, size_center_y, size_center_z, size_V = 1, size_scat = 1, kokoTOF = 0, kokoNonTOF = 0, sizeLOR,
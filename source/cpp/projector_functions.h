@@ -336,6 +336,9 @@ struct paramStruct {
 	bool useMaskBP = false;
 	// Backward projection mask
 	uint8_t* maskBP = nullptr;
+	// Accumulation of the backprojection, 0 uses atomic operations, 1 per-thread images that are summed after the backprojection
+	// The latter needs one (two with the sensitivity image) image of memory per thread
+	uint32_t BPAccumulation = 0;
 	// SPECT ray shifts, detector end (collimator model)
 	T* rayShiftsDetector = nullptr;
 	// SPECT ray shifts, source end (collimator model)
@@ -632,7 +635,7 @@ inline void denominator(std::vector<T>& ax, const uint32_t local_ind, T local_el
 // Compute the backprojection
 template <typename T>
 inline void rhs(const T local_ele, const std::vector<T>& ax, const uint32_t local_ind, T* output, const bool no_norm, T* sensImage, const T element,
-	const T sigma_x, T& D, const T DD, const T* TOFCenter, const T TOFSum, const bool TOF, const uint32_t nBins, const int projType) {
+	const T sigma_x, T& D, const T DD, const T* TOFCenter, const T TOFSum, const bool TOF, const uint32_t nBins, const int projType, const bool useAtomic = true) {
 	T yaxTOF = (T)0.;
 	T val = (T)0.;
 	if (TOF) {
@@ -649,11 +652,19 @@ inline void rhs(const T local_ele, const std::vector<T>& ax, const uint32_t loca
 		yaxTOF = ax[0] * local_ele;
 		val = local_ele;
 	}
+	// Per-thread images do not need atomic operations
+	if (useAtomic) {
 #pragma omp atomic
-	output[local_ind] += yaxTOF;
-	if (no_norm == false)
+		output[local_ind] += yaxTOF;
+		if (no_norm == false)
 #pragma omp atomic
-		sensImage[local_ind] += val;
+			sensImage[local_ind] += val;
+	}
+	else {
+		output[local_ind] += yaxTOF;
+		if (no_norm == false)
+			sensImage[local_ind] += val;
+	}
 }
 
 template <typename T>
@@ -1024,7 +1035,8 @@ template <typename T>
 inline bool orthogonalHelper3D(const uint32_t tempi, const int uu, const uint32_t d_N2, const uint32_t d_N3, const uint32_t d_Nxy, const int zz, const T s2, const T s1, const T sZ, const T l3, const T l1, const T l2,
 	const T diff1, const T diff2, const T diffZ, const T kerroin, const T center2, const T center1, const T centerZ, const T bmin, const T bmax, const T Vmax, T* V, const bool XY, std::vector<T>& ax, const T temp, const T* input,
 	T* d_Summ, T* d_output, const bool no_norm, const T element, const T sigma_x, T& D, const T DD, const T* TOFCenter, const T TOFSum, const bool TOF, const uint8_t fp, const int projType,
-	const uint32_t nBins, const int lor, const uint16_t nRays, const T coneOfResponseStdCoeffA, const T coneOfResponseStdCoeffB, const T coneOfResponseStdCoeffC, const T crXY, const bool useMaskBP = false, const uint8_t* maskBP = nullptr, const T attApu = (T)0.f, const bool SPECT = false, const bool attenuationCorrection = false) {
+	const uint32_t nBins, const int lor, const uint16_t nRays, const T coneOfResponseStdCoeffA, const T coneOfResponseStdCoeffB, const T coneOfResponseStdCoeffC, const T crXY, const bool useMaskBP = false, const uint8_t* maskBP = nullptr, const T attApu = (T)0.f, const bool SPECT = false, const bool attenuationCorrection = false,
+	const bool useAtomic = true) {
 	    /* Variables
         s1 = detectors.xs
         s2 = detectors.ys
@@ -1074,7 +1086,7 @@ inline bool orthogonalHelper3D(const uint32_t tempi, const int uu, const uint32_
 		if (useMaskBP)
 			maskVal = maskBP[tempi + uu * d_N3];
 		if (maskVal > 0)
-			rhs(local_ele * temp, ax, local_ind, d_output, no_norm, d_Summ, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, nBins, projType);
+			rhs(local_ele * temp, ax, local_ind, d_output, no_norm, d_Summ, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, nBins, projType, useAtomic);
 	}
 	return false;
 }
@@ -1088,7 +1100,7 @@ inline int orthDistance3D(const uint32_t tempi, const T diff1, const T diff2, co
 	const T s1, const T s2, const T sZ, const uint32_t d_Nxy, const T kerroin, const uint32_t d_N1, const uint32_t d_N2, const uint32_t d_N3, const uint32_t d_Nz, const T bmin,
 	const T bmax, const T Vmax, T* V, const bool XY, std::vector<T>& ax, const T* input, const bool no_norm, T* Summ, T* output, const T element, const T sigma_x, T& D, const T DD,
 	T* TOFCenter, const T TOFSum, const bool TOF, const uint8_t fp, const int projType, const uint32_t nBins, const int lor, const uint16_t nRays, int& k, const T coneOfResponseStdCoeffA, const T coneOfResponseStdCoeffB, const T coneOfResponseStdCoeffC, const T crXY, const bool useMaskBP = false, const uint8_t* maskBP = nullptr, 
-	const T attApu = (T)0.f, const bool SPECT = false, const bool attenuationCorrection = false, const int ku = 0, const bool preStep = false) {
+	const T attApu = (T)0.f, const bool SPECT = false, const bool attenuationCorrection = false, const int ku = 0, const bool preStep = false, const bool useAtomic = true) {
 	int uu = 0;
 	bool breikki = false;
 	// y0
@@ -1112,7 +1124,7 @@ inline int orthDistance3D(const uint32_t tempi, const T diff1, const T diff2, co
 		const T l2 = diff1 * z0;
 		for (uu1 = temp2; uu1 < maksimiXY; uu1++) {
 			breikki = orthogonalHelper3D(tempi, uu1, d_N2, d_N3, d_Nxy, zz, s2, s1, sZ, l3, l1, l2, diff2, diff1, diffZ, kerroin, center2[uu1], center1, centerZ[zz], bmin, bmax, Vmax, V,
-				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection);
+				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection, useAtomic);
 			if (breikki) {
 				break;
 			}
@@ -1120,7 +1132,7 @@ inline int orthDistance3D(const uint32_t tempi, const T diff1, const T diff2, co
 		}
 		for (uu2 = temp2 - 1; uu2 >= minimiXY; uu2--) {
 			breikki = orthogonalHelper3D(tempi, uu1, d_N2, d_N3, d_Nxy, zz, s2, s1, sZ, l3, l1, l2, diff2, diff1, diffZ, kerroin, center2[uu1], center1, centerZ[zz], bmin, bmax, Vmax, V,
-				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection);
+				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection, useAtomic);
 			if (breikki) {
 				break;
 			}
@@ -1136,7 +1148,7 @@ inline int orthDistance3D(const uint32_t tempi, const T diff1, const T diff2, co
 		const T l2 = diff1 * z0;
 		for (uu1 = temp2; uu1 < maksimiXY; uu1++) {
 			breikki = orthogonalHelper3D(tempi, uu1, d_N2, d_N3, d_Nxy, zz, s2, s1, sZ, l3, l1, l2, diff2, diff1, diffZ, kerroin, center2[uu1], center1, centerZ[zz], bmin, bmax, Vmax, V,
-				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection);
+				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection, useAtomic);
 			if (breikki) {
 				break;
 			}
@@ -1144,7 +1156,7 @@ inline int orthDistance3D(const uint32_t tempi, const T diff1, const T diff2, co
 		}
 		for (uu2 = temp2 - 1; uu2 >= minimiXY; uu2--) {
 			breikki = orthogonalHelper3D(tempi, uu1, d_N2, d_N3, d_Nxy, zz, s2, s1, sZ, l3, l1, l2, diff2, diff1, diffZ, kerroin, center2[uu1], center1, centerZ[zz], bmin, bmax, Vmax, V,
-				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection);
+				XY, ax, temp, input, Summ, output, no_norm, element, sigma_x, D, DD, TOFCenter, TOFSum, TOF, fp, projType, nBins, lor, nRays, coneOfResponseStdCoeffA, coneOfResponseStdCoeffB, coneOfResponseStdCoeffC, crXY, useMaskBP, maskBP, attApu, SPECT, attenuationCorrection, useAtomic);
 			if (breikki) {
 				break;
 			}
@@ -1337,16 +1349,41 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
 
 	uint32_t nRays = param.nRays2D * param.nRays3D;
 #ifdef _OPENMP
+	// If true, each thread backprojects into its own image(s) without atomic operations and the images are summed after
+	// all the measurements have been backprojected
+	const bool threadImages = fp == 2 && param.BPAccumulation == 1;
+	const int64_t imSize = static_cast<int64_t>(param.Nx) * static_cast<int64_t>(param.Ny) * static_cast<int64_t>(param.Nz);
+	std::vector<T*> outputThreads, sensThreads;
+	if (threadImages) {
+		outputThreads.assign(omp_get_max_threads(), nullptr);
+		sensThreads.assign(omp_get_max_threads(), nullptr);
+	}
 #pragma omp parallel
 	{
 		std::vector<T> ax(param.nBins);
+		T* outputBP = output;
+		T* sensBP = SensImage;
+		std::vector<T> apuOutput, apuSens;
+		if (threadImages) {
+			apuOutput.assign(imSize, (T)0.);
+			outputBP = apuOutput.data();
+			outputThreads[omp_get_thread_num()] = outputBP;
+			if (!param.noSensImage) {
+				apuSens.assign(imSize, (T)0.);
+				sensBP = apuSens.data();
+				sensThreads[omp_get_thread_num()] = sensBP;
+			}
+		}
 #if _OPENMP >= 201511 && defined(MATLAB)
 #pragma omp for schedule(monotonic:dynamic, nChunks)
 #else
 #pragma omp for schedule(dynamic, nChunks)
 #endif
 #else
+	const bool threadImages = false;
 	std::vector<T> ax(param.nBins);
+	T* outputBP = output;
+	T* sensBP = SensImage;
 #endif
 	for (int64_t lo = 0LL; lo < nMeas; lo++) {
 
@@ -1665,8 +1702,8 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
 							TOFSum = TOFLoop(DD, d_d2, param.TOFCenters, param.sigma_x, D, param.epps, param.nBins);
 						if (param.projType > 1) {
 							orthDistance3D(ii, y_diff, x_diff, z_diff, center1[ii], center2, param.z_center, temp, indO, localIndZ, detectors.xs, detectors.ys, detectors.zs, Nyx, kerroin, d_N1, d_N3, d_N2, param.Nz, 
-								param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, SensImage, output, d_d2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp, param.projType, 
-								param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection);
+								param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, sensBP, outputBP, d_d2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp, param.projType, 
+								param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, 0, false, !threadImages);
 						}
 						else {
 							if (fp == 1) {
@@ -1677,7 +1714,7 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
 									maskVal = param.maskBP[indO * d_N2 + ii * d_N3];
 								}
 								if (maskVal > 0)
-									rhs(temp * d_in, ax, local_ind, output, param.noSensImage, SensImage, d_in, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, param.nBins, param.projType);
+									rhs(temp * d_in, ax, local_ind, outputBP, param.noSensImage, sensBP, d_in, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, param.nBins, param.projType, !threadImages);
 							}
 						}
 						local_ind += d_N3;
@@ -1950,8 +1987,8 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
                                 if (ux >= 0) {
                                     for (int kk = tempi_a - 1; kk >= 0; kk--) {
                                         int uu = orthDistance3D(kk, y_diff, x_diff, z_diff, center1[kk], center2, param.z_center, temp, tempj_a, tempk_b, xs, ys, detectors.zs, Nyx, kerroin, d_N1, d_N2, d_N3,
-                                            param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, SensImage, output, local_ele2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
-                                            param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, uz, true);
+                                            param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, sensBP, outputBP, local_ele2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
+                                            param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, uz, true, !threadImages);
                                         if (uu == 0)
                                             break;
                                     }
@@ -1959,8 +1996,8 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
                                 else {
                                     for (int kk = tempi_a + 1; kk < d_NNx; kk++) {
                                         int uu = orthDistance3D(kk, y_diff, x_diff, z_diff, center1[kk], center2, param.z_center, temp, tempj_a, tempk_b, xs, ys, detectors.zs, Nyx, kerroin, d_N1, d_N2, d_N3,
-                                            param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, SensImage, output, local_ele2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
-                                            param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, uz, true);
+                                            param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, sensBP, outputBP, local_ele2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
+                                            param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, uz, true, !threadImages);
                                         if (uu == 0)
                                             break;
                                     }
@@ -1968,8 +2005,8 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
                             }
                             if (tz0_a >= tx0_a && ty0_a >= tx0_a) {
                                 orthDistance3D(localIndX, y_diff, x_diff, z_diff, center1[localIndX], center2, param.z_center, temp, localIndY, localIndZ, xs, ys, detectors.zs, Nyx, kerroin, d_N1, d_N2, d_N3,
-                                    param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, SensImage, output, local_ele2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
-                                    param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection);
+                                    param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, sensBP, outputBP, local_ele2, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
+                                    param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, 0, false, !threadImages);
                                 tempiOld = tempi_a;
                             }
                         }
@@ -1983,7 +2020,7 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
                                         maskVal = param.maskBP[localIndX * d_N2 + localIndY * d_N3];
                                     }
                                     if (maskVal > 0)
-                                        rhs(local_ele * temp, ax, local_ind, output, param.noSensImage, SensImage, local_ele, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, param.nBins, param.projType);
+                                        rhs(local_ele * temp, ax, local_ind, outputBP, param.noSensImage, sensBP, local_ele, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, param.nBins, param.projType, !threadImages);
                                 }
                             }
                         }
@@ -2005,8 +2042,8 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
 								tempi_a++;
                             for (int ii = tempi_a - 1; ii >= 0; ii--) {
                                 int uu = orthDistance3D(ii, y_diff, x_diff, z_diff, center1[ii], center2, param.z_center, temp, tempj_a, tempk_a, xs, ys, detectors.zs, Nyx, kerroin, d_N1, d_N2, d_N3,
-                                    param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, SensImage, output, local_ele, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
-                                    param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection);
+                                    param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, sensBP, outputBP, local_ele, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
+                                    param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, 0, false, !threadImages);
                                 if (uu == 0)
                                     break;
                             }
@@ -2016,8 +2053,8 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
 								tempi_a--;
                             for (int ii = tempi_a + 1; ii < d_NNx; ii++) {
                                 int uu = orthDistance3D(ii, y_diff, x_diff, z_diff, center1[ii], center2, param.z_center, temp, tempj_a, tempk_a, xs, ys, detectors.zs, Nyx, kerroin, d_N1, d_N2, d_N3,
-                                    param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, SensImage, output, local_ele, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
-                                    param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection);
+                                    param.Nz, param.bmin, param.bmax, param.Vmax, param.V, XY, ax, input, param.noSensImage, sensBP, outputBP, local_ele, param.sigma_x, D, DD, param.TOFCenters, TOFSum, param.TOF, fp,
+                                    param.projType, param.nBins, lor, nRays, tempk_b, param.coneOfResponseStdCoeffA, param.coneOfResponseStdCoeffB, param.coneOfResponseStdCoeffC, param.dPitchXY, param.useMaskBP, param.maskBP, attApu, SPECT, param.attenuationCorrection, 0, false, !threadImages);
                                 if (uu == 0)
                                     break;
                             }
@@ -2057,6 +2094,24 @@ void projectorType123Implementation4(paramStruct<T>& param, const int64_t nMeas,
 			}
 		}
 	}
+#ifdef _OPENMP
+	// Sum the per-thread images, the implicit barrier of the above loop guarantees that all the threads are done
+	if (threadImages) {
+#pragma omp for schedule(static)
+		for (int64_t n = 0LL; n < imSize; n++) {
+			T apu = (T)0., apuS = (T)0.;
+			for (size_t tt = 0; tt < outputThreads.size(); tt++) {
+				if (outputThreads[tt] != nullptr)
+					apu += outputThreads[tt][n];
+				if (sensThreads[tt] != nullptr)
+					apuS += sensThreads[tt][n];
+			}
+			output[n] += apu;
+			if (!param.noSensImage)
+				SensImage[n] += apuS;
+		}
+	}
+#endif
 }
 #ifdef _OPENMP
 }
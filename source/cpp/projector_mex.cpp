@@ -210,6 +210,9 @@ void mexFunction(int nlhs, mxArray* plhs[], int nrhs, const mxArray* prhs[]) {
 	param.nRays2D = getScalarDouble(options, 0, "n_rays_transaxial");
 	param.nRays3D = getScalarDouble(options, 0, "n_rays_axial");
 	param.useMaskFP = getScalarBool(options, 0, "useMaskFP");
+	// Accumulation of the backprojection (optional), 0 uses atomic operations, 1 per-thread images
+	if (mxGetFieldNumber(options, "BPAccumulation") >= 0)
+		param.BPAccumulation = getScalarUInt32(options, 0, "BPAccumulation");
 	if (param.useMaskFP)
 		param.maskFP = getUint8s(options, "maskFP");
 	if (param.useMaskBP)
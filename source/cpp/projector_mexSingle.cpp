@@ -217,6 +217,9 @@ void mexFunction(int nlhs, mxArray* plhs[], int nrhs, const mxArray* prhs[]) {
 	param.nRays3D = getScalarUInt16(options, 0, "n_rays_axial");
 	param.useMaskFP = getScalarBool(options, 0, "useMaskFP");
 	param.useMaskBP = getScalarBool(options, 0, "useMaskBP");
+	// Accumulation of the backprojection (optional), 0 uses atomic operations, 1 per-thread images
+	if (mxGetFieldNumber(options, "BPAccumulation") >= 0)
+		param.BPAccumulation = getScalarUInt32(options, 0, "BPAccumulation");
 	if (DEBUG) {
 		mexPrintf("param.nRays2D = %d\n", param.nRays2D);
 		mexPrintf("param.nRays3D = %d\n", param.nRays3D);
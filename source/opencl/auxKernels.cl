@@ -260,6 +260,49 @@ void vectorMult(const CLGLOBAL float* input, CLGLOBAL float* output) {
 	output[id] *= input[id];
 }
 #endif // END PSF
+
+#ifdef SAT // START SAT
+// Summed-area tables of the branchless distance-driven projector (projector type 5)
+// The output volume is of size (n0 + 1) * (n1 + 1) * n2 with the first row and column zero. The input voxel
+// (i, j, l) is input[i * s0 + j * s1 + l * s2], i.e. the transpose is done while reading.
+// First pass, transpose and prefix sum along the first dimension, one work-item per (l, j)
+KERN
+void SATRows(const CLGLOBAL float* CLRESTRICT input, CLGLOBAL float* output, const uint n0, const uint n1, const uint n2,
+	const ULONG s0, const ULONG s1, const ULONG s2) {
+	const uint l = GID0;
+	const uint j = GID1;
+	if (l >= n2 || j > n1)
+		return;
+	const size_t ind = (size_t)j * (size_t)(n0 + 1) + (size_t)l * (size_t)(n0 + 1) * (size_t)(n1 + 1);
+	output[ind] = FLOAT_ZERO;
+	if (j == 0) {
+		for (uint i = 1; i <= n0; i++)
+			output[ind + i] = FLOAT_ZERO;
+		return;
+	}
+	const size_t indIn = (size_t)(j - 1) * s1 + (size_t)l * s2;
+	float summa = FLOAT_ZERO;
+	for (uint i = 0; i < n0; i++) {
+		summa += input[indIn + (size_t)i * s0];
+		output[ind + i + 1] = summa;
+	}
+}
+
+// Second pass, prefix sum along the second dimension, one work-item per (i, l)
+KERN
+void SATColumns(CLGLOBAL float* output, const uint n0, const uint n1, const uint n2) {
+	const uint i = GID0;
+	const uint l = GID1;
+	if (i > n0 || l >= n2)
+		return;
+	const size_t ind = (size_t)i + (size_t)l * (size_t)(n0 + 1) * (size_t)(n1 + 1);
+	float summa = FLOAT_ZERO;
+	for (uint j = 1; j <= n1; j++) {
+		summa += output[ind + (size_t)j * (size_t)(n0 + 1)];
+		output[ind + (size_t)j * (size_t)(n0 + 1)] = summa;
+	}
+}
+#endif // END SAT
 #endif // END NOTAF
 
 // Complex elementwise multiplication
@@ -1544,7 +1544,13 @@ DEVICE void getDetectorCoordinatesSPECT(
     ); // Amount of shift from sinogram center to current detector element
 	
     id = i.z * NA; // Index of d_uv (detector panel normal vector)
-    uint idShift = 2*lorXY + (2*N_RAYS) * idx; // Index of rayShiftsDetector
+#ifdef COMPACTSHIFTS // Projection-invariant shifts, (2*N_RAYS, d_size_x, d_sizey) detector and 2*N_RAYS source shifts
+    const size_t idShift = 2*lorXY + (2*N_RAYS) * (i.x + i.y * d_size_x); // Index of rayShiftsDetector
+    const uint idShiftS = 2*lorXY; // Index of rayShiftsSource
+#else
+    const size_t idShift = 2*lorXY + (2*N_RAYS) * idx; // Index of rayShiftsDetector
+    const size_t idShiftS = idShift; // Index of rayShiftsSource
+#endif
 
 	const FLOAT apuX = d_uv[id]; // X component of detector panel normal vector
 	const FLOAT apuY = d_uv[id + 1]; // Y component of detector panel normal vector
@@ -1552,9 +1558,9 @@ DEVICE void getDetectorCoordinatesSPECT(
 	(*d).x += apuX * (shift_det_elem.x + d_rayShiftsDetector[idShift]); // Shift to current element + shift to rayShiftsDetector
 	(*d).y += apuY * (shift_det_elem.x + d_rayShiftsDetector[idShift]);
 	(*d).z += shift_det_elem.y + d_rayShiftsDetector[idShift+1];
-	(*s).x += apuX * (shift_det_elem.x + d_rayShiftsSource[idShift]);
-	(*s).y += apuY * (shift_det_elem.x + d_rayShiftsSource[idShift]);
-	(*s).z += shift_det_elem.y + d_rayShiftsSource[idShift+1];
+	(*s).x += apuX * (shift_det_elem.x + d_rayShiftsSource[idShiftS]);
+	(*s).y += apuY * (shift_det_elem.x + d_rayShiftsSource[idShiftS]);
+	(*s).z += shift_det_elem.y + d_rayShiftsSource[idShiftS+1];
 
 #ifdef TOTLENGTH // Use full ray length for computing emission probability. Thus ray endpoints require shifting to FOV boundary. The begin point (here *s) is shifted only if outside the FOV. 
     extendRayToFOV(s, d, totalFOVmin, totalFOVmax);